@@ -17,24 +17,32 @@ import os
 import sys
 
 from flask import Flask
+from flask import abort
 from flask import current_app
 from flask import g
 from flask import request
 from flask import session
 from flask_login import LoginManager
 from flask_login import current_user
-from flask_socketio import SocketIO
 
 from modules.core.models.group import Group
 from modules.core.models.user import User
+from modules.core.models.user_identity import UserIdentity
 from modules.core.models.user_setting import UserSetting
+from system.cache import invalidation_bus
+from system.db.database import configure_database
 from system.db.database import db
 from system.db.decorators import ModelRegistry
+from system.db.schema import ensure_columns
+from system.i18n.translation import bind_translator
 from system.i18n.translation import format_date
 from system.i18n.translation import format_number
 from system.i18n.translation import preload_translations
+from system.i18n.translation import start_translation_watcher
 from system.i18n.translation import translate
 from system.module.utils import initialize_modules
+from system.profiling import startup_profiler
+from system.realtime import create_socketio
 
 # Configure logging - MAIN CONFIGURATION
 logging.basicConfig(
@@ -54,6 +62,8 @@ def get_locale():
 
 
 def create_app():
+    startup_profiler.start()
+
     app = Flask(
         __name__,
         template_folder="modules/core/views/templates",
@@ -71,19 +81,23 @@ def create_app():
     console_handler.setFormatter(formatter)
     app.logger.addHandler(console_handler)
 
-    # Initialize SocketIO
-    socketio = SocketIO(app)
-    app.socketio = socketio  # Store for access in other modules
-
     # Configure SQLAlchemy
-    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.join(
-        os.path.dirname(os.path.abspath(__file__)), "app.db"
-    )
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "dev")
 
-    # Initialize extensions
-    db.init_app(app)
+    # Initialize SocketIO, with a message queue when configured
+    socketio = create_socketio(app)
+    app.socketio = socketio  # Store for access in other modules
+
+    # Relay cache invalidations to other processes when configured
+    app.config["CACHE_INVALIDATION_URL"] = os.environ.get("CACHE_INVALIDATION_URL")
+    if app.config["CACHE_INVALIDATION_URL"]:
+        invalidation_bus.connect(app.config["CACHE_INVALIDATION_URL"])
+
+    # Initialize extensions, with app.db unless DATABASE_URL is set
+    configure_database(
+        app, "sqlite:///" + os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.db")
+    )
 
     # Initialize login manager
     login_manager = LoginManager()
@@ -92,29 +106,62 @@ def create_app():
 
     @login_manager.user_loader
     def load_user(user_id):
-        return db.session.get(User, int(user_id))
+        # Most requests are served from a cached identity snapshot; the full
+        # User row is only loaded when something outside it is accessed
+        return UserIdentity.load(int(user_id))
 
     # Create/update database tables and initialize modules within app context
     with app.app_context():
         # Initialize and validate modules first
-        module_loader = initialize_modules()
+        with startup_profiler.measure("phase", "discover modules"):
+            module_loader = initialize_modules()
         app.module_loader = module_loader  # Store module_loader in app instance
 
         # Store manifests in app config
         app.config["INSTALLED_MODULES"] = module_loader.manifests
+        app.config["MODULE_ROUTES"] = module_loader.build_route_index()
 
         # Register routes
-        module_loader.register_routes(app)
-
-        # Create all database tables
-        db.create_all()
-
-        # Create default groups if they don't exist
-        Group.get_or_create("ALL", "Default group for all users", True)
-        Group.get_or_create("ADMIN", "Administrators group", True)
-
-        # Call init_database hooks for all modules
-        module_loader.pm.hook.init_database()
+        with startup_profiler.measure("phase", "register routes"):
+            module_loader.register_routes(app)
+
+        # Tables are created and seeded only for modules whose schema or seed
+        # version changed since the last start, so warm restarts skip it all
+        with startup_profiler.measure("phase", "version check"):
+            pending = module_loader.get_pending_databases()
+
+        if pending:
+            app.logger.info(f"Initializing database for modules: {', '.join(pending)}")
+
+            # Create all database tables
+            with startup_profiler.measure("phase", "create tables"):
+                db.create_all()
+                ensure_columns(Group)
+
+        if "core" in pending:
+            with startup_profiler.measure("phase", "default groups"):
+                # Create default groups if they don't exist
+                Group.get_or_create("ALL", "Default group for all users", True, commit=False)
+                Group.get_or_create("ADMIN", "Administrators group", True, commit=False)
+
+                # Membership of ALL is kept at user creation and login; this
+                # catches users created before that, so requests never have to
+                # check it
+                User.backfill_all_group()
+                Group.recount_members()
+
+        # Call init_database hooks of the changed modules, recording each
+        # module's versions once its hook has finished
+        with startup_profiler.measure("phase", "init_database hooks"):
+            for module, versions in pending.items():
+                module_loader.init_database(module, versions)
+
+        # Call on_startup hooks for all modules
+        with (
+            startup_profiler.measure("phase", "on_startup hooks"),
+            startup_profiler.hook(module_loader.pm.hook.on_startup),
+        ):
+            module_loader.pm.hook.on_startup()
 
         # Print model registry after all models are loaded
         ModelRegistry.print_summary()
@@ -126,30 +173,28 @@ def create_app():
 
     @app.before_request
     def before_request():
-        """Global request setup and initialization"""
-        # 1. User Group Handling
-        if current_user.is_authenticated:
-            from modules.core.models.group import Group
-
-            all_group = Group.get_or_create("ALL", "Default group for all users", True)
-            if all_group not in current_user.groups:
-                current_user.add_to_group(all_group)
-
-        # 2. Module Context Setup
+        """Global request setup and initialization
+
+        Runs on every request, so it avoids database access: ALL group
+        membership is ensured at login and the language is resolved once per
+        session. Static files skip everything after the module gate.
+        """
+        # Turn away requests to modules disabled at runtime
+        current_app.module_loader.sync()
+        if not current_app.module_loader.is_blueprint_enabled(request.blueprint):
+            abort(404)
+
+        endpoint = request.endpoint or ""
+        if endpoint == "static" or endpoint.endswith(".static"):
+            return
+
+        # 1. Module Context Setup
         g.installed_modules = current_app.config.get("INSTALLED_MODULES", {}).values()
         path = request.path.split("/")[1] or "core"
 
-        # Find current module by matching the path against main_route
-        current_module = next(
-            (
-                m for m in g.installed_modules 
-                if m.get("main_route", "").strip("/").lower() == path.lower()
-            ),
-            next(
-                (m for m in g.installed_modules if m.get("name", "").lower() == "core"),
-                None,  # If neither path nor core module found, will be None
-            ),
-        )
+        # Find current module by its main_route, falling back to core
+        module_routes = current_app.config.get("MODULE_ROUTES", {})
+        current_module = module_routes.get(path.lower()) or module_routes.get("core")
 
         if current_module is None:
             # Log warning that module wasn't found
@@ -158,26 +203,36 @@ def create_app():
 
         g.current_module = current_module
 
-        # 3. Language Handling
-        g.lang = (
-            request.args.get("lang")
-            or session.get("lang")
-            or (
-                UserSetting.get(current_user.id, "language")
-                if current_user.is_authenticated
-                else None
-            )
-            or app.config.get("DEFAULT_LANGUAGE", "en")
-        )
+        # 2. Language Handling
+        g.lang = request.args.get("lang") or session.get("lang")
+        if not g.lang:
+            # First request of a session without a language, e.g. one
+            # restored from a remember-me cookie
+            if current_user.is_authenticated:
+                g.lang = UserSetting.get(current_user.id, "language")
+            g.lang = g.lang or app.config.get("DEFAULT_LANGUAGE", "en")
 
         # Store language in session if changed
-        if "lang" not in session or session["lang"] != g.lang:
+        if session.get("lang") != g.lang:
             session["lang"] = g.lang
 
+        # 3. Translation: bind the catalog for this language and module once
+        bind_translator()
+
+    @app.context_processor
+    def inject_translator():
+        """Give templates the request's bound translator as _"""
+        return {"_": g.get("translator") or bind_translator()}
+
     # Load translations after app is fully configured
-    with app.app_context():
+    with app.app_context(), startup_profiler.measure("phase", "load translations"):
         preload_translations()
 
+    # Pick up edited language files without a restart when enabled
+    if os.environ.get("TRANSLATIONS_AUTO_RELOAD"):
+        start_translation_watcher(app)
+
+    startup_profiler.finish()
     return app
 
 
@@ -11,7 +11,6 @@
 # See the LICENSE file for details.
 # -----------------------------------------------------------------------------
 
-import importlib
 import os
 import sys
 from functools import wraps
@@ -35,7 +34,9 @@ from flask_login import logout_user
 
 from system.db.database import db
 from system.i18n.translation import _  # Use our existing translation module
+from system.i18n.translation import bind_translator
 from system.decorators import admin_required
+from system.module.registry import manifest_registry
 
 from ..models.group import Group
 from ..models.user import User
@@ -82,6 +83,11 @@ def login():
         user = User.get_by_email(email)
         if user and user.check_password(password):
             login_user(user, remember=remember)
+            user.ensure_all_group()
+
+            # Resolve the language once per session instead of per request
+            session["lang"] = UserSetting.get(user.id, "language") or session.get("lang", "en")
+
             next_page = request.args.get("next")
             # Ensure the next page is safe and default to people dashboard
             if not next_page or not next_page.startswith("/"):
@@ -158,24 +164,7 @@ def update_user_language():
 @admin_required
 def manage_apps():
     """Apps management page"""
-    modules_dir = "modules"
-    modules = []
-
-    for module_name in os.listdir(modules_dir):
-        module_path = os.path.join(modules_dir, module_name)
-
-        if os.path.isdir(module_path) and not module_name.startswith("__"):
-            try:
-                # Load the manifest
-                manifest = importlib.import_module(f"modules.{module_name}.__manifest__").manifest
-
-                # Check if module is disabled
-                disabled_file = os.path.join(module_path, "__DISABLED__")
-                manifest["enabled"] = not os.path.exists(disabled_file)
-
-                modules.append(manifest)
-            except Exception as e:
-                print(f"Error loading manifest for {module_name}: {e}")
+    modules = list(manifest_registry.get_manifests().values())
 
     return render_template(
         "settings/apps.html",
@@ -199,30 +188,31 @@ def toggle_module():
     if not module_name:
         return jsonify({"error": "Module name required"}), 400
 
-    module_path = os.path.join("modules", module_name)
-    disabled_file = os.path.join(module_path, "__DISABLED__")
+    # The page sends the manifest name, which may differ from the directory
+    manifest = manifest_registry.find(module_name)
+    if not manifest:
+        return jsonify({"error": f"Module {module_name} not found"}), 404
 
     try:
-        if enabled and os.path.exists(disabled_file):
-            os.remove(disabled_file)
-        elif not enabled and not os.path.exists(disabled_file):
-            open(disabled_file, "a").close()
-
-        # After toggling, trigger a restart
-        if current_app.debug:
-            main_app_file = os.path.abspath(sys.modules["__main__"].__file__)
-            print(f"Debug mode: Triggering reload by touching {main_app_file}")
-            os.utime(main_app_file, None)
+        # Takes effect immediately; other processes pick it up on their next request
+        if not current_app.module_loader.set_enabled(manifest["module_dir"], bool(enabled)):
+            # Saved, but modules not loaded at startup can only be loaded by a restart
+            return jsonify(
+                {
+                    "success": False,
+                    "restart_required": True,
+                    "message": f"Module {module_name} will be enabled after a restart.",
+                }
+            ), 202
 
         return jsonify(
             {
                 "success": True,
-                "message": f"Module {module_name} {'enabled' if enabled else 'disabled'}. Restarting application...",
+                "message": f"Module {module_name} {'enabled' if enabled else 'disabled'}.",
             }
         )
     except Exception as e:
-        print(f"Error toggling module: {e}")
-        print(f"Error type: {type(e)}")
+        current_app.logger.error(f"Error toggling module {module_name}: {e}")
         return jsonify({"error": str(e)}), 500
 
 
@@ -255,6 +245,7 @@ def handle_500_error(e):
         "icon_class": "fas fa-exclamation-triangle",
     }
     g.installed_modules = []
+    bind_translator()
 
     return render_template(
         "errors/500.html",
@@ -275,6 +266,7 @@ def handle_404_error(e):
         "icon_class": "fas fa-exclamation-triangle",
     }
     g.installed_modules = []
+    bind_translator()
 
     return render_template(
         "errors/404.html",
@@ -289,12 +281,12 @@ def handle_404_error(e):
 @login_required
 def change_language(lang_code):
     """Change user's language preference"""
-    if lang_code not in current_app.config["LANGUAGES"]:
+    if lang_code not in SUPPORTED_LANGUAGES:
         return jsonify({"error": "Invalid language code"}), 400
 
     try:
         if current_user.update_setting("language", lang_code):
-            session["language"] = lang_code
+            session["lang"] = lang_code
             return jsonify({"success": True})
         return jsonify({"error": "Failed to update language setting"}), 500
 
@@ -352,11 +344,12 @@ def update_user_groups(user_id):
 
         # Check admin group changes
         admin_group = Group.get_admin_group()
-        if admin_group in user.groups and admin_group not in groups:
-            # Count other admin users
-            admin_count = User.query.filter(User.groups.any(id=admin_group.id)).count()
-            if admin_count <= 1:
-                return jsonify({"success": False, "error": _("Cannot remove last admin user")})
+        if (
+            admin_group in user.groups
+            and admin_group not in groups
+            and admin_group.member_count <= 1  # No other admin users
+        ):
+            return jsonify({"success": False, "error": _("Cannot remove last admin user")})
 
         # Update user's groups
         user.groups = groups
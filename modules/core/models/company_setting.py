@@ -1,7 +1,17 @@
 from datetime import datetime
+from sqlalchemy import event
+from system.cache import MISSING
+from system.cache import LRUCache
+from system.cache import invalidation_bus
+from system.db.cache import invalidate_on_commit
 from system.db.database import db
 from system.db.decorators import ModelRegistry
 
+# Setting values keyed by setting key; None records a missing setting
+_settings_cache = invalidation_bus.register("company_setting", LRUCache(maxsize=1000, ttl=300))
+
+EMAIL_SETTING_KEYS = ('sendgrid_api_key', 'sendgrid_from_email', 'sendgrid_from_name')
+
 @ModelRegistry.register
 class CompanySetting(db.Model):
     """Company-wide settings including email configuration"""
@@ -17,11 +27,32 @@ class CompanySetting(db.Model):
     @classmethod
     def get(cls, key, default=None):
         """Get a setting value by key"""
-        setting = cls.query.filter_by(key=key).first()
-        return setting.value if setting else default
+        value = cls.get_many([key])[key]
+        return default if value is None else value
 
     @classmethod
-    def set(cls, key, value, description=None):
+    def get_many(cls, keys):
+        """Get several settings, loading uncached ones in one query
+
+        Returns:
+            dict: Key -> value, None for settings that don't exist
+        """
+        values = {}
+        for key in keys:
+            value = _settings_cache.get(key)
+            if value is not MISSING:
+                values[key] = value
+
+        missing = [key for key in keys if key not in values]
+        if missing:
+            rows = dict(db.session.query(cls.key, cls.value).filter(cls.key.in_(missing)))
+            for key in missing:
+                values[key] = rows.get(key)
+                _settings_cache.set(key, values[key])
+        return values
+
+    @classmethod
+    def set(cls, key, value, description=None, commit=True):
         """Set a setting value"""
         setting = cls.query.filter_by(key=key).first()
         if setting:
@@ -31,22 +62,29 @@ class CompanySetting(db.Model):
         else:
             setting = cls(key=key, value=value, description=description)
             db.session.add(setting)
-        db.session.commit()
+        if commit:
+            db.session.commit()
         return setting
 
     # Email configuration methods
     @classmethod
     def get_email_settings(cls):
         """Get all email-related settings"""
-        return {
-            'sendgrid_api_key': cls.get('sendgrid_api_key', ''),
-            'sendgrid_from_email': cls.get('sendgrid_from_email', ''),
-            'sendgrid_from_name': cls.get('sendgrid_from_name', '')
-        }
+        values = cls.get_many(EMAIL_SETTING_KEYS)
+        return {key: values[key] or '' for key in EMAIL_SETTING_KEYS}
 
     @classmethod
     def update_email_settings(cls, api_key, from_email, from_name):
         """Update all email-related settings"""
-        cls.set('sendgrid_api_key', api_key, 'SendGrid API Key')
-        cls.set('sendgrid_from_email', from_email, 'SendGrid From Email')
-        cls.set('sendgrid_from_name', from_name, 'SendGrid From Name') 
\ No newline at end of file
+        cls.set('sendgrid_api_key', api_key, 'SendGrid API Key', commit=False)
+        cls.set('sendgrid_from_email', from_email, 'SendGrid From Email', commit=False)
+        cls.set('sendgrid_from_name', from_name, 'SendGrid From Name', commit=False)
+        db.session.commit() 
+
+
+@event.listens_for(CompanySetting, "after_insert")
+@event.listens_for(CompanySetting, "after_update")
+@event.listens_for(CompanySetting, "after_delete")
+def invalidate_company_setting(mapper, connection, target):
+    """Drop a changed setting from the cache once its transaction commits"""
+    invalidate_on_commit(target, "company_setting", target.key)
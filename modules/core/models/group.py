@@ -1,3 +1,4 @@
+from modules.core.models.user_group import user_group
 from system.db.database import db
 from system.db.decorators import ModelRegistry
 
@@ -12,15 +13,21 @@ class Group(db.Model):
     name = db.Column(db.String(64), unique=True)
     description = db.Column(db.String(256))
     is_system = db.Column(db.Boolean, default=False)
+    # Maintained on membership changes so counting members needs no scan
+    member_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    # Id of the ALL group, cached for the life of the process
+    _all_group_id = None
 
     @classmethod
-    def get_or_create(cls, name, description=None, is_system=False):
+    def get_or_create(cls, name, description=None, is_system=False, commit=True):
         """Get existing group or create new one"""
         group = cls.query.filter_by(name=name).first()
         if not group:
             group = cls(name=name, description=description, is_system=is_system)
             db.session.add(group)
-            db.session.commit()
+            if commit:
+                db.session.commit()
         return group
 
     @classmethod
@@ -33,5 +40,30 @@ class Group(db.Model):
         """Get ALL group"""
         return cls.query.filter_by(name="ALL").first()
 
+    @classmethod
+    def get_all_group_id(cls):
+        """Get the ALL group id, creating the group on first use"""
+        if cls._all_group_id is None:
+            cls._all_group_id = cls.get_or_create("ALL", "Default group for all users", True).id
+        return cls._all_group_id
+
+    @classmethod
+    def get_admin_count(cls):
+        """Get the number of administrators"""
+        admin_group = cls.get_admin_group()
+        return admin_group.member_count if admin_group else 0
+
+    @classmethod
+    def recount_members(cls):
+        """Recompute every group's member count from the membership table"""
+        count = (
+            db.select(db.func.count())
+            .select_from(user_group)
+            .where(user_group.c.group_id == cls.id)
+            .scalar_subquery()
+        )
+        db.session.execute(db.update(cls).values(member_count=count))
+        db.session.commit()
+
     def __repr__(self):
         return f"<Group {self.name}>"
@@ -14,8 +14,11 @@
 
 import logging
 import random
+from collections import Counter
 
 from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 from werkzeug.security import check_password_hash
 from werkzeug.security import generate_password_hash
 
@@ -76,10 +79,24 @@ class User(db.Model, UserMixin):
         "Group", secondary=user_group, backref=db.backref("users", lazy="dynamic")
     )
 
+    @property
+    def group_names(self):
+        """Names of the user's groups, cached until membership changes"""
+        names = self.__dict__.get("_group_names")
+        if names is None:
+            names = frozenset(group.name for group in self.groups)
+            self.__dict__["_group_names"] = names
+        return names
+
     @property
     def is_admin(self):
         """Check if user is in ADMIN group"""
-        return any(group.name == "ADMIN" for group in self.groups)
+        return "ADMIN" in self.group_names
+
+    @property
+    def employee_profile_id(self):
+        """Id of the user's employee record, if any"""
+        return self.employee_profile.id if self.employee_profile else None
 
     @property
     def is_sole_admin(self):
@@ -87,8 +104,7 @@ class User(db.Model, UserMixin):
         if not self.is_admin:
             return False
 
-        admin_count = User.query.filter(User.groups.any(name="ADMIN")).count()
-        return admin_count <= 1
+        return Group.get_admin_count() <= 1
 
     @property
     def password(self):
@@ -112,8 +128,14 @@ class User(db.Model, UserMixin):
         return User.query.filter_by(email=email).first()
 
     @classmethod
-    def create(cls, email, password, first_name=None, last_name=None, is_admin=False):
-        """Create new user and add to appropriate groups"""
+    def create(
+        cls, email, password, first_name=None, last_name=None, is_admin=False, commit=True
+    ):
+        """Create new user and add to appropriate groups
+
+        With commit=False the user is only added to the session, so callers
+        can create several records in one transaction.
+        """
         # Check for duplicate admin
         if email == "admin" and User.get_by_email("admin"):
             raise ValueError("Cannot create duplicate admin user")
@@ -124,32 +146,22 @@ class User(db.Model, UserMixin):
         db.session.add(user)
 
         # Add to ALL group
-        all_group = Group.get_or_create("ALL", "Default group for all users", True)
-        user.add_to_group(all_group)
+        all_group = Group.get_or_create("ALL", "Default group for all users", True, commit=False)
+        user.groups.append(all_group)
 
         # Add to ADMIN group if specified
         if is_admin:
-            admin_group = Group.get_or_create("ADMIN", "Administrators group", True)
-            user.add_to_group(admin_group)
+            admin_group = Group.get_or_create("ADMIN", "Administrators group", True, commit=False)
+            user.groups.append(admin_group)
 
-        db.session.commit()
+        if commit:
+            db.session.commit()
         return user
 
     def update_setting(self, key, value):
         """Update or create a user setting"""
         try:
-            # Try to get existing setting
-            setting = UserSetting.query.filter_by(user_id=self.id, key=key).first()
-
-            if setting:
-                # Update existing setting
-                setting.value = value
-            else:
-                # Create new setting
-                setting = UserSetting(user_id=self.id, key=key, value=value)
-                db.session.add(setting)
-
-            db.session.commit()
+            UserSetting.set(self.id, key, value)
             return True
 
         except Exception as e:
@@ -163,14 +175,36 @@ class User(db.Model, UserMixin):
             self.groups.append(group)
             db.session.commit()
 
+    def ensure_all_group(self):
+        """Add user to the ALL group if not already a member"""
+        all_group_id = Group.get_all_group_id()
+        if not any(group.id == all_group_id for group in self.groups):
+            self.add_to_group(db.session.get(Group, all_group_id))
+
+    @classmethod
+    def backfill_all_group(cls):
+        """Add every user missing from the ALL group in one statement
+
+        Returns:
+            int: Number of memberships added
+        """
+        all_group_id = Group.get_all_group_id()
+        members = db.select(user_group.c.user_id).where(user_group.c.group_id == all_group_id)
+        result = db.session.execute(
+            user_group.insert().from_select(
+                ["user_id", "group_id"],
+                db.select(cls.id, db.literal(all_group_id)).where(cls.id.not_in(members)),
+            )
+        )
+        db.session.commit()
+        return result.rowcount
+
     def remove_from_group(self, group):
         """Remove user from group if not ALL group"""
         if group.name != "ALL" and group in self.groups:
             # Prevent removing last admin
-            if group.name == "ADMIN":
-                admin_count = User.query.filter(User.groups.any(name="ADMIN")).count()
-                if admin_count <= 1 and self.is_admin:
-                    raise ValueError("Cannot remove last admin user")
+            if group.name == "ADMIN" and Group.get_admin_count() <= 1 and self.is_admin:
+                raise ValueError("Cannot remove last admin user")
 
             self.groups.remove(group)
             db.session.commit()
@@ -181,3 +215,50 @@ class User(db.Model, UserMixin):
         if self.first_name and self.last_name:
             return (self.first_name[0] + self.last_name[0]).upper()
         return self.email[:2].upper()
+
+
+@event.listens_for(User.groups, "append")
+@event.listens_for(User.groups, "remove")
+@event.listens_for(User.groups, "bulk_replace")
+def reset_group_names(target, *args):
+    """Forget cached group names when membership changes"""
+    target.__dict__.pop("_group_names", None)
+
+
+@event.listens_for(User, "expire")
+@event.listens_for(User, "refresh")
+def reset_group_names_on_reload(target, *args):
+    """Forget cached group names when the user is reloaded"""
+    # Expired instances may already be garbage collected
+    if target is not None:
+        target.__dict__.pop("_group_names", None)
+
+
+@event.listens_for(Session, "after_flush")
+def update_group_member_counts(session, flush_context):
+    """Apply membership changes of the flush to the groups' member counts"""
+    deltas = Counter()
+    for obj in session.new | session.dirty:
+        if isinstance(obj, User):
+            history = db.inspect(obj).attrs.groups.history
+            deltas.update(group.id for group in history.added)
+            deltas.subtract(group.id for group in history.deleted)
+
+    connection = session.connection()
+    for group_id, delta in deltas.items():
+        if delta:
+            connection.execute(
+                Group.__table__.update()
+                .where(Group.__table__.c.id == group_id)
+                .values(member_count=Group.__table__.c.member_count + delta)
+            )
+
+    # Deleting a user drops its memberships without collection events
+    if any(isinstance(obj, User) for obj in session.deleted):
+        count = (
+            db.select(db.func.count())
+            .select_from(user_group)
+            .where(user_group.c.group_id == Group.__table__.c.id)
+            .scalar_subquery()
+        )
+        connection.execute(Group.__table__.update().values(member_count=count))
@@ -0,0 +1,151 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Lightweight identity used as Flask-Login's current_user. It is built
+#     from a cached snapshot of the fields most requests need, and loads the
+#     full User row only when something else is accessed.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+from sqlalchemy import event
+from sqlalchemy.orm import selectinload
+
+from modules.core.models.group import Group
+from modules.core.models.user import User
+from modules.core.models.user_setting import UserSetting
+from system.cache import MISSING
+from system.cache import LRUCache
+from system.cache import invalidation_bus
+from system.db.cache import invalidate_on_commit
+from system.db.database import db
+
+CACHE_NAME = "user_identity"
+
+# Snapshot dicts keyed by user id, short-lived as a safety net for changes
+# made outside the ORM
+_identity_cache = invalidation_bus.register(CACHE_NAME, LRUCache(maxsize=5000, ttl=60))
+
+
+class UserIdentity:
+    """
+    Request-scoped stand-in for the logged in User.
+
+    Snapshot fields are plain attributes. Any other attribute or method is
+    looked up on the full User, which is loaded once per request on first
+    use, so existing code working with current_user keeps working.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, snapshot):
+        self.__dict__.update(snapshot)
+        self.__dict__["_user"] = None
+
+    @classmethod
+    def load(cls, user_id):
+        """Get the identity of a user from the cache or the database
+
+        Returns:
+            UserIdentity: Identity, or None if the user doesn't exist
+        """
+        snapshot = _identity_cache.get(user_id)
+        if snapshot is MISSING:
+            user = db.session.get(User, user_id, options=[selectinload(User.groups)])
+            if user is None:
+                return None
+            snapshot = cls.snapshot(user)
+            _identity_cache.set(user_id, snapshot)
+        return cls(snapshot)
+
+    @staticmethod
+    def snapshot(user):
+        """Collect the cached fields of a user"""
+        return {
+            "id": user.id,
+            "email": user.email,
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "avatar_color": user.avatar_color,
+            "avatar_initials": user.avatar_initials,
+            "is_active": user.is_active,
+            "employee_profile_id": user.employee_profile_id,
+            "group_names": user.group_names,
+            "language": UserSetting.get(user.id, "language"),
+        }
+
+    @property
+    def is_admin(self):
+        """Check if user is in ADMIN group"""
+        return "ADMIN" in self.group_names
+
+    @property
+    def user(self):
+        """The full User row, loaded on first access"""
+        if self._user is None:
+            self.__dict__["_user"] = db.session.get(
+                User, self.id, options=[selectinload(User.groups)]
+            )
+        return self._user
+
+    def get_id(self):
+        return str(self.id)
+
+    def __getattr__(self, name):
+        # Only called for attributes missing from the snapshot
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.user, name)
+
+    def __eq__(self, other):
+        if isinstance(other, (UserIdentity, User)):
+            return self.id == other.id
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f"<UserIdentity {self.id}>"
+
+
+def invalidate_identity(target, user_id):
+    """Drop a user's cached identity once target's transaction commits"""
+    if user_id is not None:
+        invalidate_on_commit(target, CACHE_NAME, user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def invalidate_user(mapper, connection, target):
+    """Refresh the identity when the user row changes"""
+    invalidate_identity(target, target.id)
+
+
+@event.listens_for(User.groups, "append")
+@event.listens_for(User.groups, "remove")
+@event.listens_for(User.groups, "bulk_replace")
+def invalidate_membership(target, *args):
+    """Refresh the identity when the user's groups change"""
+    invalidate_identity(target, target.id)
+
+
+@event.listens_for(Group, "after_update")
+@event.listens_for(Group, "after_delete")
+def invalidate_group(mapper, connection, target):
+    """Group names are part of every identity, so drop them all"""
+    invalidate_on_commit(target, CACHE_NAME, None)
+
+
+@event.listens_for(UserSetting, "after_insert")
+@event.listens_for(UserSetting, "after_update")
+@event.listens_for(UserSetting, "after_delete")
+def invalidate_language(mapper, connection, target):
+    """Refresh the identity when the user's language changes"""
+    if target.key == "language":
+        invalidate_identity(target, target.user_id)
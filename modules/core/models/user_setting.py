@@ -1,8 +1,17 @@
 from datetime import datetime
 
+from sqlalchemy import event
+
+from system.cache import MISSING
+from system.cache import LRUCache
+from system.cache import invalidation_bus
+from system.db.cache import invalidate_on_commit
 from system.db.database import db
 from system.db.decorators import ModelRegistry
 
+# Setting values keyed by (user_id, key); None records a missing setting
+_settings_cache = invalidation_bus.register("user_setting", LRUCache(maxsize=10000, ttl=300))
+
 
 @ModelRegistry.register
 class UserSetting(db.Model):
@@ -25,8 +34,33 @@ class UserSetting(db.Model):
 
     @staticmethod
     def get(user_id, key, default=None):
-        setting = UserSetting.query.filter_by(user_id=user_id, key=key).first()
-        return setting.value if setting else default
+        value = UserSetting.get_many(user_id, [key])[key]
+        return default if value is None else value
+
+    @staticmethod
+    def get_many(user_id, keys):
+        """Get several settings of a user, loading uncached ones in one query
+
+        Returns:
+            dict: Key -> value, None for settings that don't exist
+        """
+        values = {}
+        for key in keys:
+            value = _settings_cache.get((user_id, key))
+            if value is not MISSING:
+                values[key] = value
+
+        missing = [key for key in keys if key not in values]
+        if missing:
+            rows = dict(
+                db.session.query(UserSetting.key, UserSetting.value).filter(
+                    UserSetting.user_id == user_id, UserSetting.key.in_(missing)
+                )
+            )
+            for key in missing:
+                values[key] = rows.get(key)
+                _settings_cache.set((user_id, key), values[key])
+        return values
 
     @staticmethod
     def set(user_id, key, value):
@@ -37,3 +71,11 @@ class UserSetting(db.Model):
             setting = UserSetting(user_id=user_id, key=key, value=value)
             db.session.add(setting)
         db.session.commit()
+
+
+@event.listens_for(UserSetting, "after_insert")
+@event.listens_for(UserSetting, "after_update")
+@event.listens_for(UserSetting, "after_delete")
+def invalidate_user_setting(mapper, connection, target):
+    """Drop a changed setting from the cache once its transaction commits"""
+    invalidate_on_commit(target, "user_setting", (target.user_id, target.key))
@@ -1,3 +1,6 @@
+from datetime import timedelta
+
+import click
 from flask import current_app
 from flask import jsonify
 from flask import render_template
@@ -7,23 +10,63 @@ from flask_login import login_required
 from flask_socketio import emit
 from flask_socketio import join_room
 from flask_socketio import leave_room
-from datetime import datetime
+from sqlalchemy.exc import SQLAlchemyError
 
 from system.db.database import db
-from modules.core.models.user import User
+from system.db.replica import primary_reads
+from system.db.replica import replica_reads
+from system.realtime import user_room
 
 from ..models.chat import Channel
+from ..models.chat import ChannelReadCursor
 from ..models.chat import Chat
-from ..models.chat import InteractionType
 from ..models.chat import ChatMessageState
+from ..models.chat import utc_now
+from ..models.chat_archive import MAX_RETENTION_DAYS
+from ..models.chat_archive import ChatArchiveSegment
+from ..models.chat_archive import get_message_page
+from ..models.chat_purge import MAX_PURGE_DAYS
+from ..models.chat_purge import ChatPurgeJob
+from ..models.chat_purge import chat_purge_worker
+from ..models.chat_reaction import REACTION_EMOJIS
+from ..models.chat_reaction import ChatReaction
+from ..models.chat_search import ChatSearchIndex
 from . import blueprint
 
+# Upper bound for the number of messages returned per page
+MAX_PAGE_SIZE = 100
+
+# Number of search results returned per page
+SEARCH_PAGE_SIZE = 20
+
+
+@blueprint.before_app_request
+def resume_chat_purges():
+    """Archive expired messages and resume unfinished purges on the first request"""
+    chat_purge_worker.resume(current_app._get_current_object())
+
+
+@blueprint.context_processor
+def inject_reaction_emojis():
+    """Give message templates the emojis offered in the reaction picker"""
+    return {"reaction_emojis": REACTION_EMOJIS}
+
+
+def emit_badge_updates(channel):
+    """Send a channel's new unread count to every user who has unread messages in it"""
+    for user_id, unread_count in ChannelReadCursor.get_badge_counts(channel).items():
+        current_app.socketio.emit(
+            "badge_update",
+            {"channel": channel.name, "unread_count": unread_count},
+            to=user_room(user_id),
+        )
+
 
 @blueprint.route("/chat")
 @login_required
 def chat():
     """Company chat page"""
-    channels = Channel.query.all()
+    channels = Channel.visible_to(current_user).all()
     default_channel = Channel.query.filter_by(name="general").first()
     if not default_channel:
         default_channel = Channel(
@@ -39,16 +82,26 @@ def chat():
         channels=channels,
         default_channel=default_channel,
         module_home="people_bp.people_home",
-        ChatMessageState=ChatMessageState
+        unread_counts=ChatMessageState.get_unread_summary(
+            current_user.id, current_user.is_admin
+        ),
     )
 
 
 @blueprint.route("/chat/messages/<int:message_id>")
 @login_required
+@replica_reads
 def get_single_message(message_id):
     """Get a single message by ID"""
     try:
-        message = Chat.query.get_or_404(message_id)
+        message = db.session.get(Chat, message_id) or ChatArchiveSegment.find_message(message_id)
+        channel = message and db.session.get(Channel, message.channel_id)
+        if not channel or not channel.is_visible_to(current_user):
+            return "Message not found", 404
+        if not message.archived:
+            # Archived messages carry the likes and reactions they were archived with
+            Chat.prepare_likes([message], current_user.id)
+            ChatReaction.prepare([message], current_user.id)
         return render_template(
             "chat/partials/single-message.html",
             chat=message,
@@ -60,8 +113,24 @@ def get_single_message(message_id):
         return str(e), 500
 
 
+def render_broadcast_message(chat):
+    """Render a message once for every viewer of its channel.
+
+    The fragment carries all message controls hidden and tagged with the
+    permission they need; each client reveals the ones that apply to it.
+    Labels are left in the source language and marked, so each client
+    translates them into its own language rather than the poster's.
+    """
+    Chat.prepare_likes([chat])
+    ChatReaction.prepare([chat])
+    return render_template(
+        "chat/partials/single-message.html", chat=chat, broadcast=True, _=str
+    )
+
+
 @blueprint.route("/chat/channels/<channel_name>/messages")
 @login_required
+@replica_reads
 def get_channel_messages(channel_name):
     """Get messages for a specific channel"""
     try:
@@ -69,87 +138,31 @@ def get_channel_messages(channel_name):
         
         # Get query parameters
         before_id = request.args.get('before_id', type=int)
-        limit = request.args.get('limit', 10, type=int)
+        limit = max(1, min(request.args.get('limit', 10, type=int), MAX_PAGE_SIZE))
         pinned_only = request.args.get('pinned_only', type=bool)
         
         # Get channel
         channel = Channel.query.filter_by(name=channel_name).first()
-        if not channel:
+        if not channel or not channel.is_visible_to(current_user):
             return f"Channel {channel_name} not found", 404
-            
-        # Build base query
-        query = channel.messages
-        
-        # Get total pin count for the channel
-        total_pin_count = query.filter(Chat.pinned == True).count()
-        
-        # Filter pinned messages if requested
-        if pinned_only:
-            query = query.filter(Chat.pinned == True)
-            
-        # Get total count
-        total_messages = query.count()
-        if total_messages == 0:
-            return render_template(
-                "chat/partials/message-list.html",
-                chats=[],
-                current_user=current_user,
-                channel_description=channel.description,
-                ChatMessageState=ChatMessageState,
-                has_more=False,
-                oldest_id=None,
-                channel_name=channel_name,
-                total_pin_count=total_pin_count
-            )
-        
-        # If before_id is not provided, get the latest messages
+
+        messages, has_more = get_message_page(
+            channel.id, before_id=before_id, limit=limit, pinned_only=pinned_only
+        )
+        oldest_id = messages[0].id if messages else None
+        Chat.prepare_formatted_content(messages)
+        # Archived messages carry the likes and reactions they were archived with
+        hot = [message for message in messages if not message.archived]
+        Chat.prepare_likes(hot, current_user.id)
+        ChatReaction.prepare(hot, current_user.id)
+
+        # Older pages are appended below the current header, so only the
+        # first page needs the pin count
+        total_pin_count = None
         if not before_id:
-            messages = query.order_by(Chat.created_at.desc()).limit(limit).all()
-            messages = messages[::-1]  # Reverse to show in ascending order
-            has_more = query.filter(Chat.id < messages[0].id).first() is not None
-            oldest_id = messages[0].id
-        else:
-            # Get messages before the given ID
-            messages = query.filter(Chat.id < before_id).order_by(Chat.created_at.desc()).limit(limit).all()
-            messages = messages[::-1]  # Reverse to show in ascending order
-            has_more = query.filter(Chat.id < messages[0].id).first() is not None if messages else False
-            oldest_id = messages[0].id if messages else None
-            
-        # Mark the entire channel as read
-        # Get the latest message in the channel
-        latest_message = Chat.query.filter_by(channel_id=channel.id).order_by(Chat.id.desc()).first()
-        if latest_message:
-            current_app.logger.info(f"Marking channel {channel_name} as read for user {current_user.id}")
-            
-            # Get or create a read state for this user and channel
-            read_state = ChatMessageState.query.filter_by(
-                user_id=current_user.id,
-                channel_id=channel.id,
-                interaction_type=InteractionType.READ
-            ).first()
-            
-            if not read_state:
-                current_app.logger.info(f"Creating new read state for channel {channel_name}")
-                read_state = ChatMessageState(
-                    user_id=current_user.id,
-                    channel_id=channel.id,
-                    message_id=latest_message.id,  # Associate with the latest message
-                    interaction_type=InteractionType.READ,
-                    data={'last_read_message_id': latest_message.id}
-                )
-                db.session.add(read_state)
-            else:
-                current_app.logger.info(f"Updating existing read state for channel {channel_name}")
-                current_app.logger.info(f"Previous last read message ID: {read_state.data.get('last_read_message_id')}")
-                # Don't change the message_id field to avoid unique constraint violation
-                # read_state.message_id = latest_message.id  <- This line was causing the issue
-                read_state.data = {'last_read_message_id': latest_message.id}
-                read_state.updated_at = datetime.utcnow()
-                
-            db.session.commit()
-            current_app.logger.info(f"Successfully marked channel {channel_name} as read")
-        
-        return render_template(
+            total_pin_count = channel.pinned_count
+
+        html = render_template(
             "chat/partials/message-list.html",
             chats=messages,
             current_user=current_user,
@@ -160,6 +173,20 @@ def get_channel_messages(channel_name):
             channel_name=channel_name,
             total_pin_count=total_pin_count
         )
+
+        # Mark the entire channel as read once the page is rendered, so the
+        # commit doesn't expire the messages before the template reads them.
+        # The first unfiltered page ends with the latest message. The cursor
+        # is read from the primary, since it's about to be updated.
+        if not before_id:
+            with primary_reads():
+                if pinned_only:
+                    ChatMessageState.mark_channel_read(current_user.id, channel.id)
+                elif messages:
+                    ChannelReadCursor.advance(current_user.id, channel.id, messages[-1].id)
+                    db.session.commit()
+
+        return html
             
     except Exception as e:
         current_app.logger.error(f"Error getting channel messages: {str(e)}")
@@ -218,7 +245,7 @@ def create_message():
 
         # Get or create channel
         channel = Channel.query.filter_by(name=channel_name).first()
-        if not channel:
+        if not channel or not channel.is_visible_to(current_user):
             return f"Channel {channel_name} not found", 404
 
         chat = Chat(
@@ -227,38 +254,26 @@ def create_message():
         db.session.add(chat)
         db.session.flush()  # Get the chat ID without committing
         
-        # Create message states for all users except the author
-        users = User.query.filter(User.id != current_user.id).all()
-        for user in users:
-            state = ChatMessageState(
-                user_id=user.id,
-                message_id=chat.id,
-                channel_id=channel.id,
-                interaction_type=InteractionType.READ,
-                data={'last_read_message_id': None}  # None indicates unread
-            )
-            db.session.add(state)
-        
+        # The author has read their own message; everyone else picks it up
+        # as unread through their channel read cursor
+        ChannelReadCursor.advance(current_user.id, channel.id, chat.id)
         db.session.commit()
 
         # Debug: Log message creation
         current_app.logger.info(f"New message created in {channel_name} by user {current_user.id}")
 
         # Emit two events:
-        # 1. To users in the channel to refresh their messages
+        # 1. To users in the channel, with the rendered message to append
         current_app.socketio.emit("chat_changed", {
             "channel": channel_name,
             "message_id": chat.id,
             "author_id": current_user.id,
-            "type": "refresh"
+            "type": "message",
+            "html": render_broadcast_message(chat)
         }, to=channel_name)
 
-        # 2. To all users to update unread badges
-        current_app.socketio.emit("message_created", {
-            "channel": channel_name,
-            "message_id": chat.id,
-            "author_id": current_user.id
-        })  # No 'to' means broadcast to everyone
+        # 2. To each user who can see the channel, with their new unread count
+        emit_badge_updates(channel)
 
         return ""
     except Exception as e:
@@ -277,12 +292,21 @@ def toggle_pin(message_id):
             return jsonify({"error": "Unauthorized"}), 403
 
         chat.toggle_pin()
-        
-        # Get updated pin count for the channel
-        total_pin_count = Chat.query.filter_by(channel_id=chat.channel_id, pinned=True).count()
-        
-        db.session.commit()
-        
+
+        # The commit expired the channel, so this reloads the updated count
+        total_pin_count = chat.channel.pinned_count
+
+        # Push the re-rendered message to everyone else viewing the channel
+        current_app.socketio.emit("chat_changed", {
+            "channel": chat.channel.name,
+            "message_id": chat.id,
+            "type": "pin",
+            "html": render_broadcast_message(chat),
+            "total_pin_count": total_pin_count
+        }, to=chat.channel.name)
+
+        Chat.prepare_likes([chat], current_user.id)
+        ChatReaction.prepare([chat], current_user.id)
         return render_template(
             "chat/partials/single-message.html",
             chat=chat,
@@ -294,6 +318,38 @@ def toggle_pin(message_id):
         return str(e), 400
 
 
+@blueprint.route("/chat/messages/<int:message_id>/reactions", methods=["POST"])
+@login_required
+def toggle_reaction(message_id):
+    """Add or remove the current user's emoji reaction on a message"""
+    try:
+        emoji = request.form.get("emoji")
+        if emoji not in REACTION_EMOJIS:
+            return "Unknown reaction", 400
+
+        chat = db.get_or_404(Chat, message_id)
+        if not chat.channel.is_visible_to(current_user):
+            return jsonify({"error": "Unauthorized"}), 403
+
+        count, _reacted = ChatReaction.toggle(current_user.id, chat, emoji)
+        db.session.commit()
+
+        # Viewers only need the new count; their own highlight is unchanged
+        current_app.socketio.emit("reaction_update", {
+            "channel": chat.channel.name,
+            "message_id": chat.id,
+            "emoji": emoji,
+            "count": count,
+        }, to=chat.channel.name)
+
+        ChatReaction.prepare([chat], current_user.id)
+        return render_template("chat/partials/reactions.html", chat=chat)
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error toggling reaction: {e}")
+        return str(e), 400
+
+
 @blueprint.route("/chat/messages/<int:message_id>", methods=["DELETE"])
 @login_required
 def delete_message(message_id):
@@ -304,15 +360,23 @@ def delete_message(message_id):
             return jsonify({"error": "Unauthorized"}), 403
 
         channel_name = chat.channel.name
+        channel_id = chat.channel_id
         
-        # First delete all associated message states
+        # First delete all associated message states and reaction counts
         ChatMessageState.query.filter_by(message_id=message_id).delete()
+        ChatReaction.delete_for_message(message_id)
         
         # Then delete the message
         db.session.delete(chat)
         db.session.commit()
 
-        current_app.socketio.emit("chat_changed", {"channel": channel_name}, room=channel_name)
+        total_pin_count = db.session.get(Channel, channel_id).pinned_count
+        current_app.socketio.emit("chat_changed", {
+            "channel": channel_name,
+            "message_id": message_id,
+            "type": "delete",
+            "total_pin_count": total_pin_count
+        }, room=channel_name)
         return "", 204
     except Exception as e:
         db.session.rollback()
@@ -336,24 +400,136 @@ def delete_channel(channel_name):
         if channel.name in ["general", "announcements", "events"]:
             return jsonify({"error": "Cannot delete default channels"}), 400
 
-        # Delete all message states for this channel
-        ChatMessageState.query.filter_by(channel_id=channel.id).delete()
-        
-        # Delete all messages in this channel
-        Chat.query.filter_by(channel_id=channel.id).delete()
-        
-        # Delete the channel
-        db.session.delete(channel)
+        # Hide the channel now and purge its messages in the background
+        job = ChatPurgeJob.for_channel(channel, created_by_id=current_user.id)
         db.session.commit()
+        chat_purge_worker.start(current_app._get_current_object())
 
         current_app.socketio.emit("channel_deleted", {"name": channel_name})
-        return "", 204
+        return jsonify(job.to_dict()), 202
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Error deleting channel: {str(e)}")
         return jsonify({"error": str(e)}), 400
 
 
+@blueprint.route("/chat/purges", methods=["POST"])
+@login_required
+def purge_messages():
+    """Purge messages older than a number of days, in one channel or all of them"""
+    try:
+        if not current_user.is_admin:
+            return jsonify({"error": "Unauthorized"}), 403
+
+        days = request.form.get("days", type=int)
+        if days is None or not 1 <= days <= MAX_PURGE_DAYS:
+            return jsonify({"error": f"Number of days must be between 1 and {MAX_PURGE_DAYS}"}), 400
+
+        channel = None
+        channel_name = request.form.get("channel")
+        if channel_name:
+            channel = Channel.query.filter_by(name=channel_name).first()
+            if not channel or not channel.is_visible_to(current_user):
+                return jsonify({"error": "Channel not found"}), 404
+
+        before = utc_now() - timedelta(days=days)
+        job = ChatPurgeJob.for_messages(before, channel=channel, created_by_id=current_user.id)
+        db.session.commit()
+        chat_purge_worker.start(current_app._get_current_object())
+
+        return jsonify(job.to_dict()), 202
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error purging messages: {e}")
+        return jsonify({"error": str(e)}), 400
+
+
+@blueprint.route("/chat/archive", methods=["POST"])
+@login_required
+def archive_messages():
+    """Move messages past their channel's retention to the archive"""
+    try:
+        if not current_user.is_admin:
+            return jsonify({"error": "Unauthorized"}), 403
+
+        jobs = ChatPurgeJob.for_retention()
+        for job in jobs:
+            job.created_by_id = current_user.id
+        db.session.commit()
+        chat_purge_worker.start(current_app._get_current_object())
+
+        return jsonify([job.to_dict() for job in jobs]), 202
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error archiving messages: {e}")
+        return jsonify({"error": str(e)}), 400
+
+
+@blueprint.route("/chat/channels/<channel_name>/retention", methods=["PUT"])
+@login_required
+def set_channel_retention(channel_name):
+    """Set how many days a channel's messages stay before they're archived"""
+    try:
+        if not current_user.is_admin:
+            return jsonify({"error": "Unauthorized"}), 403
+
+        channel = Channel.query.filter_by(name=channel_name).first()
+        if not channel or not channel.is_visible_to(current_user):
+            return jsonify({"error": "Channel not found"}), 404
+
+        # Empty uses the default retention, 0 keeps messages forever
+        days = request.form.get("days", type=int)
+        if request.form.get("days", "").strip() and (
+            days is None or not 0 <= days <= MAX_RETENTION_DAYS
+        ):
+            return jsonify(
+                {"error": f"Retention must be between 0 and {MAX_RETENTION_DAYS} days"}
+            ), 400
+        channel.retention_days = days
+        db.session.commit()
+
+        return jsonify({"name": channel.name, "retention_days": channel.retention_days})
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error setting channel retention: {e}")
+        return jsonify({"error": str(e)}), 400
+
+
+@blueprint.route("/chat/purges/<int:job_id>")
+@login_required
+def get_purge(job_id):
+    """Get the progress of a channel deletion or message purge"""
+    if not current_user.is_admin:
+        return jsonify({"error": "Unauthorized"}), 403
+    job = db.session.get(ChatPurgeJob, job_id)
+    if not job:
+        return jsonify({"error": "Purge not found"}), 404
+    return jsonify(job.to_dict())
+
+
+@blueprint.route("/chat/purges/<int:job_id>/retry", methods=["POST"])
+@login_required
+def retry_purge(job_id):
+    """Run a failed channel deletion or message purge again"""
+    try:
+        if not current_user.is_admin:
+            return jsonify({"error": "Unauthorized"}), 403
+        job = db.session.get(ChatPurgeJob, job_id)
+        if not job:
+            return jsonify({"error": "Purge not found"}), 404
+        if not job.retry():
+            return jsonify({"error": "Only failed purges can be retried"}), 400
+        job.created_by_id = current_user.id
+        db.session.commit()
+        chat_purge_worker.start(current_app._get_current_object())
+
+        return jsonify(job.to_dict()), 202
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error retrying purge: {e}")
+        return jsonify({"error": str(e)}), 400
+
+
 @blueprint.route("/chat/channels/edit", methods=["PUT"])
 @login_required
 def edit_channel():
@@ -400,58 +576,59 @@ def edit_channel():
 
 @blueprint.route("/chat/channels/<channel_name>/search", methods=["POST"])
 @login_required
+@replica_reads
 def search_channel_messages(channel_name):
     """Search messages in a channel"""
     try:
         search_term = request.form.get('search', '').strip()
+        page = max(request.form.get('page', 1, type=int), 1)
         
         # Get channel
         channel = Channel.query.filter_by(name=channel_name).first()
-        if not channel:
+        if not channel or not channel.is_visible_to(current_user):
             return f"Channel {channel_name} not found", 404
-            
-        # Build search query
-        query = channel.messages
-        
-        # If search term exists, filter messages
+
+        next_search_page = None
         if search_term:
-            search_term = f"%{search_term}%"
-            query = query.filter(
-                db.or_(
-                    Chat.content.ilike(search_term),
-                    db.and_(
-                        Chat.author_id == User.id,
-                        db.or_(
-                            User.first_name.ilike(search_term),
-                            User.last_name.ilike(search_term)
-                        )
-                    )
-                )
-            ).order_by(Chat.created_at.desc())
-            messages = query.all()
-            messages = messages[::-1]  # Reverse to show in ascending order
-            has_more = False  # Don't show load more button in search results
+            messages, has_more = ChatSearchIndex.find_messages(
+                channel.id,
+                search_term,
+                limit=SEARCH_PAGE_SIZE,
+                offset=(page - 1) * SEARCH_PAGE_SIZE,
+            )
+            messages = messages[::-1]  # Best match last, next to the input
             oldest_id = None
+            if has_more:
+                next_search_page = page + 1
         else:
             # If no search term, return recent messages
-            messages = query.order_by(Chat.created_at.desc()).limit(10).all()
-            messages = messages[::-1]  # Reverse to show in ascending order
-            has_more = query.filter(Chat.id < messages[0].id).first() is not None if messages else False
+            messages, has_more = get_message_page(channel.id)
             oldest_id = messages[0].id if messages else None
-        
-        # Get total pin count for the channel
-        total_pin_count = Chat.query.filter_by(channel_id=channel.id, pinned=True).count()
+
+        Chat.prepare_formatted_content(messages)
+        hot = [message for message in messages if not message.archived]
+        Chat.prepare_likes(hot, current_user.id)
+        ChatReaction.prepare(hot, current_user.id)
+
+        # Further result pages are inserted above the first one and don't
+        # need the channel header data again
+        first_page = page == 1
+        total_pin_count = None
+        if first_page:
+            total_pin_count = channel.pinned_count
         
         return render_template(
             "chat/partials/message-list.html",
             chats=messages,
             current_user=current_user,
-            channel_description=channel.description,
+            channel_description=channel.description if first_page else None,
             ChatMessageState=ChatMessageState,
             has_more=has_more,
             oldest_id=oldest_id,
             channel_name=channel_name,
-            total_pin_count=total_pin_count
+            total_pin_count=total_pin_count,
+            search_term=search_term,
+            next_search_page=next_search_page,
         )
             
     except Exception as e:
@@ -461,54 +638,19 @@ def search_channel_messages(channel_name):
 
 @blueprint.route("/chat/channels/unread")
 @login_required
+@replica_reads
 def get_unread_channels():
-    """Get unread status for all channels"""
+    """Get unread status and counts for all channels"""
     try:
-        channels = Channel.query.all()
-        unread_status = {}
-        
-        # Debug information
-        current_app.logger.info(f"Getting unread status for user {current_user.id}")
-        
-        for channel in channels:
-            # Check if there are any messages in the channel
-            message_count = Chat.query.filter_by(channel_id=channel.id).count()
-            
-            if message_count == 0:
-                # No messages in the channel, so it can't be unread
-                unread_status[channel.name] = False
-                current_app.logger.info(f"Channel {channel.name} has no messages, marking as read")
-                continue
-                
-            # Get the latest message in the channel
-            latest_message = Chat.query.filter_by(channel_id=channel.id).order_by(Chat.id.desc()).first()
-            
-            # Get the last read state for this user and channel
-            last_read = ChatMessageState.query.filter_by(
-                user_id=current_user.id,
-                channel_id=channel.id,
-                interaction_type=InteractionType.READ
-            ).order_by(ChatMessageState.updated_at.desc()).first()
-            
-            # If no read state exists, the channel has unread messages
-            if not last_read or not last_read.data:
-                unread_status[channel.name] = True
-                current_app.logger.info(f"Channel {channel.name} has no read state, marking as unread")
-                continue
-                
-            # Get the ID of the last read message
-            last_read_id = last_read.data.get('last_read_message_id')
-            if last_read_id is None:
-                unread_status[channel.name] = True
-                current_app.logger.info(f"Channel {channel.name} has no last read message ID, marking as unread")
-                continue
-                
-            # Check if the latest message is newer than the last read message
-            has_unread = latest_message.id > last_read_id
-            unread_status[channel.name] = has_unread
-            current_app.logger.info(f"Channel {channel.name} unread status: {has_unread} (latest: {latest_message.id}, last read: {last_read_id})")
-            
-        return jsonify(unread_status)
+        unread_counts = ChatMessageState.get_unread_summary(
+            current_user.id, current_user.is_admin
+        )
+        return jsonify(
+            {
+                name: {"has_unread": unread_count > 0, "unread_count": unread_count}
+                for name, unread_count in unread_counts.items()
+            }
+        )
     except Exception as e:
         current_app.logger.error(f"Error getting unread channels: {str(e)}")
         current_app.logger.exception(e)
@@ -527,42 +669,9 @@ def mark_channel_read_endpoint(channel_name):
             current_app.logger.error(f"Channel {channel_name} not found")
             return jsonify({"error": f"Channel {channel_name} not found"}), 404
             
-        # Get the latest message in the channel
-        latest_message = Chat.query.filter_by(channel_id=channel.id).order_by(Chat.id.desc()).first()
-        if not latest_message:
-            current_app.logger.info(f"No messages in channel {channel_name}, nothing to mark as read")
-            return jsonify({"status": "success", "message": "No messages to mark as read"})
-            
-        current_app.logger.info(f"Latest message ID in channel {channel_name}: {latest_message.id}")
-            
-        # Get or create a read state for this user and channel
-        read_state = ChatMessageState.query.filter_by(
-            user_id=current_user.id,
-            channel_id=channel.id,
-            interaction_type=InteractionType.READ
-        ).first()
-        
-        if not read_state:
-            current_app.logger.info(f"Creating new read state for channel {channel_name}")
-            read_state = ChatMessageState(
-                user_id=current_user.id,
-                channel_id=channel.id,
-                message_id=latest_message.id,  # Associate with the latest message
-                interaction_type=InteractionType.READ,
-                data={'last_read_message_id': latest_message.id}
-            )
-            db.session.add(read_state)
-        else:
-            current_app.logger.info(f"Updating existing read state for channel {channel_name}")
-            current_app.logger.info(f"Previous last read message ID: {read_state.data.get('last_read_message_id')}")
-            # Don't change the message_id field to avoid unique constraint violation
-            # read_state.message_id = latest_message.id  <- This line was causing the issue
-            read_state.data = {'last_read_message_id': latest_message.id}
-            read_state.updated_at = datetime.utcnow()
-            
-        db.session.commit()
-        current_app.logger.info(f"Successfully marked channel {channel_name} as read")
-        
+        if not ChatMessageState.mark_channel_read(current_user.id, channel.id):
+            return jsonify({"error": "Failed to mark channel as read"}), 500
+
         return jsonify({"status": "success"})
     except Exception as e:
         db.session.rollback()
@@ -571,12 +680,89 @@ def mark_channel_read_endpoint(channel_name):
         return jsonify({"error": str(e)}), 500
 
 
+@blueprint.cli.command("rebuild-chat-search")
+def rebuild_chat_search():
+    """Rebuild the chat full-text search index from existing messages"""
+    if not ChatSearchIndex.enabled:
+        print("Chat search index is not available on this database")
+        return
+    print(f"Indexed {ChatSearchIndex.rebuild()} chat messages")
+
+
+@blueprint.cli.command("repair-channel-stats")
+def repair_channel_stats():
+    """Recompute channel message counts, last message and pin counts"""
+    print(f"Repaired statistics of {Channel.recount_stats()} channels")
+
+
+def run_purge_job(job):
+    """Run a claimed purge job in the foreground, printing its progress"""
+    label = f"#{job.channel_name}" if job.channel_name else "All channels"
+    action = "archived" if job.archive else "deleted"
+    try:
+        while job.run_batch(job.batch_size(current_app)):
+            print(f"{label}: {action} {job.deleted} of {job.total} messages")
+        job.finish()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception(f"Error running chat purge job {job.id}")
+        job.fail(e)
+        print(f"{label}: {e}, the job is now {job.status}")
+
+
+@blueprint.cli.command("purge-messages")
+@click.argument("days", type=click.IntRange(min=1, max=MAX_PURGE_DAYS))
+@click.option("--channel", help="Only purge this channel")
+def purge_messages_command(days, channel):
+    """Delete chat messages older than DAYS days, in batches"""
+    target = None
+    if channel:
+        target = Channel.query.filter_by(name=channel).first()
+        if not target:
+            print(f"Channel {channel} not found")
+            return
+    job = ChatPurgeJob.for_messages(utc_now() - timedelta(days=days), channel=target)
+    # Owned by this command from the start, so no background worker claims it
+    job.status = ChatPurgeJob.RUNNING
+    db.session.commit()
+    run_purge_job(job)
+    print(f"Purged {job.deleted} chat messages")
+
+
+@blueprint.cli.command("archive-messages")
+def archive_messages_command():
+    """Move messages past their channel's retention to the archive
+
+    Also runs any other purge waiting for a worker.
+    """
+    ChatPurgeJob.for_retention()
+    db.session.commit()
+    archived = 0
+    while (job := ChatPurgeJob.claim_next()) is not None:
+        run_purge_job(job)
+        if job.archive:
+            archived += job.deleted
+    print(f"Archived {archived} chat messages")
+
+
 # WebSocket event handlers
+@current_app.socketio.on("connect")
+def on_connect(auth=None):
+    """Join the user's personal room for unread badge updates"""
+    if current_user.is_authenticated:
+        join_room(user_room(current_user.id))
+
+
 @current_app.socketio.on("join")
 def on_join(data):
     """Join a chat channel"""
     channel = data.get("channel")
     if channel:
+        if not current_user.is_authenticated:
+            return
+        channel_obj = Channel.query.filter_by(name=channel).first()
+        if not channel_obj or not channel_obj.is_visible_to(current_user):
+            return
         join_room(channel)
         emit("status", {"msg": f"{current_user.first_name} has joined the channel."}, room=channel)
 
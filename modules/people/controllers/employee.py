@@ -31,6 +31,7 @@ from modules.people.models.employee import EmployeeStatus
 from modules.people.models.employee import EmployeeType
 from modules.people.models.employee import Gender
 from system.db.database import db
+from system.db.replica import replica_reads
 
 from . import blueprint
 
@@ -74,6 +75,7 @@ def dashboard():
 
 @blueprint.route("/employees")
 @login_required
+@replica_reads
 def employees():
     """Employees list page"""
     users = User.query.join(Employee).filter(User.email != "admin").all()
@@ -166,7 +168,7 @@ def edit_employee(employee_id):
     # Get admin count if the employee is an admin
     admin_count = 0
     if employee.user.is_admin:
-        admin_count = User.query.filter(User.groups.any(name="ADMIN")).count()
+        admin_count = Group.get_admin_count()
 
     return render_template(
         "employees/form.html",
@@ -190,12 +192,10 @@ def update_employee(employee_id):
 
         # Handle admin status changes
         is_admin = request.form.get("is_admin") == "on"
-        if user.is_admin and not is_admin:
-            # Count other admin users
-            admin_count = User.query.filter(User.groups.any(name="ADMIN")).count()
-            if admin_count <= 1:
-                flash("Cannot remove admin status from the only administrator", "error")
-                return redirect(url_for("people_bp.edit_employee", employee_id=employee_id))
+        # Count other admin users
+        if user.is_admin and not is_admin and Group.get_admin_count() <= 1:
+            flash("Cannot remove admin status from the only administrator", "error")
+            return redirect(url_for("people_bp.edit_employee", employee_id=employee_id))
 
         # Update admin status if changed
         if is_admin != user.is_admin:
@@ -12,6 +12,7 @@
 
 from .chat import Channel
 from .chat import Chat
+from .chat_reaction import ChatReaction
 from .employee import Employee
 
-__all__ = ["Channel", "Chat", "Employee"]
+__all__ = ["Channel", "Chat", "ChatReaction", "Employee"]
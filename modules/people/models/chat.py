@@ -12,18 +12,44 @@
 
 
 import re
-from enum import Enum
+from bisect import bisect_right
+from datetime import UTC
 from datetime import datetime
+from enum import Enum
 
 from flask import current_app
 from flask_login import current_user
 from markupsafe import Markup
+from sqlalchemy import event
 
+from modules.core.models.user import User
+from system.cache import MISSING
+from system.cache import LRUCache
 from system.db.database import db
 from system.db.decorators import ModelRegistry
 
 from .associations import chat_like
 
+# Unread counts pushed to sidebar badges are capped at this value
+UNREAD_BADGE_LIMIT = 99
+
+URL_PATTERN = re.compile(r'(https?://[^\s<>"]+|www\.[^\s<>"]+)')
+
+# Rendered message HTML keyed by chat id, holding (content hash, markup)
+_formatted_content_cache = LRUCache(maxsize=5000)
+
+
+def utc_now():
+    """Current UTC time as a naive datetime, as DateTime columns store it"""
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def _replace_url(match):
+    url = match.group(0)
+    display_url = url[:50] + "..." if len(url) > 50 else url
+    full_url = url if url.startswith(("http://", "https://")) else f"https://{url}"
+    return f'<a href="{full_url}" target="_blank" rel="noopener noreferrer" class="chat-link">{display_url}</a>'
+
 
 @ModelRegistry.register
 class Channel(db.Model):
@@ -35,6 +61,20 @@ class Channel(db.Model):
     created_by_id = db.Column(db.Integer, db.ForeignKey("user.id"))
     is_private = db.Column(db.Boolean, default=False)
 
+    # Statistics kept current by the Chat mapper events below; bulk changes
+    # to chat rows must call recount_stats
+    message_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    last_message_id = db.Column(db.Integer)
+    last_message_at = db.Column(db.DateTime)
+    pinned_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    # Set when the channel is deleted; its messages are purged in the background
+    deleted_at = db.Column(db.DateTime)
+
+    # Days messages stay in the chat table before they're archived, 0 keeps
+    # them forever and None uses the CHAT_RETENTION_DAYS setting
+    retention_days = db.Column(db.Integer)
+
     # Relationships
     created_by = db.relationship("User", foreign_keys=[created_by_id])
     messages = db.relationship("Chat", backref="channel", lazy="dynamic")
@@ -45,6 +85,87 @@ class Channel(db.Model):
         self.created_by_id = created_by_id
         self.is_private = is_private
 
+    @classmethod
+    def visibility_filter(cls, user_id, is_admin=False):
+        """Filter expression for the channels a user can see.
+
+        Private channels are visible to their creator and to administrators.
+        Deleted channels are visible to nobody.
+        """
+        if is_admin:
+            return cls.deleted_at.is_(None)
+        return db.and_(
+            cls.deleted_at.is_(None),
+            db.or_(cls.is_private.isnot(True), cls.created_by_id == user_id),
+        )
+
+    @classmethod
+    def visible_to(cls, user):
+        """Query the channels visible to a user"""
+        return cls.query.filter(cls.visibility_filter(user.id, user.is_admin))
+
+    def is_visible_to(self, user):
+        """Check if a user can see this channel"""
+        if self.deleted_at is not None:
+            return False
+        return not self.is_private or user.is_admin or self.created_by_id == user.id
+
+    def tombstone(self):
+        """Mark the channel deleted and free its name for a new channel
+
+        The caller is responsible for committing the session and for
+        scheduling the purge of the channel's messages.
+        """
+        self.deleted_at = utc_now()
+        # Channel names never contain spaces, so this can't clash with one
+        self.name = f"deleted channel {self.id}"
+
+    @classmethod
+    def stats_expressions(cls):
+        """Correlated subqueries computing each statistic from the chat table"""
+        in_channel = Chat.channel_id == cls.id
+        latest = db.select(Chat).where(in_channel).order_by(Chat.id.desc()).limit(1)
+        return {
+            "message_count": db.select(db.func.count(Chat.id)).where(in_channel).scalar_subquery(),
+            "last_message_id": latest.with_only_columns(Chat.id).scalar_subquery(),
+            "last_message_at": latest.with_only_columns(Chat.created_at).scalar_subquery(),
+            "pinned_count": db.select(db.func.count(Chat.id))
+            .where(in_channel, Chat.pinned.is_(True))
+            .scalar_subquery(),
+        }
+
+    @classmethod
+    def stats_update(cls, channel_id=None):
+        """UPDATE statement rewriting the statistics of channels where they're wrong"""
+        expressions = cls.stats_expressions()
+        # NULL-safe comparison, e.g. IS DISTINCT FROM on PostgreSQL
+        stale = db.or_(
+            *(
+                getattr(cls, name).is_distinct_from(expression)
+                for name, expression in expressions.items()
+            )
+        )
+        query = db.update(cls).where(stale).values(**expressions)
+        if channel_id is not None:
+            query = query.where(cls.id == channel_id)
+        return query
+
+    @classmethod
+    def recount_stats(cls, channel_id=None, commit=True):
+        """Recompute message statistics from the chat table
+
+        Args:
+            channel_id: Only repair this channel
+            commit: Commit the session, or leave it to the caller
+
+        Returns:
+            int: Number of channels whose statistics were wrong
+        """
+        repaired = db.session.execute(cls.stats_update(channel_id)).rowcount
+        if commit:
+            db.session.commit()
+        return repaired
+
     @classmethod
     def create_default_channels(cls):
         """Create default channels if they don't exist"""
@@ -54,11 +175,18 @@ class Channel(db.Model):
             {"name": "events", "description": "Company events and activities"},
         ]
 
-        for channel_data in default_channels:
-            channel = cls.query.filter_by(name=channel_data["name"]).first()
-            if not channel:
-                channel = cls(name=channel_data["name"], description=channel_data["description"])
-                db.session.add(channel)
+        existing = {
+            name
+            for (name,) in db.session.query(cls.name).filter(
+                cls.name.in_([data["name"] for data in default_channels])
+            )
+        }
+        missing = [data for data in default_channels if data["name"] not in existing]
+        if not missing:
+            return
+
+        for channel_data in missing:
+            db.session.add(cls(name=channel_data["name"], description=channel_data["description"]))
 
         try:
             db.session.commit()
@@ -77,6 +205,16 @@ class Chat(db.Model):
     channel_id = db.Column(db.Integer, db.ForeignKey("channel.id"), nullable=False)
     pinned = db.Column(db.Boolean, default=False)
 
+    # Keyset pagination walks a channel by id, newest first. Ids are never
+    # reused on SQLite, as archived messages keep theirs.
+    __table_args__ = (
+        db.Index("ix_chat_channel_id_id", "channel_id", "id"),
+        {"sqlite_autoincrement": True},
+    )
+
+    # Messages moved to the archive are served as read-only ArchivedChat
+    archived = False
+
     # Define relationships with backrefs here
     author = db.relationship(
         "User",
@@ -91,6 +229,33 @@ class Chat(db.Model):
         lazy="dynamic",
     )
 
+    @classmethod
+    def get_page(cls, channel_id, before_id=None, limit=10, pinned_only=False):
+        """Get one page of channel messages using keyset pagination.
+
+        Messages are walked by (channel_id, id) from newest to oldest, so the
+        cost of a page does not depend on how far back it is. One extra row is
+        fetched to tell whether older messages exist.
+
+        Args:
+            channel_id: Channel to read from
+            before_id: Only return messages older than this id
+            limit: Maximum number of messages to return
+            pinned_only: Only return pinned messages
+
+        Returns:
+            tuple: (messages in ascending order, has_more)
+        """
+        query = cls.query.filter(cls.channel_id == channel_id)
+        if pinned_only:
+            query = query.filter(cls.pinned.is_(True))
+        if before_id:
+            query = query.filter(cls.id < before_id)
+
+        rows = query.order_by(cls.id.desc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        return rows[:limit][::-1], has_more
+
     @property
     def created_at_formatted(self) -> str:
         """Format the creation date for display"""
@@ -104,7 +269,65 @@ class Chat(db.Model):
     @property
     def is_liked(self) -> bool:
         """Check if current user has liked this chat"""
-        return current_user.is_authenticated and current_user in self.liked_by
+        liked = self.__dict__.get("_is_liked")
+        if liked is None:
+            liked = current_user.is_authenticated and db.session.query(
+                db.exists().where(
+                    chat_like.c.chat_id == self.id, chat_like.c.user_id == current_user.id
+                )
+            ).scalar()
+        return liked
+
+    @property
+    def like_count(self) -> int:
+        """Number of users who liked this chat"""
+        count = self.__dict__.get("_like_count")
+        if count is None:
+            count = (
+                db.session.query(db.func.count())
+                .select_from(chat_like)
+                .filter(chat_like.c.chat_id == self.id)
+                .scalar()
+            )
+        return count
+
+    @property
+    def reactions(self) -> list:
+        """Reaction bar entries as (emoji, count, reacted by current user)"""
+        if "_reactions" not in self.__dict__:
+            from .chat_reaction import ChatReaction
+
+            ChatReaction.prepare([self], current_user.id if current_user.is_authenticated else None)
+        return self._reactions
+
+    @classmethod
+    def prepare_likes(cls, chats, user_id=None):
+        """Load like counts and the user's likes for a page of messages in one query
+
+        Args:
+            chats: Messages about to be rendered
+            user_id: User whose likes to mark, or None for renders shared by
+                several users
+
+        Returns:
+            list: The same messages with like_count and is_liked preloaded
+        """
+        if not chats:
+            return chats
+
+        rows = (
+            db.session.query(
+                chat_like.c.chat_id,
+                db.func.count(),
+                db.func.max(db.case((chat_like.c.user_id == user_id, 1), else_=0)),
+            )
+            .filter(chat_like.c.chat_id.in_([chat.id for chat in chats]))
+            .group_by(chat_like.c.chat_id)
+        )
+        likes = {chat_id: (count, bool(liked)) for chat_id, count, liked in rows}
+        for chat in chats:
+            chat._like_count, chat._is_liked = likes.get(chat.id, (0, False))
+        return chats
 
     def toggle_pin(self) -> bool:
         """Toggle pinned status"""
@@ -115,18 +338,91 @@ class Chat(db.Model):
     @property
     def formatted_content(self) -> Markup:
         """Format message content with clickable links"""
-        url_pattern = r'(https?://[^\s<>"]+|www\.[^\s<>"]+)'
+        rendered = self.__dict__.get("_formatted_content")
+        if rendered is None:
+            rendered = self.render_content(self.id, self.content)
+            self._formatted_content = rendered
+        return rendered
+
+    @staticmethod
+    def render_content(chat_id, content) -> Markup:
+        """Render message content to HTML, reusing the cached result when the
+        message hasn't changed since it was last rendered"""
+        content_hash = hash(content)
+        cached = _formatted_content_cache.get(chat_id)
+        if cached is not MISSING and cached[0] == content_hash:
+            return cached[1]
+
+        html = URL_PATTERN.sub(_replace_url, content)
+        rendered = Markup(html.replace("\n", "<br>"))
+        if chat_id is not None:
+            _formatted_content_cache.set(chat_id, (content_hash, rendered))
+        return rendered
+
+    @classmethod
+    def prepare_formatted_content(cls, chats):
+        """Render the content of a page of messages in one pass"""
+        for chat in chats:
+            chat._formatted_content = cls.render_content(chat.id, chat.content)
+        return chats
+
+
+@event.listens_for(Chat, "after_update")
+@event.listens_for(Chat, "after_delete")
+def invalidate_formatted_content(mapper, connection, target):
+    """Drop the rendered HTML of an edited or deleted message"""
+    _formatted_content_cache.delete(target.id)
+    target.__dict__.pop("_formatted_content", None)
 
-        def replace_url(match):
-            url = match.group(0)
-            display_url = url[:50] + "..." if len(url) > 50 else url
-            full_url = url if url.startswith(("http://", "https://")) else f"https://{url}"
-            return f'<a href="{full_url}" target="_blank" rel="noopener noreferrer" class="chat-link">{display_url}</a>'
 
-        content = re.sub(url_pattern, replace_url, self.content)
-        content = content.replace("\n", "<br>")
+@event.listens_for(Chat, "after_insert")
+def count_new_message(mapper, connection, target):
+    """Add a new message to its channel's statistics in the same transaction
 
-        return Markup(content)
+    The last message only moves forward, as concurrent posts may commit
+    out of id order.
+    """
+    newer = db.or_(Channel.last_message_id.is_(None), Channel.last_message_id < target.id)
+    created_at = db.select(Chat.created_at).where(Chat.id == target.id).scalar_subquery()
+    connection.execute(
+        db.update(Channel)
+        .where(Channel.id == target.channel_id)
+        # MySQL assigns in order, so last_message_at must still see the old id
+        .ordered_values(
+            (Channel.message_count, Channel.message_count + 1),
+            (Channel.last_message_at, db.case((newer, created_at), else_=Channel.last_message_at)),
+            (Channel.last_message_id, db.case((newer, target.id), else_=Channel.last_message_id)),
+            (Channel.pinned_count, Channel.pinned_count + (1 if target.pinned else 0)),
+        )
+    )
+
+
+@event.listens_for(Chat, "after_update")
+def count_pin_change(mapper, connection, target):
+    """Keep the channel's pinned count when a message is pinned or unpinned"""
+    added, _, deleted = db.inspect(target).attrs.pinned.history
+    if bool(added and added[0]) != bool(deleted and deleted[0]):
+        connection.execute(
+            db.update(Channel)
+            .where(Channel.id == target.channel_id)
+            .values(pinned_count=Channel.pinned_count + (1 if target.pinned else -1))
+        )
+
+
+@event.listens_for(Chat, "after_delete")
+def count_deleted_message(mapper, connection, target):
+    """Remove a deleted message from its channel's statistics"""
+    expressions = Channel.stats_expressions()
+    connection.execute(
+        db.update(Channel)
+        .where(Channel.id == target.channel_id)
+        .values(
+            message_count=Channel.message_count - 1,
+            last_message_id=expressions["last_message_id"],
+            last_message_at=expressions["last_message_at"],
+            pinned_count=Channel.pinned_count - (1 if target.pinned else 0),
+        )
+    )
 
 
 class InteractionType(Enum):
@@ -173,23 +469,8 @@ class ChatMessageState(db.Model):
     def get_unread_count(cls, user_id, channel_id):
         """Get number of unread messages in a channel for a user"""
         try:
-            last_read = cls.query.filter_by(
-                user_id=user_id,
-                channel_id=channel_id,
-                interaction_type=InteractionType.READ
-            ).order_by(cls.updated_at.desc()).first()
-            
-            if not last_read or not last_read.data:
-                return Chat.query.filter_by(channel_id=channel_id).count()
-            
-            last_read_id = last_read.data.get('last_read_message_id')
-            if last_read_id is None:
-                return Chat.query.filter_by(channel_id=channel_id).count()
-            
-            return Chat.query.filter(
-                Chat.channel_id == channel_id,
-                Chat.id > last_read_id
-            ).count()
+            last_read_id = ChannelReadCursor.get_last_read_id(user_id, channel_id)
+            return Chat.query.filter(Chat.channel_id == channel_id, Chat.id > last_read_id).count()
         except Exception as e:
             current_app.logger.error(f"Error getting unread count: {str(e)}")
             current_app.logger.exception(e)
@@ -199,96 +480,65 @@ class ChatMessageState(db.Model):
     def has_unread(cls, user_id, channel_id):
         """Check if a channel has any unread messages for a user"""
         try:
-            channel = Channel.query.get(channel_id)
-            current_app.logger.debug(f"Checking unread status for channel {channel.name} (ID: {channel_id}) for user {user_id}")
-            
-            # First check if there are any messages in the channel
-            message_count = Chat.query.filter_by(channel_id=channel_id).count()
-            current_app.logger.debug(f"Channel {channel.name} has {message_count} messages")
-            
-            if message_count == 0:
-                current_app.logger.debug(f"Channel {channel.name} has no messages, returning False")
+            channel = db.session.get(Channel, channel_id)
+            if channel is None or channel.last_message_id is None:
                 return False
-                
-            # Get the latest message in the channel
-            latest_message = Chat.query.filter_by(channel_id=channel_id).order_by(Chat.id.desc()).first()
-            current_app.logger.debug(f"Latest message ID in channel {channel.name}: {latest_message.id}")
-            
-            # Get the last read state for this user and channel
-            last_read = cls.query.filter_by(
-                user_id=user_id,
-                channel_id=channel_id,
-                interaction_type=InteractionType.READ
-            ).order_by(cls.updated_at.desc()).first()
-            
-            # If no read state exists, the channel has unread messages
-            if not last_read:
-                current_app.logger.debug(f"No read state exists for channel {channel.name}, returning True")
-                return True
-                
-            if not last_read.data:
-                current_app.logger.debug(f"Read state exists but has no data for channel {channel.name}, returning True")
-                return True
-            
-            # Get the ID of the last read message
-            last_read_id = last_read.data.get('last_read_message_id')
-            current_app.logger.debug(f"Last read message ID for channel {channel.name}: {last_read_id}")
-            
-            if last_read_id is None:
-                current_app.logger.debug(f"Last read message ID is None for channel {channel.name}, returning True")
-                return True
-            
-            # Check if the latest message is newer than the last read message
-            result = latest_message.id > last_read_id
-            current_app.logger.debug(f"Channel {channel.name} has unread messages: {result} (latest: {latest_message.id}, last read: {last_read_id})")
-            return result
+
+            return channel.last_message_id > ChannelReadCursor.get_last_read_id(user_id, channel_id)
         except Exception as e:
             current_app.logger.error(f"Error checking for unread messages: {str(e)}")
             current_app.logger.exception(e)
             return False  # Return False on error to avoid breaking the UI
 
+    @classmethod
+    def get_unread_summary(cls, user_id, is_admin=False):
+        """Get unread message counts for every channel in a single grouped query.
+
+        Each channel is joined with the user's read cursor and with the chat
+        rows past that cursor, so the whole sidebar costs one round trip.
+        Channels the user never read count all their messages, which is
+        taken from the channel's message count instead of scanning them.
+
+        Returns:
+            dict: Channel name -> number of unread messages (0 when read)
+        """
+        cursor = db.aliased(ChannelReadCursor)
+        rows = (
+            db.session.query(
+                Channel.name,
+                db.case(
+                    (cursor.last_read_message_id.is_(None), Channel.message_count),
+                    else_=db.func.count(Chat.id),
+                ),
+            )
+            .outerjoin(
+                cursor,
+                db.and_(cursor.channel_id == Channel.id, cursor.user_id == user_id),
+            )
+            .outerjoin(
+                Chat,
+                db.and_(
+                    Chat.channel_id == Channel.id,
+                    Chat.id > cursor.last_read_message_id,
+                ),
+            )
+            .filter(Channel.visibility_filter(user_id, is_admin))
+            .group_by(Channel.id, Channel.name, cursor.last_read_message_id)
+            .all()
+        )
+        return {name: unread_count for name, unread_count in rows}
+
     @classmethod
     def mark_channel_read(cls, user_id, channel_id):
         """Mark all messages in a channel as read for a user"""
         try:
-            channel = Channel.query.get(channel_id)
-            current_app.logger.debug(f"Marking channel {channel.name} (ID: {channel_id}) as read for user {user_id}")
-            
-            # Get the latest message in the channel
-            latest_message = Chat.query.filter_by(channel_id=channel_id).order_by(Chat.id.desc()).first()
-            if not latest_message:
-                current_app.logger.debug(f"No messages in channel {channel.name}, nothing to mark as read")
+            channel = db.session.get(Channel, channel_id)
+            latest_id = channel.last_message_id if channel else None
+            if latest_id is None:
                 return True  # No messages to mark as read
-                
-            current_app.logger.debug(f"Latest message ID in channel {channel.name}: {latest_message.id}")
-                
-            # Get or create a read state for this user and channel
-            read_state = cls.query.filter_by(
-                user_id=user_id,
-                channel_id=channel_id,
-                interaction_type=InteractionType.READ
-            ).first()
-            
-            if not read_state:
-                current_app.logger.debug(f"Creating new read state for channel {channel.name}")
-                read_state = cls(
-                    user_id=user_id,
-                    channel_id=channel_id,
-                    message_id=latest_message.id,  # Associate with the latest message
-                    interaction_type=InteractionType.READ,
-                    data={'last_read_message_id': latest_message.id}
-                )
-                db.session.add(read_state)
-            else:
-                current_app.logger.debug(f"Updating existing read state for channel {channel.name}")
-                current_app.logger.debug(f"Previous last read message ID: {read_state.data.get('last_read_message_id')}")
-                # Don't change the message_id field to avoid unique constraint violation
-                # read_state.message_id = latest_message.id  <- This line was causing the issue
-                read_state.data = {'last_read_message_id': latest_message.id}
-                read_state.updated_at = datetime.utcnow()
-                
+
+            ChannelReadCursor.advance(user_id, channel_id, latest_id)
             db.session.commit()
-            current_app.logger.debug(f"Successfully marked channel {channel.name} as read")
             return True
         except Exception as e:
             db.session.rollback()
@@ -298,38 +548,135 @@ class ChatMessageState(db.Model):
 
     @classmethod
     def mark_message_read(cls, user_id, message_id):
-        """Mark a specific message as read for a user"""
+        """Mark a specific message (and everything before it) as read for a user"""
         try:
-            # Get the message to get its channel_id
-            message = Chat.query.get(message_id)
+            message = db.session.get(Chat, message_id)
             if not message:
                 return False
 
-            # Check if we already have a read state for this user/message/type
-            existing = cls.query.filter_by(
-                user_id=user_id,
-                message_id=message_id,
-                channel_id=message.channel_id,
-                interaction_type=InteractionType.READ
-            ).first()
-
-            if existing:
-                # Update existing record
-                existing.data = {'last_read_message_id': message_id}
-                existing.updated_at = db.func.now()
-            else:
-                # Create new record
-                state = cls(
-                    user_id=user_id,
-                    message_id=message_id,
-                    channel_id=message.channel_id,
-                    interaction_type=InteractionType.READ,
-                    data={'last_read_message_id': message_id}
-                )
-                db.session.add(state)
-
+            ChannelReadCursor.advance(user_id, message.channel_id, message_id)
             return True
         except Exception as e:
             current_app.logger.error(f"Error marking message as read: {str(e)}")
             current_app.logger.exception(e)
             return False
+
+
+@ModelRegistry.register
+class ChannelReadCursor(db.Model):
+    """
+    Read position of a user in a channel.
+
+    One row per user/channel holding the id of the last message the user has
+    read; every message with a higher id in that channel is unread. This
+    replaces the per-message READ rows in chat_message_state, so posting a
+    message no longer writes a row for every user.
+    """
+
+    __tablename__ = "channel_read_cursor"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    channel_id = db.Column(db.Integer, db.ForeignKey("channel.id"), nullable=False)
+    last_read_message_id = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=db.func.now(), onupdate=db.func.now())
+
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "channel_id", name="unique_user_channel_cursor"),
+    )
+
+    @classmethod
+    def get_last_read_id(cls, user_id, channel_id):
+        """Get the last read message id, 0 if the user never read the channel"""
+        last_read_id = (
+            db.session.query(cls.last_read_message_id)
+            .filter_by(user_id=user_id, channel_id=channel_id)
+            .scalar()
+        )
+        return last_read_id or 0
+
+    @classmethod
+    def advance(cls, user_id, channel_id, message_id):
+        """Move the cursor forward to message_id (never backwards).
+
+        The caller is responsible for committing the session.
+        """
+        cursor = cls.query.filter_by(user_id=user_id, channel_id=channel_id).first()
+        if not cursor:
+            cursor = cls(user_id=user_id, channel_id=channel_id, last_read_message_id=message_id)
+            db.session.add(cursor)
+        elif message_id > cursor.last_read_message_id:
+            cursor.last_read_message_id = message_id
+        return cursor
+
+    @classmethod
+    def get_badge_counts(cls, channel, limit=UNREAD_BADGE_LIMIT):
+        """Get the unread count of a channel for every user who can see it.
+
+        Computed in one step for all users: the newest limit + 1 message ids
+        and every recipient's cursor are read with one query each, and
+        counts are derived in memory. Counts are capped at limit, so the
+        cost doesn't grow with channel history.
+
+        Returns:
+            dict: User id -> unread count, only for users with unread messages
+        """
+        message_ids = [
+            message_id
+            for (message_id,) in db.session.query(Chat.id)
+            .filter(Chat.channel_id == channel.id)
+            .order_by(Chat.id.desc())
+            .limit(limit + 1)
+        ][::-1]
+        if not message_ids:
+            return {}
+
+        recipients = (
+            db.session.query(User.id, cls.last_read_message_id)
+            .outerjoin(cls, db.and_(cls.user_id == User.id, cls.channel_id == channel.id))
+            .filter(User.is_active.is_(True))
+        )
+        if channel.is_private:
+            recipients = recipients.filter(
+                db.or_(User.id == channel.created_by_id, User.groups.any(name="ADMIN"))
+            )
+
+        counts = {}
+        for user_id, last_read_id in recipients:
+            unread = len(message_ids) - bisect_right(message_ids, last_read_id or 0)
+            if unread:
+                counts[user_id] = min(unread, limit)
+        return counts
+
+    @classmethod
+    def migrate_read_states(cls, batch_size=1000):
+        """Collapse legacy per-message READ rows in chat_message_state into cursors.
+
+        Each user/channel keeps the highest last_read_message_id found in its
+        READ rows; rows created by the old fan-out (last_read_message_id None)
+        carry no read position and are simply dropped. Safe to run repeatedly.
+
+        Returns:
+            int: Number of READ rows removed
+        """
+        read_states = ChatMessageState.query.filter_by(interaction_type=InteractionType.READ)
+        if not db.session.query(read_states.exists()).scalar():
+            return 0
+
+        positions = {}
+        for state in read_states.yield_per(batch_size):
+            last_read_id = (state.data or {}).get("last_read_message_id")
+            if last_read_id is None:
+                continue
+            key = (state.user_id, state.channel_id)
+            positions[key] = max(positions.get(key, 0), last_read_id)
+
+        for (user_id, channel_id), last_read_id in positions.items():
+            cls.advance(user_id, channel_id, last_read_id)
+
+        removed = read_states.delete(synchronize_session=False)
+        db.session.commit()
+        current_app.logger.info(
+            f"Migrated {removed} chat READ states into {len(positions)} read cursors"
+        )
+        return removed
@@ -0,0 +1,367 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Cold storage for old chat messages. Messages past their channel's
+#     retention are moved out of the chat table into gzip compressed JSON
+#     Lines segment files, which are written once and never modified. An
+#     index table records each segment's channel and id range, so message
+#     pages that scroll back past the hot window are served from the
+#     segments transparently.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import gzip
+import json
+import os
+from datetime import datetime
+from datetime import timedelta
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from modules.core.models.user import User
+from system.cache import MISSING
+from system.cache import LRUCache
+from system.db.database import db
+from system.db.decorators import ModelRegistry
+
+from .associations import chat_like
+from .chat import Channel
+from .chat import Chat
+from .chat import utc_now
+from .chat_reaction import ChatReaction
+
+# Segments are immutable, so decoded ones can be cached without invalidation
+_segment_cache = LRUCache(maxsize=64)
+
+# Longest retention in days, about a hundred years
+MAX_RETENTION_DAYS = 36500
+
+# Session info keys of segment files to clean up when the transaction ends
+WRITTEN_FILES = "archive_files_written"
+DISCARDED_FILES = "archive_files_discarded"
+
+
+@ModelRegistry.register
+class ChatArchiveSegment(db.Model):
+    """A compressed file of archived messages from one channel"""
+
+    __tablename__ = "chat_archive_segment"
+
+    id = db.Column(db.Integer, primary_key=True)
+    # No foreign key, segments are removed after their channel when it's deleted
+    channel_id = db.Column(db.Integer, nullable=False)
+    path = db.Column(db.String(255), nullable=False)
+    first_message_id = db.Column(db.Integer, nullable=False)
+    last_message_id = db.Column(db.Integer, nullable=False)
+    first_created_at = db.Column(db.DateTime)
+    last_created_at = db.Column(db.DateTime)
+    message_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=utc_now)
+
+    __table_args__ = (
+        db.Index("ix_chat_archive_segment_channel_last", "channel_id", "last_message_id"),
+    )
+
+    @classmethod
+    def write(cls, channel_id, chats):
+        """Write messages of one channel to a new segment
+
+        Likes and reaction counts are frozen into the segment. The segment
+        row is added to the session and the caller deletes the messages in
+        the same transaction; the file is removed again if it rolls back.
+
+        Args:
+            channel_id: Channel the messages belong to
+            chats: Messages to archive, in ascending id order
+        """
+        message_ids = [chat.id for chat in chats]
+        likes = dict(
+            db.session.query(chat_like.c.chat_id, db.func.count())
+            .filter(chat_like.c.chat_id.in_(message_ids))
+            .group_by(chat_like.c.chat_id)
+            .all()
+        )
+        reactions = {}
+        for message_id, emoji, count in db.session.query(
+            ChatReaction.message_id, ChatReaction.emoji, ChatReaction.count
+        ).filter(ChatReaction.message_id.in_(message_ids), ChatReaction.count > 0):
+            reactions.setdefault(message_id, {})[emoji] = count
+
+        segment = cls(
+            channel_id=channel_id,
+            path=os.path.join(str(channel_id), f"{chats[0].id}-{chats[-1].id}.jsonl.gz"),
+            first_message_id=chats[0].id,
+            last_message_id=chats[-1].id,
+            first_created_at=chats[0].created_at,
+            last_created_at=chats[-1].created_at,
+            message_count=len(chats),
+        )
+        segment._write_records(
+            {
+                "id": chat.id,
+                "author_id": chat.author_id,
+                "content": chat.content,
+                "created_at": chat.created_at.isoformat() if chat.created_at else None,
+                "like_count": likes.get(chat.id, 0),
+                "reactions": reactions.get(chat.id, {}),
+            }
+            for chat in chats
+        )
+        db.session.add(segment)
+        return segment
+
+    @property
+    def full_path(self):
+        return os.path.join(current_app.config["CHAT_ARCHIVE_DIR"], self.path)
+
+    def _write_records(self, records):
+        # Write next to the final name and rename, so readers never see a
+        # partial segment
+        os.makedirs(os.path.dirname(self.full_path), exist_ok=True)
+        temp_path = f"{self.full_path}.tmp"
+        with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(temp_path, self.full_path)
+        db.session.info.setdefault(WRITTEN_FILES, []).append(self.full_path)
+
+    def read(self):
+        """Records of the segment, in ascending id order"""
+        records = _segment_cache.get(self.full_path)
+        if records is MISSING:
+            with gzip.open(self.full_path, "rt", encoding="utf-8") as f:
+                records = [json.loads(line) for line in f if line.strip()]
+            _segment_cache.set(self.full_path, records)
+        return records
+
+    def discard(self):
+        """Delete the segment, removing its file once the transaction commits"""
+        db.session.info.setdefault(DISCARDED_FILES, []).append(self.full_path)
+        db.session.delete(self)
+
+    @classmethod
+    def get_messages(cls, channel_id, before_id=None, newer_than=None, limit=10):
+        """Get the newest archived messages of a channel in an id range
+
+        Segments are read newest first and reading stops as soon as the
+        remaining segments can't hold messages newer than those found.
+
+        Returns:
+            list: Up to limit ArchivedChat objects in descending id order
+        """
+        query = cls.query.filter(cls.channel_id == channel_id)
+        if before_id:
+            query = query.filter(cls.first_message_id < before_id)
+        if newer_than:
+            query = query.filter(cls.last_message_id > newer_than)
+
+        records = []
+        for segment in query.order_by(cls.last_message_id.desc()):
+            if len(records) >= limit and segment.last_message_id < records[-1]["id"]:
+                break
+            records.extend(
+                record
+                for record in segment.read()
+                if (not before_id or record["id"] < before_id)
+                and (not newer_than or record["id"] > newer_than)
+            )
+            records = sorted(records, key=lambda record: -record["id"])[:limit]
+        return ArchivedChat.from_records(channel_id, records)
+
+    @classmethod
+    def find_message(cls, message_id):
+        """Get an archived message by id, or None"""
+        segments = cls.query.filter(
+            cls.first_message_id <= message_id, cls.last_message_id >= message_id
+        )
+        for segment in segments:
+            for record in segment.read():
+                if record["id"] == message_id:
+                    return ArchivedChat.from_records(segment.channel_id, [record])[0]
+        return None
+
+    @classmethod
+    def _in_range(cls, channel_id=None, before=None):
+        query = cls.query
+        if channel_id is not None:
+            query = query.filter(cls.channel_id == channel_id)
+        if before is not None:
+            query = query.filter(cls.first_created_at < before)
+        return query
+
+    @classmethod
+    def count_messages(cls, channel_id=None, before=None):
+        """Number of archived messages a purge would delete, counting partly
+        affected segments in full"""
+        return (
+            cls._in_range(channel_id, before)
+            .with_entities(db.func.coalesce(db.func.sum(cls.message_count), 0))
+            .scalar()
+        )
+
+    @classmethod
+    def purge(cls, channel_id=None, before=None):
+        """Delete archived messages of a channel, or those older than a date
+
+        Segments entirely in range are deleted. Segments only partly older
+        than the date are replaced by a new segment holding the rest. The
+        caller is responsible for committing the session.
+
+        Returns:
+            int: Number of archived messages deleted
+        """
+        deleted = 0
+        for segment in cls._in_range(channel_id, before).all():
+            kept = []
+            if before is not None and segment.last_created_at >= before:
+                kept = [
+                    record
+                    for record in segment.read()
+                    if datetime.fromisoformat(record["created_at"]) >= before
+                ]
+                if len(kept) == segment.message_count:
+                    continue
+            if kept:
+                replacement = cls(
+                    channel_id=segment.channel_id,
+                    path=os.path.join(
+                        str(segment.channel_id), f"{kept[0]['id']}-{kept[-1]['id']}.jsonl.gz"
+                    ),
+                    first_message_id=kept[0]["id"],
+                    last_message_id=kept[-1]["id"],
+                    first_created_at=datetime.fromisoformat(kept[0]["created_at"]),
+                    last_created_at=segment.last_created_at,
+                    message_count=len(kept),
+                )
+                replacement._write_records(kept)
+                db.session.add(replacement)
+            deleted += segment.message_count - len(kept)
+            segment.discard()
+        return deleted
+
+
+def _remove_files(paths):
+    for path in paths:
+        _segment_cache.delete(path)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+@event.listens_for(Session, "after_commit")
+def remove_discarded_segments(session):
+    """Remove the files of segments deleted by the committed transaction"""
+    session.info.pop(WRITTEN_FILES, None)
+    _remove_files(session.info.pop(DISCARDED_FILES, []))
+
+
+@event.listens_for(Session, "after_rollback")
+def remove_written_segments(session):
+    """Remove the files of segments added by the rolled back transaction"""
+    session.info.pop(DISCARDED_FILES, None)
+    _remove_files(session.info.pop(WRITTEN_FILES, []))
+
+
+class ArchivedChat:
+    """
+    Read-only message served from an archive segment.
+
+    Provides what the message templates read from Chat. Likes and
+    reactions are the counts at the time the message was archived.
+    """
+
+    archived = True
+    pinned = False
+    is_liked = False
+
+    created_at_formatted = Chat.created_at_formatted
+    is_author = Chat.is_author
+    formatted_content = Chat.formatted_content
+    render_content = staticmethod(Chat.render_content)
+
+    def __init__(self, channel_id, record, author=None):
+        self.id = record["id"]
+        self.channel_id = channel_id
+        self.author_id = record["author_id"]
+        self.author = author
+        self.content = record["content"]
+        self.created_at = datetime.fromisoformat(record["created_at"])
+        self.like_count = record.get("like_count", 0)
+        self.reactions = ChatReaction.bar(record.get("reactions", {}), set())
+
+    @classmethod
+    def from_records(cls, channel_id, records):
+        """Build messages from segment records, loading their authors in one query"""
+        author_ids = {record["author_id"] for record in records if record["author_id"]}
+        authors = {}
+        if author_ids:
+            authors = {user.id: user for user in User.query.filter(User.id.in_(author_ids))}
+        return [cls(channel_id, record, authors.get(record["author_id"])) for record in records]
+
+
+def get_message_page(channel_id, before_id=None, limit=10, pinned_only=False):
+    """Get one page of channel messages, continuing into the archive
+
+    Works like Chat.get_page. Archived messages are merged in by id, so
+    scrolling back past the hot window keeps going without a seam.
+
+    Returns:
+        tuple: (messages in ascending order, has_more)
+    """
+    messages, has_more = Chat.get_page(
+        channel_id, before_id=before_id, limit=limit, pinned_only=pinned_only
+    )
+    if pinned_only:
+        # Pinned messages are never archived
+        return messages, has_more
+
+    # On a full page only archived messages newer than its oldest one matter
+    newer_than = messages[0].id if has_more else None
+    archived = ChatArchiveSegment.get_messages(
+        channel_id, before_id=before_id, newer_than=newer_than, limit=limit + 1
+    )
+    if not archived:
+        return messages, has_more
+
+    merged = sorted(messages + archived, key=lambda chat: -chat.id)
+    return merged[:limit][::-1], has_more or len(merged) > limit
+
+
+def retention_days(channel):
+    """Days a channel's messages stay hot, 0 when they're kept forever"""
+    days = channel.retention_days
+    if days is None:
+        days = current_app.config["CHAT_RETENTION_DAYS"]
+    # Values saved before retention was bounded would overflow the cutoff date
+    return min(days, MAX_RETENTION_DAYS)
+
+
+def retention_cutoffs():
+    """Channels with messages past their retention
+
+    Returns:
+        list: (channel, time before which messages are archived)
+    """
+    now = utc_now()
+    due = []
+    for channel in Channel.query.filter(Channel.deleted_at.is_(None)):
+        days = retention_days(channel)
+        if days <= 0:
+            continue
+        cutoff = now - timedelta(days=days)
+        expired = db.session.query(
+            Chat.query.filter(
+                Chat.channel_id == channel.id,
+                Chat.created_at < cutoff,
+                Chat.pinned.isnot(True),
+            ).exists()
+        ).scalar()
+        if expired:
+            due.append((channel, cutoff))
+    return due
@@ -0,0 +1,394 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Background purges of chat messages. Deleting a channel or purging old
+#     messages records a job that a background worker carries out in small
+#     batches, each in its own short transaction, so other users can keep
+#     posting while a large purge runs. Archiving messages past their
+#     channel's retention runs as the same kind of job, writing each batch
+#     to an archive segment before deleting it. Jobs live in the database,
+#     so they report progress to any process and resume after a restart.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import threading
+from datetime import timedelta
+
+from system.db.database import db
+from system.db.decorators import ModelRegistry
+from system.realtime import user_room
+
+from .associations import chat_like
+from .chat import Channel
+from .chat import ChannelReadCursor
+from .chat import Chat
+from .chat import ChatMessageState
+from .chat import utc_now
+from .chat_archive import ChatArchiveSegment
+from .chat_archive import retention_cutoffs
+from .chat_reaction import ChatReaction
+from .chat_search import ChatSearchIndex
+
+# Seconds without progress after which a running job is taken over, e.g.
+# when the process running it was stopped
+STALE_AFTER = 300
+
+# Times a job is run before an error marks it failed
+MAX_ATTEMPTS = 3
+
+# Largest age in days accepted for a purge, about a hundred years
+MAX_PURGE_DAYS = 36500
+
+
+@ModelRegistry.register
+class ChatPurgeJob(db.Model):
+    """A channel deletion, message purge or archival carried out in the background"""
+
+    __tablename__ = "chat_purge_job"
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    id = db.Column(db.Integer, primary_key=True)
+    # No foreign key, the job outlives the channel it deletes
+    channel_id = db.Column(db.Integer, index=True)
+    channel_name = db.Column(db.String(50))
+    delete_channel = db.Column(db.Boolean, nullable=False, default=False)
+    archive = db.Column(db.Boolean, nullable=False, default=False, server_default="0")
+    before = db.Column(db.DateTime)
+    status = db.Column(db.String(16), nullable=False, default=PENDING, index=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    deleted = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    created_by_id = db.Column(db.Integer, db.ForeignKey("user.id"))
+    created_at = db.Column(db.DateTime, default=utc_now)
+    updated_at = db.Column(db.DateTime, default=utc_now, onupdate=utc_now)
+    finished_at = db.Column(db.DateTime)
+
+    @classmethod
+    def for_channel(cls, channel, created_by_id=None):
+        """Tombstone a channel and schedule the purge of its messages
+
+        The caller is responsible for committing the session and then
+        starting the worker.
+        """
+        job = cls(
+            channel_id=channel.id,
+            channel_name=channel.name,
+            delete_channel=True,
+            created_by_id=created_by_id,
+        )
+        channel.tombstone()
+        return job._schedule()
+
+    @classmethod
+    def for_messages(cls, before, channel=None, created_by_id=None):
+        """Schedule the purge of messages older than a date
+
+        Args:
+            before: Messages created before this UTC time are purged
+            channel: Only purge this channel, or every channel if None
+            created_by_id: Admin who receives the progress updates
+        """
+        job = cls(
+            channel_id=channel.id if channel else None,
+            channel_name=channel.name if channel else None,
+            before=before,
+            created_by_id=created_by_id,
+        )
+        return job._schedule()
+
+    @classmethod
+    def for_retention(cls):
+        """Schedule archival for every channel with messages past its retention
+
+        Channels that already have archival waiting or running are skipped.
+
+        Returns:
+            list: The new jobs
+        """
+        busy = {
+            channel_id
+            for (channel_id,) in db.session.query(cls.channel_id).filter(
+                cls.archive.is_(True), cls.status.in_([cls.PENDING, cls.RUNNING])
+            )
+        }
+        return [
+            cls(
+                channel_id=channel.id, channel_name=channel.name, before=cutoff, archive=True
+            )._schedule()
+            for channel, cutoff in retention_cutoffs()
+            if channel.id not in busy
+        ]
+
+    def _schedule(self):
+        self.total = db.session.query(db.func.count(Chat.id)).filter(*self._criteria()).scalar()
+        if not self.archive:
+            self.total += ChatArchiveSegment.count_messages(self.channel_id, self.before)
+        db.session.add(self)
+        return self
+
+    @classmethod
+    def has_unfinished(cls):
+        """Check whether any job is waiting or running"""
+        return db.session.query(
+            cls.query.filter(cls.status.in_([cls.PENDING, cls.RUNNING])).exists()
+        ).scalar()
+
+    @classmethod
+    def claim_next(cls):
+        """Take the oldest waiting or abandoned job, or None when there is none
+
+        The status is switched with a conditional UPDATE, so when several
+        processes look for work each job is claimed by exactly one of them.
+        """
+        claimable = db.or_(
+            cls.status == cls.PENDING,
+            db.and_(
+                cls.status == cls.RUNNING,
+                cls.updated_at < utc_now() - timedelta(seconds=STALE_AFTER),
+            ),
+        )
+        while True:
+            job_id = db.session.query(cls.id).filter(claimable).order_by(cls.id).limit(1).scalar()
+            if job_id is None:
+                db.session.commit()
+                return None
+            claimed = db.session.execute(
+                db.update(cls)
+                .where(cls.id == job_id, claimable)
+                .values(status=cls.RUNNING, updated_at=utc_now())
+            ).rowcount
+            db.session.commit()
+            if claimed:
+                return db.session.get(cls, job_id)
+
+    def _criteria(self):
+        """Filter for the chat rows this job deletes"""
+        criteria = []
+        if self.channel_id is not None:
+            criteria.append(Chat.channel_id == self.channel_id)
+        if self.before is not None:
+            criteria.append(Chat.created_at < self.before)
+        if self.archive:
+            # Pinned messages stay in the channel
+            criteria.append(Chat.pinned.isnot(True))
+        return criteria
+
+    def run_batch(self, batch_size):
+        """Delete the next batch of messages and everything attached to them
+
+        Archival jobs first write the batch to an archive segment per channel.
+        Mapper events don't run for bulk deletes, so search entries, states,
+        reactions, likes and channel statistics are maintained here, in the
+        same transaction as the messages.
+
+        Returns:
+            int: Number of messages deleted, 0 once none are left
+        """
+        rows = Chat.query.filter(*self._criteria()).order_by(Chat.id).limit(batch_size).all()
+        message_ids = [chat.id for chat in rows]
+        if self.archive:
+            by_channel = {}
+            for chat in rows:
+                by_channel.setdefault(chat.channel_id, []).append(chat)
+            for channel_id, chats in by_channel.items():
+                ChatArchiveSegment.write(channel_id, chats)
+        if message_ids:
+            ChatSearchIndex.delete_messages(message_ids)
+            ChatMessageState.query.filter(ChatMessageState.message_id.in_(message_ids)).delete()
+            ChatReaction.query.filter(ChatReaction.message_id.in_(message_ids)).delete()
+            db.session.execute(chat_like.delete().where(chat_like.c.chat_id.in_(message_ids)))
+            Chat.query.filter(Chat.id.in_(message_ids)).delete()
+            if not self.delete_channel:
+                for channel_id in {chat.channel_id for chat in rows}:
+                    Channel.recount_stats(channel_id, commit=False)
+
+        self.deleted += len(message_ids)
+        self.updated_at = utc_now()
+        db.session.commit()
+        return len(message_ids)
+
+    def finish(self):
+        """Remove what's left of a deleted channel and mark the job done
+
+        Purges also delete the matching archived messages.
+        """
+        if self.delete_channel:
+            ChatMessageState.query.filter_by(channel_id=self.channel_id).delete()
+            ChatReaction.delete_for_channel(self.channel_id)
+            ChannelReadCursor.query.filter_by(channel_id=self.channel_id).delete()
+            ChatArchiveSegment.purge(channel_id=self.channel_id)
+            Channel.query.filter_by(id=self.channel_id).delete()
+        elif not self.archive:
+            self.deleted += ChatArchiveSegment.purge(channel_id=self.channel_id, before=self.before)
+        self.status = self.DONE
+        self.finished_at = utc_now()
+        db.session.commit()
+
+    def fail(self, error):
+        """Record that the job stopped with an error
+
+        The job is queued again until it has failed MAX_ATTEMPTS times. It
+        continues where it stopped, as each batch is committed on its own.
+        """
+        self.attempts += 1
+        self.error = str(error)
+        if self.attempts < MAX_ATTEMPTS:
+            self.status = self.PENDING
+        else:
+            self.status = self.FAILED
+            self.finished_at = utc_now()
+        db.session.commit()
+
+    def retry(self):
+        """Queue a failed job again with a fresh set of attempts
+
+        The caller is responsible for committing the session and then
+        starting the worker.
+
+        Returns:
+            bool: False if the job hasn't failed
+        """
+        if self.status != self.FAILED:
+            return False
+        self.status = self.PENDING
+        self.attempts = 0
+        self.error = None
+        self.finished_at = None
+        return True
+
+    def batch_size(self, app):
+        """Messages handled per transaction, one archive segment when archiving"""
+        if self.archive:
+            return app.config["CHAT_ARCHIVE_SEGMENT_SIZE"]
+        return app.config["CHAT_PURGE_BATCH_SIZE"]
+
+    @property
+    def progress(self):
+        """Share of the messages deleted so far, from 0 to 100"""
+        if self.status == self.DONE:
+            return 100
+        if not self.total:
+            return 0
+        return min(100, round(self.deleted * 100 / self.total))
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "channel": self.channel_name,
+            "delete_channel": self.delete_channel,
+            "archive": self.archive,
+            "before": self.before.isoformat() if self.before else None,
+            "status": self.status,
+            "total": self.total,
+            "deleted": self.deleted,
+            "progress": self.progress,
+            "error": self.error,
+            "attempts": self.attempts,
+        }
+
+
+class ChatPurgeWorker:
+    """
+    Runs purge jobs one at a time on a Socket.IO background task.
+
+    start() is safe to call from any request; it starts the task when it
+    isn't running, or makes the running task look for new jobs before it
+    stops.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._resume_lock = threading.Lock()
+        self._running = False
+        self._wake = False
+        self._resumed = False
+
+    def resume(self, app):
+        """Schedule archival and resume unfinished jobs, once per process
+
+        Called on the first request rather than at startup, so CLI commands
+        never start a worker that would stop with them mid-job. Errors are
+        logged rather than failing the request, and the next request tries
+        again.
+        """
+        # Requests arriving while another one resumes don't wait for it
+        if not self._resume_lock.acquire(blocking=False):
+            return
+        try:
+            if self._resumed:
+                return
+            if ChatPurgeJob.for_retention():
+                db.session.commit()
+            if ChatPurgeJob.has_unfinished():
+                self.start(app)
+            self._resumed = True
+        except Exception:
+            db.session.rollback()
+            app.logger.exception("Error resuming chat purges")
+        finally:
+            self._resume_lock.release()
+
+    def start(self, app):
+        """Process unfinished jobs in the background"""
+        with self._lock:
+            if self._running:
+                self._wake = True
+                return
+            self._running = True
+            self._wake = False
+        app.socketio.start_background_task(self._run, app)
+
+    def _run(self, app):
+        with app.app_context():
+            try:
+                while True:
+                    job = ChatPurgeJob.claim_next()
+                    if job is not None:
+                        self._process(app, job)
+                        continue
+                    with self._lock:
+                        if not self._wake:
+                            self._running = False
+                            return
+                        self._wake = False
+            except Exception:
+                with self._lock:
+                    self._running = False
+                db.session.rollback()
+                app.logger.exception("Chat purge worker stopped")
+            finally:
+                db.session.remove()
+
+    def _process(self, app, job):
+        batch_size = job.batch_size(app)
+        pause = app.config["CHAT_PURGE_BATCH_PAUSE"]
+        app.logger.info(f"Running chat purge job {job.id}")
+        try:
+            while job.run_batch(batch_size):
+                self._report(app, job)
+                app.socketio.sleep(pause)
+            job.finish()
+        except Exception as e:
+            db.session.rollback()
+            app.logger.exception(f"Error running chat purge job {job.id}")
+            job.fail(e)
+        self._report(app, job)
+
+    @staticmethod
+    def _report(app, job):
+        if job.created_by_id is not None:
+            app.socketio.emit("purge_progress", job.to_dict(), to=user_room(job.created_by_id))
+
+
+# Worker shared by the requests of this process
+chat_purge_worker = ChatPurgeWorker()
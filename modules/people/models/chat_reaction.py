@@ -0,0 +1,177 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Emoji reactions on chat messages. Each user's reactions to a message
+#     are kept in their REACTION row of chat_message_state, and a counter per
+#     message and emoji is updated in the same transaction, so reaction bars
+#     are rendered from the counters without reading per-user rows.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+from sqlalchemy.dialects import mysql
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects import sqlite
+
+from system.db.database import db
+from system.db.decorators import ModelRegistry
+
+from .chat import ChatMessageState
+from .chat import InteractionType
+
+# Emojis users can react with, in display order
+REACTION_EMOJIS = ["👍", "❤️", "😂", "🎉", "😮", "😢"]
+
+
+@ModelRegistry.register
+class ChatReaction(db.Model):
+    """Number of users who reacted to a message with an emoji"""
+
+    __tablename__ = "chat_reaction_count"
+
+    message_id = db.Column(db.Integer, db.ForeignKey("chat.id"), primary_key=True)
+    emoji = db.Column(db.String(16), primary_key=True)
+    channel_id = db.Column(db.Integer, db.ForeignKey("channel.id"), nullable=False, index=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def toggle(cls, user_id, message, emoji):
+        """Add the user's reaction to a message, or remove it if present
+
+        The caller is responsible for committing the session.
+
+        Returns:
+            tuple: (new count of the emoji on the message, whether the user
+                now reacts with it)
+        """
+        state = ChatMessageState.query.filter_by(
+            user_id=user_id, message_id=message.id, interaction_type=InteractionType.REACTION
+        ).first()
+        emojis = list((state.data or {}).get("emojis", [])) if state else []
+
+        reacted = emoji not in emojis
+        if reacted:
+            emojis.append(emoji)
+        else:
+            emojis.remove(emoji)
+
+        # Assign a new dict so the JSON change is detected
+        if emojis and state:
+            state.data = {"emojis": emojis}
+        elif emojis:
+            db.session.add(
+                ChatMessageState(
+                    user_id=user_id,
+                    message_id=message.id,
+                    channel_id=message.channel_id,
+                    interaction_type=InteractionType.REACTION,
+                    data={"emojis": emojis},
+                )
+            )
+        else:
+            db.session.delete(state)
+
+        return cls._add(message, emoji, 1 if reacted else -1), reacted
+
+    @classmethod
+    def _add(cls, message, emoji, delta):
+        """Apply a change to a counter in the database and return the new count
+
+        The counter is created or changed by a single upsert, so concurrent
+        first reactions with the same emoji can't both try to insert it.
+        """
+        dialect = db.session.get_bind().dialect.name
+        db.session.execute(cls._upsert(dialect, message, emoji, delta))
+
+        count = db.session.execute(
+            db.select(cls.count).where(cls.message_id == message.id, cls.emoji == emoji)
+        ).scalar()
+        if count <= 0:
+            db.session.execute(
+                db.delete(cls).where(cls.message_id == message.id, cls.emoji == emoji)
+            )
+        return max(count, 0)
+
+    @classmethod
+    def prepare(cls, chats, user_id=None):
+        """Load the reaction bars of a page of messages
+
+        Counters come from one query over the page's message ids and the
+        user's own reactions from one more, so the cost depends on the page
+        size only.
+
+        Args:
+            chats: Messages about to be rendered
+            user_id: User whose reactions to mark, or None for renders shared
+                by several users
+
+        Returns:
+            list: The same messages with reactions preloaded
+        """
+        if not chats:
+            return chats
+
+        message_ids = [chat.id for chat in chats]
+        counts = {}
+        for message_id, emoji, count in db.session.query(
+            cls.message_id, cls.emoji, cls.count
+        ).filter(cls.message_id.in_(message_ids), cls.count > 0):
+            counts.setdefault(message_id, {})[emoji] = count
+
+        mine = {}
+        if user_id is not None:
+            for message_id, data in db.session.query(
+                ChatMessageState.message_id, ChatMessageState.data
+            ).filter(
+                ChatMessageState.user_id == user_id,
+                ChatMessageState.message_id.in_(message_ids),
+                ChatMessageState.interaction_type == InteractionType.REACTION,
+            ):
+                mine[message_id] = set((data or {}).get("emojis", []))
+
+        for chat in chats:
+            chat._reactions = cls.bar(counts.get(chat.id, {}), mine.get(chat.id, set()))
+        return chats
+
+    @staticmethod
+    def bar(counts, mine):
+        """Reaction bar entries as (emoji, count, reacted by user), in display order"""
+        order = {emoji: index for index, emoji in enumerate(REACTION_EMOJIS)}
+        return [
+            (emoji, count, emoji in mine)
+            for emoji, count in sorted(counts.items(), key=lambda item: order.get(item[0], 99))
+        ]
+
+    @classmethod
+    def _upsert(cls, dialect, message, emoji, delta):
+        """INSERT of a counter that adds to the existing one on conflict"""
+        values = {
+            "message_id": message.id,
+            "emoji": emoji,
+            "channel_id": message.channel_id,
+            "count": delta,
+        }
+        if dialect in ("mysql", "mariadb"):
+            return mysql.insert(cls).values(values).on_duplicate_key_update(count=cls.count + delta)
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        return (
+            insert(cls)
+            .values(values)
+            .on_conflict_do_update(
+                index_elements=[cls.message_id, cls.emoji], set_={"count": cls.count + delta}
+            )
+        )
+
+    @classmethod
+    def delete_for_message(cls, message_id):
+        """Delete the counters of a message"""
+        cls.query.filter_by(message_id=message_id).delete()
+
+    @classmethod
+    def delete_for_channel(cls, channel_id):
+        """Delete the counters of all messages in a channel"""
+        cls.query.filter_by(channel_id=channel_id).delete()
@@ -0,0 +1,262 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Full-text search index for chat messages backed by an SQLite FTS5
+#     virtual table. The index is kept in sync with the chat table through
+#     SQLAlchemy mapper events and can be rebuilt from scratch.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+from flask import current_app
+from markupsafe import Markup
+from markupsafe import escape
+from sqlalchemy import bindparam
+from sqlalchemy import event
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from modules.core.models.user import User
+from system.db.database import db
+
+from .chat import Chat
+
+# Control characters used to mark highlighted terms in FTS5 snippets; they
+# can't appear in escaped HTML, so they're safe to swap for <mark> tags
+HIGHLIGHT_OPEN = "\x02"
+HIGHLIGHT_CLOSE = "\x03"
+
+AUTHOR_NAME_SQL = (
+    "(SELECT trim(coalesce(first_name, '') || ' ' || coalesce(last_name, '')) "
+    'FROM "user" WHERE id = :author_id)'
+)
+
+
+class ChatSearchIndex:
+    """
+    FTS5 index over chat content and author names.
+
+    The virtual table uses the chat id as its rowid so results map straight
+    back to Chat rows. On databases without FTS5 the index stays disabled
+    and callers fall back to a LIKE search.
+    """
+
+    TABLE = "chat_search"
+    enabled = False
+
+    @classmethod
+    def init(cls):
+        """Create the index if needed and backfill it from existing messages"""
+        if db.engine.dialect.name != "sqlite":
+            cls.enabled = False
+            return
+
+        exists = db.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": cls.TABLE},
+        ).first()
+        if exists:
+            cls.enabled = True
+            return
+
+        try:
+            db.session.execute(
+                text(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {cls.TABLE} USING fts5("
+                    "content, author_name, channel_id UNINDEXED, "
+                    "tokenize = 'unicode61 remove_diacritics 2')"
+                )
+            )
+            db.session.commit()
+        except OperationalError as e:
+            db.session.rollback()
+            cls.enabled = False
+            current_app.logger.warning(f"Chat search index disabled, FTS5 unavailable: {e}")
+            return
+
+        cls.enabled = True
+        cls.rebuild()
+
+    @classmethod
+    def rebuild(cls):
+        """Rebuild the whole index from the chat table
+
+        Returns:
+            int: Number of indexed messages
+        """
+        db.session.execute(text(f"DELETE FROM {cls.TABLE}"))
+        db.session.execute(
+            text(
+                f"INSERT INTO {cls.TABLE} (rowid, content, author_name, channel_id) "
+                "SELECT chat.id, chat.content, "
+                "trim(coalesce(u.first_name, '') || ' ' || coalesce(u.last_name, '')), "
+                "chat.channel_id "
+                'FROM chat LEFT OUTER JOIN "user" AS u ON u.id = chat.author_id'
+            )
+        )
+        db.session.commit()
+        return db.session.execute(text(f"SELECT count(*) FROM {cls.TABLE}")).scalar()
+
+    @staticmethod
+    def build_query(term):
+        """Turn free text into an FTS5 query matching every word as a prefix"""
+        words = [word.replace('"', '""') for word in term.split()]
+        return " ".join(f'"{word}"*' for word in words)
+
+    @classmethod
+    def search(cls, channel_id, term, limit=20, offset=0):
+        """Search a channel's messages, best matches first
+
+        Returns:
+            list: (chat_id, snippet) tuples with up to limit entries
+        """
+        query = cls.build_query(term)
+        if not query:
+            return []
+
+        rows = db.session.execute(
+            text(
+                f"SELECT rowid, snippet({cls.TABLE}, 0, :open, :close, '…', 24) "
+                f"FROM {cls.TABLE} "
+                f"WHERE {cls.TABLE} MATCH :query AND channel_id = :channel_id "
+                "ORDER BY rank LIMIT :limit OFFSET :offset"
+            ),
+            {
+                "open": HIGHLIGHT_OPEN,
+                "close": HIGHLIGHT_CLOSE,
+                "query": query,
+                "channel_id": channel_id,
+                "limit": limit,
+                "offset": offset,
+            },
+        ).all()
+        return [(chat_id, cls.highlight(snippet)) for chat_id, snippet in rows]
+
+    @classmethod
+    def find_messages(cls, channel_id, term, limit=20, offset=0):
+        """Get one page of ranked search results as Chat objects
+
+        Matching messages carry a highlighted search_snippet. Without FTS5 a
+        LIKE scan over content and author names is used instead, newest first.
+
+        Returns:
+            tuple: (messages, has_more)
+        """
+        if not cls.enabled:
+            pattern = f"%{term}%"
+            rows = (
+                Chat.query.outerjoin(User, Chat.author_id == User.id)
+                .filter(
+                    Chat.channel_id == channel_id,
+                    db.or_(
+                        Chat.content.ilike(pattern),
+                        User.first_name.ilike(pattern),
+                        User.last_name.ilike(pattern),
+                    ),
+                )
+                .order_by(Chat.id.desc())
+                .limit(limit + 1)
+                .offset(offset)
+                .all()
+            )
+            return rows[:limit], len(rows) > limit
+
+        results = cls.search(channel_id, term, limit=limit + 1, offset=offset)
+        has_more = len(results) > limit
+        results = results[:limit]
+
+        chats = {chat.id: chat for chat in Chat.query.filter(Chat.id.in_([r[0] for r in results]))}
+        messages = []
+        for chat_id, snippet in results:
+            chat = chats.get(chat_id)
+            if chat:
+                chat.search_snippet = snippet
+                messages.append(chat)
+        return messages, has_more
+
+    @staticmethod
+    def highlight(snippet):
+        """Escape a snippet and turn the match markers into <mark> tags"""
+        html = str(escape(snippet))
+        html = html.replace(HIGHLIGHT_OPEN, "<mark>").replace(HIGHLIGHT_CLOSE, "</mark>")
+        return Markup(html)
+
+    @classmethod
+    def delete_messages(cls, message_ids):
+        """Drop messages from the index before deleting them in bulk"""
+        if not cls.enabled or not message_ids:
+            return
+        db.session.execute(
+            text(f"DELETE FROM {cls.TABLE} WHERE rowid IN :ids").bindparams(
+                bindparam("ids", expanding=True)
+            ),
+            {"ids": list(message_ids)},
+        )
+
+
+@event.listens_for(Chat, "after_insert")
+def index_chat(mapper, connection, target):
+    """Add a new message to the search index"""
+    if not ChatSearchIndex.enabled:
+        return
+    connection.execute(
+        text(
+            f"INSERT INTO {ChatSearchIndex.TABLE} (rowid, content, author_name, channel_id) "
+            f"VALUES (:id, :content, coalesce({AUTHOR_NAME_SQL}, ''), :channel_id)"
+        ),
+        {
+            "id": target.id,
+            "content": target.content,
+            "author_id": target.author_id,
+            "channel_id": target.channel_id,
+        },
+    )
+
+
+@event.listens_for(Chat, "after_update")
+def reindex_chat(mapper, connection, target):
+    """Refresh a message in the search index when its text or author changes"""
+    if not ChatSearchIndex.enabled:
+        return
+    state = db.inspect(target)
+    if not any(
+        state.attrs[name].history.has_changes() for name in ("content", "author_id", "channel_id")
+    ):
+        return
+    connection.execute(
+        text(f"DELETE FROM {ChatSearchIndex.TABLE} WHERE rowid = :id"), {"id": target.id}
+    )
+    index_chat(mapper, connection, target)
+
+
+@event.listens_for(Chat, "after_delete")
+def unindex_chat(mapper, connection, target):
+    """Remove a deleted message from the search index"""
+    if not ChatSearchIndex.enabled:
+        return
+    connection.execute(
+        text(f"DELETE FROM {ChatSearchIndex.TABLE} WHERE rowid = :id"), {"id": target.id}
+    )
+
+
+@event.listens_for(User, "after_update")
+def reindex_author(mapper, connection, target):
+    """Keep author names in the index current when a user is renamed"""
+    if not ChatSearchIndex.enabled:
+        return
+    state = db.inspect(target)
+    if not (
+        state.attrs.first_name.history.has_changes() or state.attrs.last_name.history.has_changes()
+    ):
+        return
+    connection.execute(
+        text(
+            f"UPDATE {ChatSearchIndex.TABLE} SET author_name = coalesce({AUTHOR_NAME_SQL}, '') "
+            "WHERE rowid IN (SELECT id FROM chat WHERE author_id = :author_id)"
+        ),
+        {"author_id": target.id},
+    )
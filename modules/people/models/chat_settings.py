@@ -0,0 +1,36 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Settings of chat maintenance: background purges, retention and the
+#     message archive. Read from the environment unless the app config
+#     already sets them.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import os
+
+# Chat settings and their defaults. Values from the environment are
+# converted to the type of the default
+CHAT_SETTINGS = {
+    "CHAT_PURGE_BATCH_SIZE": 500,  # Messages deleted per transaction
+    "CHAT_PURGE_BATCH_PAUSE": 0.05,  # Seconds between batches
+    "CHAT_RETENTION_DAYS": 0,  # Days messages stay hot, 0 keeps them forever
+    "CHAT_ARCHIVE_DIR": "",  # Defaults to chat_archive in the instance folder
+    "CHAT_ARCHIVE_SEGMENT_SIZE": 1000,  # Messages per archive segment
+}
+
+
+def load_chat_config(app):
+    """Copy chat settings from the environment unless already configured"""
+    for key, default in CHAT_SETTINGS.items():
+        if key in app.config:
+            continue
+        value = os.environ.get(key)
+        app.config[key] = type(default)(value) if value is not None else default
+    if not app.config["CHAT_ARCHIVE_DIR"]:
+        app.config["CHAT_ARCHIVE_DIR"] = os.path.join(app.instance_path, "chat_archive")
@@ -14,7 +14,10 @@
 from datetime import datetime
 from enum import Enum
 
+from sqlalchemy import event
+
 from modules.core.models.user import User
+from modules.core.models.user_identity import invalidate_identity
 from system.db.database import db
 from system.db.decorators import ModelRegistry
 
@@ -104,7 +107,14 @@ class Employee(db.Model):
 
     @classmethod
     def create(
-        cls, email, password=None, first_name=None, last_name=None, is_admin=False, **kwargs
+        cls,
+        email,
+        password=None,
+        first_name=None,
+        last_name=None,
+        is_admin=False,
+        commit=True,
+        **kwargs,
     ):
         """
         Create new employee profile, creating user if needed
@@ -115,6 +125,8 @@ class Employee(db.Model):
             first_name (str, optional): User first name
             last_name (str, optional): User last name
             is_admin (bool, optional): Whether user is admin
+            commit (bool, optional): Commit the new records. Pass False to
+                create several employees in one transaction
             **kwargs: Additional employee fields
 
         Returns:
@@ -132,6 +144,7 @@ class Employee(db.Model):
                     first_name=first_name,
                     last_name=last_name,
                     is_admin=is_admin,
+                    commit=False,
                 )
 
             # Create employee profile with all possible fields
@@ -159,7 +172,8 @@ class Employee(db.Model):
             )
 
             db.session.add(employee)
-            db.session.commit()
+            if commit:
+                db.session.commit()
             return employee
 
         except Exception as e:
@@ -224,6 +238,25 @@ class Employee(db.Model):
             },
         ]
 
+        # Look up existing profiles in one query and create the rest in one transaction
+        existing = {
+            email
+            for (email,) in db.session.query(User.email)
+            .join(cls, cls.user_id == User.id)
+            .filter(User.email.in_([data["email"] for data in sample_employees]))
+        }
+        created = 0
         for employee_data in sample_employees:
-            if not cls.get_by_email(employee_data["email"]):
-                cls.create(**employee_data)
+            if employee_data["email"] not in existing:
+                cls.create(commit=False, **employee_data)
+                created += 1
+        if created:
+            db.session.commit()
+
+
+@event.listens_for(Employee, "after_insert")
+@event.listens_for(Employee, "after_update")
+@event.listens_for(Employee, "after_delete")
+def invalidate_employee_identity(mapper, connection, target):
+    """Keep the employee profile link of the user's cached identity current"""
+    invalidate_identity(target, target.user_id)
@@ -12,13 +12,22 @@
 # See the LICENSE file for details.
 # -----------------------------------------------------------------------------
 
-from system.db.database import db
+from flask import current_app
+
+from system.db.schema import ensure_autoincrement
+from system.db.schema import ensure_columns
+from system.db.schema import ensure_indexes
 from system.module.hooks import hookimpl
 
 from .controllers import blueprint
 from .hooks import PeopleHookSpecs
 from .models import Channel
+from .models import Chat
 from .models import Employee
+from .models.chat import ChannelReadCursor
+from .models.chat_purge import ChatPurgeJob
+from .models.chat_search import ChatSearchIndex
+from .models.chat_settings import load_chat_config
 
 
 class PeopleModule:
@@ -31,8 +40,10 @@ class PeopleModule:
 
     @hookimpl
     def init_database(self):
-        """Initialize database tables and create sample data"""
-        db.create_all()  # This will create only tables that haven't been created yet
+        """Create sample data and bring existing tables up to date"""
+        ensure_autoincrement(Chat)
+        ensure_indexes(Chat)  # create_all skips new indexes on existing tables
+        ensure_columns(Channel, ChatPurgeJob)
 
         # Create sample employees
         Employee.create_sample_employees()
@@ -40,6 +51,22 @@ class PeopleModule:
         # Create default channels
         Channel.create_default_channels()
 
+        # Collapse legacy per-message READ states into channel read cursors
+        ChannelReadCursor.migrate_read_states()
+
+        # Fill in channel statistics added to existing databases
+        Channel.recount_stats()
+
+    @hookimpl
+    def on_startup(self):
+        """Load the chat settings and enable the chat search index
+
+        Archival and unfinished purges are resumed on the first request, see
+        resume_chat_purges.
+        """
+        load_chat_config(current_app)
+        ChatSearchIndex.init()
+
     def register_specs(self, plugin_manager):
         """Register hook specifications and implementations"""
         plugin_manager.add_hookspecs(PeopleHookSpecs)
@@ -8,6 +8,13 @@ document.addEventListener('DOMContentLoaded', function() {
     // Get current user ID from meta tag
     const userIdMeta = document.querySelector('meta[name="user-id"]');
     const currentUserId = userIdMeta ? parseInt(userIdMeta.content) : null;
+    const isAdminMeta = document.querySelector('meta[name="user-is-admin"]');
+    const currentUserIsAdmin = isAdminMeta ? isAdminMeta.content === 'true' : false;
+    const labelsScript = document.getElementById('message-labels');
+    const messageLabels = labelsScript ? JSON.parse(labelsScript.textContent) : {};
+    
+    // Whether messages were pushed into the open channel since it was last marked read
+    let hasPushedMessages = false;
     
     console.log('Current user ID:', currentUserId);
     console.log('Initial channel:', currentChannel);
@@ -252,8 +259,8 @@ document.addEventListener('DOMContentLoaded', function() {
                 console.log('Received unread status:', data);
                 // Update unread indicators based on server response
                 for (const channelName in data) {
-                    console.log(`Channel ${channelName} unread status: ${data[channelName]}`);
-                    updateUnreadIndicator(channelName, data[channelName]);
+                    console.log(`Channel ${channelName} unread count: ${data[channelName].unread_count}`);
+                    updateUnreadIndicator(channelName, data[channelName].has_unread);
                 }
             })
             .catch(error => {
@@ -268,6 +275,7 @@ document.addEventListener('DOMContentLoaded', function() {
     // Channel switching
     window.switchChannel = function(channelName) {
         console.log(`Switching to channel: ${channelName}`);
+        markPushedMessagesRead(currentChannel);
         
         // Update current channel display
         document.getElementById('current-channel').textContent = channelName;
@@ -520,28 +528,171 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
     
+    // Messages pushed over the socket are rendered once for all viewers with
+    // their controls hidden; reveal the ones this user may use and drop the rest.
+    // This needs JavaScript because the same fragment is shared by every client.
+    function applyMessagePermissions(element) {
+        element.querySelectorAll('[data-requires-admin]').forEach(control => {
+            if (currentUserIsAdmin) {
+                control.classList.remove('d-none');
+            } else {
+                control.remove();
+            }
+        });
+        element.querySelectorAll('[data-requires-author]').forEach(control => {
+            if (currentUserIsAdmin || parseInt(control.dataset.requiresAuthor) === currentUserId) {
+                control.classList.remove('d-none');
+            } else {
+                control.remove();
+            }
+        });
+    }
+    
+    // Pushed messages are rendered in the source language for all viewers;
+    // translate the marked text and attributes into this user's language.
+    function localizeMessage(element) {
+        element.querySelectorAll('[data-i18n]').forEach(control => {
+            control.dataset.i18n.split(' ').forEach(attribute => {
+                if (attribute === 'text') {
+                    const text = control.textContent.trim();
+                    control.textContent = messageLabels[text] || text;
+                } else {
+                    const text = control.getAttribute(attribute);
+                    control.setAttribute(attribute, messageLabels[text] || text);
+                }
+            });
+        });
+    }
+    
+    // Turn a pushed HTML fragment into a message element ready for the page
+    function buildMessageElement(html) {
+        const template = document.createElement('template');
+        template.innerHTML = html.trim();
+        const element = template.content.querySelector('.message');
+        if (element) {
+            applyMessagePermissions(element);
+            localizeMessage(element);
+        }
+        return element;
+    }
+    
+    // Pushed messages only belong in the plain channel view, not in search or pin results
+    function isFilteredView() {
+        const pinFilter = document.querySelector('.pin-filter');
+        const searchInput = document.getElementById('chatSearch');
+        return (pinFilter && pinFilter.classList.contains('text-primary')) ||
+            (searchInput && searchInput.value.trim() !== '');
+    }
+    
+    function appendMessage(data) {
+        const chatMessages = document.querySelector('.chat-messages');
+        if (!chatMessages || isFilteredView() || document.getElementById(`message-${data.message_id}`)) {
+            return;
+        }
+        const element = buildMessageElement(data.html);
+        if (!element) return;
+        
+        const atBottom = chatMessages.scrollHeight - chatMessages.scrollTop - chatMessages.clientHeight < 80;
+        chatMessages.appendChild(element);
+        htmx.process(element);
+        element.querySelectorAll('[data-bs-toggle="tooltip"]').forEach(el => new bootstrap.Tooltip(el));
+        if (atBottom || data.author_id === currentUserId) {
+            scrollToBottom();
+        }
+        hasPushedMessages = true;
+    }
+    
+    function replaceMessage(data) {
+        const existing = document.getElementById(`message-${data.message_id}`);
+        const element = existing && buildMessageElement(data.html);
+        if (element) {
+            existing.replaceWith(element);
+            htmx.process(element);
+        }
+    }
+    
+    function removeMessage(data) {
+        const existing = document.getElementById(`message-${data.message_id}`);
+        if (existing) {
+            existing.remove();
+        }
+    }
+    
+    // Advance the read cursor for messages that arrived while the channel was open
+    function markPushedMessagesRead(channelName) {
+        if (hasPushedMessages) {
+            navigator.sendBeacon(`/people/chat/channels/${channelName}/mark_read`);
+            hasPushedMessages = false;
+        }
+    }
+    
+    window.addEventListener('pagehide', function() {
+        markPushedMessagesRead(currentChannel);
+    });
+    
     // WebSocket event handling
     socket.on('chat_changed', function(data) {
-        if (data.channel === currentChannel && data.type !== 'pin') {
-            const chatMessages = document.querySelector('.chat-messages');
-            if (chatMessages) {
+        if (data.channel !== currentChannel) return;
+        
+        switch (data.type) {
+            case 'message':
+                appendMessage(data);
+                break;
+            case 'pin':
+                replaceMessage(data);
+                updatePinCount(data.total_pin_count);
+                break;
+            case 'delete':
+                removeMessage(data);
+                updatePinCount(data.total_pin_count);
+                break;
+            default:
                 loadChannelMessages(currentChannel);
-            }
         }
     });
     
-    // Handle new messages for unread badges
-    socket.on('message_created', function(data) {
-        console.log('Message created event received:', data);
+    // Apply a new reaction count to the message's reaction bar. Counts are
+    // absolute, so the reacting tab can apply them too
+    function updateReaction(data) {
+        const bar = document.getElementById(`reactions-${data.message_id}`);
+        if (!bar) return;
+
+        let pill = bar.querySelector(`.reaction[data-emoji="${data.emoji}"]`);
+        if (data.count <= 0) {
+            if (pill) pill.remove();
+            return;
+        }
+        if (!pill) {
+            pill = document.createElement('button');
+            pill.className = 'btn btn-sm rounded-pill py-0 px-2 border reaction bg-light';
+            pill.dataset.emoji = data.emoji;
+            pill.setAttribute('hx-post', `/people/chat/messages/${data.message_id}/reactions`);
+            pill.setAttribute('hx-vals', JSON.stringify({ emoji: data.emoji }));
+            pill.setAttribute('hx-target', `#reactions-${data.message_id}`);
+            pill.setAttribute('hx-swap', 'outerHTML');
+            pill.append(`${data.emoji} `);
+            const count = document.createElement('span');
+            count.className = 'small reaction-count';
+            pill.appendChild(count);
+            bar.insertBefore(pill, bar.querySelector('.dropdown'));
+            htmx.process(pill);
+        }
+        pill.querySelector('.reaction-count').textContent = data.count;
+    }
+    
+    socket.on('reaction_update', function(data) {
+        if (data.channel === currentChannel) {
+            updateReaction(data);
+        }
+    });
+    
+    // Handle unread badge updates sent to this user's room
+    socket.on('badge_update', function(data) {
+        console.log('Badge update received:', data);
         
-        if (data.author_id !== currentUserId && data.channel !== currentChannel) {
-            console.log(`New message in channel ${data.channel} from user ${data.author_id}, updating unread indicator`);
-            updateUnreadIndicator(data.channel, true);
-        } else if (data.channel === currentChannel) {
-            console.log(`New message in current channel ${data.channel}, scrolling to bottom`);
-            scrollToBottom();
-        } else {
-            console.log(`New message from current user in channel ${data.channel}, no action needed`);
+        // Messages in the open channel are appended and read in place
+        if (data.channel !== currentChannel) {
+            updateUnreadIndicator(data.channel, data.unread_count > 0);
         }
     });
     
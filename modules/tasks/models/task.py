@@ -34,9 +34,9 @@ class Task(db.Model):
     def create_sample_data(cls):
         """Initialize sample tasks if table is empty"""
         if not cls.query.first():  # Only create if table is empty
-            cls.create("Review project requirements")
-            cls.create("Schedule team meeting")
-            cls.create("Update documentation")
+            names = ["Review project requirements", "Schedule team meeting", "Update documentation"]
+            db.session.add_all([cls(name=name) for name in names])
+            db.session.commit()
             print("Sample tasks created")
 
     @staticmethod
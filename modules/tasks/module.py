@@ -7,7 +7,6 @@
 #
 # Copyright (c) 2025 remarQable LLC
 
-from system.db.database import db
 from system.module.hooks import hookimpl
 
 
@@ -30,10 +29,9 @@ class TasksModule:
 
     @hookimpl
     def init_database(self):
-        """Initialize database tables and sample data"""
+        """Create sample data"""
         from .models.task import Task
 
-        db.create_all()
         try:
             Task.create_sample_data()
         except Exception as e:
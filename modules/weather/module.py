@@ -13,9 +13,6 @@
 
 from flask import Blueprint
 
-from system.db.database import db
-from system.module.hooks import hookimpl
-
 
 class WeatherModule:
     def __init__(self):
@@ -34,11 +31,6 @@ class WeatherModule:
 
         return [(blueprint, "/weather")]
 
-    @hookimpl
-    def init_database(self):
-        """Initialize database tables"""
-        db.create_all()
-
 
 # Create module instance
 module_instance = WeatherModule()
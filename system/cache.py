@@ -0,0 +1,168 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Small in-process cache with LRU eviction and optional expiry, shared by
+#     modules that need to memoize hot lookups without an external service.
+#     Caches can be registered on an invalidation bus that relays deletes to
+#     other processes over Redis pub/sub when one is configured.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# URL scheme that selects an in-process fakeredis server instead of Redis
+FAKEREDIS_SCHEME = "fakeredis://"
+
+_fake_redis_server = None
+
+# Returned by get() when a key is missing, so None can be cached as a value
+MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe LRU cache with an optional time-to-live per entry"""
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=MISSING):
+        """Get a cached value, or default if it is missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entry if full"""
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        """Remove a single entry if present"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def redis_from_url(url):
+    """Connect to Redis, or to a process-wide fakeredis server for fakeredis:// URLs
+
+    The redis and fakeredis packages are optional and imported on demand.
+    """
+    if url.startswith(FAKEREDIS_SCHEME):
+        import fakeredis
+
+        global _fake_redis_server
+        if _fake_redis_server is None:
+            _fake_redis_server = fakeredis.FakeServer()
+        return fakeredis.FakeRedis(server=_fake_redis_server)
+
+    import redis
+
+    return redis.Redis.from_url(url)
+
+
+class InvalidationBus:
+    """
+    Relays cache invalidations between processes.
+
+    Caches are registered by name. invalidate() always drops the local entry;
+    once connected to Redis it also publishes the key so every other process
+    drops its copy. Without a connection the bus is purely local and caches
+    rely on their TTL for changes made elsewhere.
+    """
+
+    def __init__(self, channel="sparq-cache"):
+        self.channel = channel
+        self.caches = {}
+        self.redis = None
+        self._redis_error = None
+        self._origin = uuid.uuid4().hex
+
+    def register(self, name, cache):
+        """Register a cache under a name shared by all processes"""
+        self.caches[name] = cache
+        return cache
+
+    def connect(self, url):
+        """Start publishing and listening for invalidations on a Redis server"""
+        self.redis = redis_from_url(url)
+        # fakeredis raises the errors of the redis package it builds on
+        from redis.exceptions import RedisError
+
+        self._redis_error = RedisError
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+        threading.Thread(target=self._listen, args=(pubsub,), daemon=True).start()
+
+    def invalidate(self, name, key=None):
+        """Drop a key, or the whole cache when key is None, here and in every connected process"""
+        self._delete(name, key)
+        if self.redis is None:
+            return
+        message = json.dumps({"origin": self._origin, "cache": name, "key": key})
+        try:
+            self.redis.publish(self.channel, message)
+        except self._redis_error as e:
+            logger.warning(f"Could not publish cache invalidation: {e}")
+
+    def _delete(self, name, key):
+        cache = self.caches.get(name)
+        if cache is None:
+            return
+        if key is None:
+            cache.clear()
+        else:
+            cache.delete(key)
+
+    def _listen(self, pubsub):
+        while True:
+            try:
+                message = pubsub.get_message(timeout=1.0)
+                if not message:
+                    continue
+                data = json.loads(message["data"])
+                if data["origin"] == self._origin:
+                    continue
+                # JSON turns tuple keys into lists
+                key = tuple(data["key"]) if isinstance(data["key"], list) else data["key"]
+                self._delete(data["cache"], key)
+            except (self._redis_error, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Cache invalidation listener error: {e}")
+                time.sleep(1)
+
+
+# Shared bus for caches of database rows
+invalidation_bus = InvalidationBus()
@@ -0,0 +1,41 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Ties cached database rows to transactions. Models queue the cache keys
+#     their writes touch, and the keys are invalidated once the transaction
+#     commits, so readers never repopulate a cache with uncommitted data.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.orm import object_session
+
+from system.cache import invalidation_bus
+
+PENDING_KEY = "pending_cache_invalidations"
+
+
+def invalidate_on_commit(target, cache_name, key):
+    """Invalidate a cache key when the transaction holding target commits"""
+    session = object_session(target)
+    if session is None:
+        invalidation_bus.invalidate(cache_name, key)
+        return
+    session.info.setdefault(PENDING_KEY, set()).add((cache_name, key))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    for cache_name, key in session.info.pop(PENDING_KEY, ()):
+        invalidation_bus.invalidate(cache_name, key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(PENDING_KEY, None)
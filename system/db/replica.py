@@ -0,0 +1,115 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Read replica routing. Views marked with replica_reads send their
+#     queries to the read-only replica bind, while writes, and every read
+#     after a write, go to the primary database. A user who committed a
+#     change keeps reading from the primary for a short window, so they
+#     always see their own writes despite replication lag.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app
+from flask import g
+from flask import has_request_context
+from flask import session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.sql.elements import TextClause
+
+# Bind key of the replica engine
+REPLICA_BIND = "replica"
+
+# Key in the user's session holding the time of their last commit
+LAST_WRITE_KEY = "db_wrote_at"
+
+
+def is_read(clause):
+    """Check whether a statement only reads data"""
+    if clause is None:
+        # Flushes and explicit connection requests
+        return False
+    if isinstance(clause, TextClause):
+        return clause.text.lstrip()[:6].upper() == "SELECT"
+    return bool(getattr(clause, "is_select", False))
+
+
+def wrote_recently():
+    """Check whether the current user committed within the read-your-writes window"""
+    if not has_request_context():
+        return False
+    window = current_app.config.get("REPLICA_READ_YOUR_WRITES", 0)
+    return time.time() - session.get(LAST_WRITE_KEY, 0) < window
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads of replica_reads views to the replica bind.
+
+    A statement goes to the replica only when it is a read, the view opted
+    in, a replica is configured, this session hasn't written anything, and
+    the user hasn't committed recently. Everything else uses the normal
+    binds.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._routes_to_replica(clause):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _routes_to_replica(self, clause):
+        if not is_read(clause):
+            # Keep reading from the primary once anything was written
+            self.info["wrote"] = True
+            return False
+        return (
+            g.get("use_replica", False)
+            and not self.info.get("wrote")
+            and REPLICA_BIND in self._db.engines
+            and not wrote_recently()
+        )
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def remember_write(db_session):
+    """Start the user's read-your-writes window after committing a write"""
+    if (
+        db_session.info.get("wrote")
+        and has_request_context()
+        and REPLICA_BIND in db_session._db.engines
+    ):
+        session[LAST_WRITE_KEY] = time.time()
+
+
+def replica_reads(f):
+    """Decorator to serve a read-heavy view's queries from the replica"""
+
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        g.use_replica = True
+        try:
+            return f(*args, **kwargs)
+        finally:
+            g.use_replica = False
+
+    return decorated_function
+
+
+@contextmanager
+def primary_reads():
+    """Read from the primary inside a replica_reads view, e.g. before an update"""
+    previous = g.get("use_replica", False)
+    g.use_replica = False
+    try:
+        yield
+    finally:
+        g.use_replica = previous
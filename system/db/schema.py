@@ -0,0 +1,89 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Schema helpers for bringing existing databases in line with the models.
+#     db.create_all() only creates missing tables; these helpers add the
+#     pieces it skips on tables that already exist.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import re
+
+from sqlalchemy import text
+from sqlalchemy.schema import CreateTable
+
+from .database import db
+
+
+def ensure_indexes(*models):
+    """Create indexes declared on the given models if they are missing"""
+    for model in models:
+        for index in model.__table__.indexes:
+            index.create(db.engine, checkfirst=True)
+
+
+def ensure_columns(*models):
+    """Add columns declared on the given models that their tables are missing
+
+    New columns on existing tables need a server_default when they are not
+    nullable, so existing rows get a value.
+    """
+    inspector = db.inspect(db.engine)
+    for model in models:
+        table = model.__table__
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = (
+                f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" '
+                f"{column.type.compile(dialect=db.engine.dialect)}"
+            )
+            if column.server_default is not None:
+                ddl += f" DEFAULT '{column.server_default.arg}'"
+                if not column.nullable:
+                    ddl += " NOT NULL"
+            with db.engine.begin() as connection:
+                connection.execute(text(ddl))
+
+
+def ensure_autoincrement(*models):
+    """Rebuild SQLite tables that miss the AUTOINCREMENT their model declares
+
+    Without it SQLite hands out the ids of deleted rows at the end of a
+    table again. Models opt in with sqlite_autoincrement=True; the rows are
+    copied with their ids into a table created from the model, which then
+    replaces the old one, and the indexes are created again.
+    """
+    if db.engine.dialect.name != "sqlite":
+        return
+    for model in models:
+        table = model.__table__
+        if not table.kwargs.get("sqlite_autoincrement"):
+            continue
+        with db.engine.begin() as connection:
+            ddl = connection.execute(
+                text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": table.name},
+            ).scalar()
+            if ddl is None or re.search(r"\bAUTOINCREMENT\b", ddl, re.IGNORECASE):
+                continue
+            # Built next to the model's table so its foreign keys resolve
+            rebuilt = table.to_metadata(table.metadata, name=f"{table.name}_rebuild")
+            table.metadata.remove(rebuilt)
+            connection.execute(CreateTable(rebuilt))
+            columns = ", ".join(f'"{column.name}"' for column in table.columns)
+            connection.execute(
+                text(
+                    f'INSERT INTO "{rebuilt.name}" ({columns}) SELECT {columns} FROM "{table.name}"'
+                )
+            )
+            connection.execute(text(f'DROP TABLE "{table.name}"'))
+            connection.execute(text(f'ALTER TABLE "{rebuilt.name}" RENAME TO "{table.name}"'))
+            for index in table.indexes:
+                index.create(connection)
@@ -12,60 +12,316 @@
 # -----------------------------------------------------------------------------
 import json
 import os
+import pickle
+import re
+import tempfile
+import threading
+import time
 from datetime import datetime
 
 from flask import current_app
 from flask import g
 
-# Store translations in memory
+# Store translations in memory, as loaded from the language files:
+# lang -> module -> strings
 TRANSLATIONS = {}
 
+# Parsed language files: (module, lang) -> (mtime_ns, size, strings)
+SOURCES = {}
 
-def preload_translations():
-    """Load all module translations into memory at startup"""
-    global TRANSLATIONS
-    TRANSLATIONS = {}
+# Bumped when the layout of the translation cache file changes
+CACHE_VERSION = 1
+
+# Merged string catalogs with core fallbacks applied: (lang, module) -> strings
+CATALOGS = {}
+
+# Compiled formatting patterns: (lang, module) -> FormatPatterns
+FORMATS = {}
+
+# Translation functions bound to a catalog: (lang, module) -> function
+TRANSLATORS = {}
+
+# Date pattern tokens and their strftime equivalents, longest first
+DATE_TOKENS = {
+    "YYYY": "%Y",
+    "MMMM": "%B",
+    "MMM": "%b",
+    "MM": "%m",
+    "DD": "%d",
+    "HH": "%H",
+    "mm": "%M",
+}
+# Tokens, or literal text in square brackets
+DATE_TOKEN_PATTERN = re.compile(r"\[([^\]]*)\]|" + "|".join(DATE_TOKENS))
+
+
+def compile_date_pattern(pattern):
+    """Convert a date pattern such as DD [de] MMMM to a strftime format"""
+
+    def replace(match):
+        if match.group(1) is not None:
+            return match.group(1).replace("%", "%%")
+        return DATE_TOKENS[match.group()]
+
+    return DATE_TOKEN_PATTERN.sub(replace, pattern)
+
+
+class FormatPatterns:
+    """Formatting rules of one catalog, converted once for direct use"""
+
+    def __init__(self, meta):
+        self.meta = meta
+        self.date_formats = {
+            format_type: compile_date_pattern(pattern)
+            for format_type, pattern in meta.get("date_formats", {}).items()
+        }
+        number_formats = meta.get("number_formats", {})
+        # Swap both separators in a single pass so they can't collide
+        self.number_table = str.maketrans(
+            {
+                ",": number_formats.get("thousand_separator", ","),
+                ".": number_formats.get("decimal_separator", "."),
+            }
+        )
+
+
+# Used for languages without formatting rules
+DEFAULT_FORMATS = FormatPatterns({})
+
+
+def _scan_language_files(root):
+    """Find every module language file with its modification stamp
 
-    modules_path = os.path.join(current_app.root_path, "modules")
+    Returns:
+        dict: (module, lang) -> (path, mtime_ns, size)
+    """
+    files = {}
+    modules_path = os.path.join(root, "modules")
 
     for module_name in os.listdir(modules_path):
-        module_path = os.path.join(modules_path, module_name)
-        if not os.path.isdir(module_path):
+        module_lang_path = os.path.join(modules_path, module_name, "lang")
+        if not os.path.isdir(module_lang_path):
             continue
 
-        module_lang_path = os.path.join(module_path, "lang")
+        for lang_file in os.listdir(module_lang_path):
+            if lang_file.endswith(".json"):
+                lang_code = lang_file.replace(".json", "")
+                file_path = os.path.join(module_lang_path, lang_file)
+                stat = os.stat(file_path)
+                files[(module_name, lang_code)] = (file_path, stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def _cache_path():
+    return current_app.config.get(
+        "TRANSLATION_CACHE_FILE", os.path.join(current_app.instance_path, "translations.cache")
+    )
+
+
+def _read_cache(path, stamps):
+    """Load compiled catalogs if they were built from exactly these files"""
+    try:
+        with open(path, "rb") as f:
+            cached = pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError, AttributeError):
+        return None
+    if not isinstance(cached, dict) or cached.get("version") != CACHE_VERSION or cached.get("stamps") != stamps:
+        return None
+    return cached
+
+
+def _write_cache(path, stamps):
+    """Save sources and compiled catalogs, replacing the old file atomically"""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(
+                {
+                    "version": CACHE_VERSION,
+                    "stamps": stamps,
+                    "sources": {key: strings for key, (_, _, strings) in SOURCES.items()},
+                    "catalogs": CATALOGS,
+                    "formats": FORMATS,
+                },
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp_path, path)
+    except OSError as e:
+        current_app.logger.warning(f"Could not write translation cache: {e}")
+
+
+def _install_sources(sources):
+    """Make parsed language files the active translations"""
+    global SOURCES, TRANSLATIONS
+    translations = {}
+    for (module_name, lang_code), (_, _, strings) in sorted(sources.items()):
+        translations.setdefault(lang_code, {})[module_name] = strings
+    SOURCES, TRANSLATIONS = sources, translations
+
+
+def preload_translations():
+    """Load all module translations into memory at startup
+
+    Compiled catalogs are read from the translation cache when no language
+    file changed since it was written; otherwise the JSON files are parsed
+    and the cache is rebuilt.
+    """
+    global CATALOGS, FORMATS, TRANSLATORS
+    files = _scan_language_files(current_app.root_path)
+    stamps = {key: (mtime, size) for key, (_, mtime, size) in files.items()}
+    cache_path = _cache_path()
+
+    cached = _read_cache(cache_path, stamps)
+    if cached:
+        _install_sources(
+            {key: stamps[key] + (strings,) for key, strings in cached["sources"].items()}
+        )
+        CATALOGS, FORMATS, TRANSLATORS = cached["catalogs"], cached["formats"], {}
+        return
+
+    sources = {}
+    for key, (file_path, mtime, size) in files.items():
+        with open(file_path, "r", encoding="utf-8") as f:
+            sources[key] = (mtime, size, json.load(f))
+    _install_sources(sources)
+    build_catalogs()
+    _write_cache(cache_path, stamps)
+
+
+def reload_translations():
+    """Reload language files changed since they were last read
+
+    Only changed files are parsed. The new catalogs replace the old ones in
+    one step, so requests keep using a complete set throughout. A file that
+    fails to parse, e.g. while it is being saved, is retried on the next call.
+
+    Returns:
+        list: (module, lang) keys of the reloaded or removed files
+    """
+    files = _scan_language_files(current_app.root_path)
+    sources = {key: source for key, source in SOURCES.items() if key in files}
+    changed = [key for key in SOURCES if key not in files]
+
+    for key, (file_path, mtime, size) in files.items():
+        if SOURCES.get(key, (None, None))[:2] == (mtime, size):
+            continue
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                sources[key] = (mtime, size, json.load(f))
+            changed.append(key)
+        except (OSError, ValueError) as e:
+            current_app.logger.warning(f"Could not reload {file_path}: {e}")
+
+    if changed:
+        _install_sources(sources)
+        build_catalogs()
+        _write_cache(_cache_path(), {key: source[:2] for key, source in SOURCES.items()})
+        current_app.logger.info(f"Reloaded translations: {sorted(changed)}")
+    return changed
+
 
-        if os.path.isdir(module_lang_path):
-            for lang_file in os.listdir(module_lang_path):
-                if lang_file.endswith(".json"):
-                    lang_code = lang_file.replace(".json", "")
-                    file_path = os.path.join(module_lang_path, lang_file)
+def start_translation_watcher(app, interval=2.0):
+    """Poll the language files in the background and reload changes"""
 
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        TRANSLATIONS.setdefault(lang_code, {}).setdefault(module_name, {}).update(
-                            json.load(f)
-                        )
+    def watch():
+        while True:
+            time.sleep(interval)
+            try:
+                with app.app_context():
+                    reload_translations()
+            except Exception:
+                # Keep watching; files that fail to parse are handled above
+                app.logger.exception("Translation watcher error")
+
+    threading.Thread(target=watch, name="translation-watcher", daemon=True).start()
+
+
+def build_catalogs():
+    """Merge TRANSLATIONS into flat per-(lang, module) catalogs
+
+    Each module catalog starts from the core strings and is overlaid with
+    the module's own nonempty strings, so a lookup is a single dict access.
+    """
+    global CATALOGS, FORMATS, TRANSLATORS
+    catalogs = {}
+    formats = {}
+
+    for lang, modules in TRANSLATIONS.items():
+        core = modules.get("core", {})
+        core_strings = {k: v for k, v in core.items() if k != "_meta" and v}
+        core_meta = core.get("_meta", {})
+
+        catalogs[(lang, "core")] = core_strings
+        formats[(lang, "core")] = FormatPatterns(core_meta)
+
+        for module_name, strings in modules.items():
+            if module_name == "core":
+                continue
+            catalog = dict(core_strings)
+            catalog.update((k, v) for k, v in strings.items() if k != "_meta" and v)
+            catalogs[(lang, module_name)] = catalog
+
+            meta = dict(core_meta)
+            meta.update((k, v) for k, v in strings.get("_meta", {}).items() if v)
+            formats[(lang, module_name)] = FormatPatterns(meta)
+
+    # Swap in complete tables so concurrent requests never see a partial build
+    CATALOGS, FORMATS, TRANSLATORS = catalogs, formats, {}
+
+
+def _current_lang():
+    return g.get("lang") or current_app.config.get("DEFAULT_LANGUAGE", "en")
+
+
+def _current_module():
+    return (g.get("current_module") or {}).get("name", "core").lower()
+
+
+def untranslated(text):
+    """Translator of languages without a catalog"""
+    return text
+
+
+def get_translator(lang=None, module=None):
+    """Get a translation function for a language and module
+
+    Defaults to the current request's language and module. The function
+    looks strings up in a prebuilt catalog and returns the original text
+    when no translation exists. Languages without a catalog, such as an
+    arbitrary lang query parameter, use the default language instead, so
+    only known languages get a translator cached.
+    """
+    lang = lang or _current_lang()
+    module = module or _current_module()
+    if (lang, "core") not in CATALOGS:
+        lang = current_app.config.get("DEFAULT_LANGUAGE", "en")
+        if (lang, "core") not in CATALOGS:
+            return untranslated
+
+    translator = TRANSLATORS.get((lang, module))
+    if translator is None:
+        catalog = CATALOGS.get((lang, module)) or CATALOGS[(lang, "core")]
+        lookup = catalog.get
+
+        def translator(text):
+            return lookup(text, text)
+
+        TRANSLATORS[(lang, module)] = translator
+    return translator
+
+
+def bind_translator():
+    """Bind the translator for the current request's language and module to g"""
+    g.translator = get_translator()
+    return g.translator
 
 
 def translate(text):
     """Custom translation function"""
-    lang = g.get("lang", current_app.config.get("DEFAULT_LANGUAGE", "en"))
-    current_module = g.get("current_module", {}).get("name", "core").lower()
-
-    # If we're not in the core module, try the module-specific translation
-    if current_module != "core":
-        module_trans = TRANSLATIONS.get(lang, {}).get(current_module, {}).get(text)
-        # Only use module translation if it's nonempty
-        if module_trans is not None and module_trans != "":
-            return module_trans
-
-    # Fallback to core translation
-    core_trans = TRANSLATIONS.get(lang, {}).get("core", {}).get(text)
-    if core_trans is not None and core_trans != "":
-        return core_trans
-
-    # Finally, return the original text if no translation is found.
-    return text
+    translator = g.get("translator") or bind_translator()
+    return translator(text)
 
 
 # Create alias for translate function
@@ -76,30 +332,28 @@ __all__ = [
     "translate",
     "_",
     "preload_translations",
+    "reload_translations",
+    "start_translation_watcher",
+    "bind_translator",
+    "get_translator",
     "format_date",
     "format_number",
     "get_format_patterns",
 ]
 
 
-def get_format_patterns(lang=None):
-    """Get formatting patterns for the current language"""
-    if not lang:
-        lang = g.get("lang", current_app.config.get("DEFAULT_LANGUAGE", "en"))
-
-    # Get patterns from core module first (defaults)
-    patterns = TRANSLATIONS.get(lang, {}).get("core", {}).get("_meta", {}).copy()
+def _get_formats(lang=None):
+    lang = lang or _current_lang()
+    module = _current_module()
+    return FORMATS.get((lang, module)) or FORMATS.get((lang, "core")) or DEFAULT_FORMATS
 
-    # Override with current module patterns if they exist, but only if the value is nonempty.
-    current_module = g.get("current_module", {}).get("name", "core").lower()
-    module_patterns = TRANSLATIONS.get(lang, {}).get(current_module, {}).get("_meta", {})
 
-    for key, value in module_patterns.items():
-        # Only override if the module value is not empty
-        if value:
-            patterns[key] = value
+def get_format_patterns(lang=None):
+    """Get formatting patterns for the current language
 
-    return patterns
+    The returned dict is shared and must not be modified.
+    """
+    return _get_formats(lang).meta
 
 
 def format_date(date, format_type="medium"):
@@ -107,18 +361,7 @@ def format_date(date, format_type="medium"):
     if not date:
         return ""
 
-    patterns = get_format_patterns()
-    date_formats = patterns.get("date_formats", {})
-    pattern = date_formats.get(format_type, "%Y-%m-%d")  # Default pattern in strftime format
-
-    # Convert pattern from our format to strftime format
-    pattern = (
-        pattern.replace("YYYY", "%Y")
-        .replace("MM", "%m")
-        .replace("DD", "%d")
-        .replace("HH", "%H")
-        .replace("mm", "%M")
-    )
+    pattern = _get_formats().date_formats.get(format_type, "%Y-%m-%d")
 
     try:
         if isinstance(date, str):
@@ -131,16 +374,5 @@ def format_date(date, format_type="medium"):
 
 def format_number(number, decimal_places=2):
     """Format a number according to the current language patterns"""
-    patterns = get_format_patterns()
-    formats = patterns.get("number_formats", {})
-    decimal_sep = formats.get("decimal_separator", ".")
-    thousand_sep = formats.get("thousand_separator", ",")
-
     # Format number with proper separators
-    number_str = f"{number:,.{decimal_places}f}"
-    if thousand_sep != ",":
-        number_str = number_str.replace(",", thousand_sep)
-    if decimal_sep != ".":
-        number_str = number_str.replace(".", decimal_sep)
-
-    return number_str
+    return f"{number:,.{decimal_places}f}".translate(_get_formats().number_table)
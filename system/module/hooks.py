@@ -23,7 +23,16 @@ class ModuleSpecs:
     @hookspec
     def init_database(self):
         """Optional: Initialize database tables and sample data for the module.
-        This hook is called after all modules are loaded and the database
-        connection is established.
+        This hook is called after all modules are loaded and all tables are
+        created, but only when the module's schema or seed version changed
+        since the last start. Bump "seed_version" in the manifest to run it
+        again for new sample data or data migrations.
         """
         pass
+
+    @hookspec
+    def on_startup(self):
+        """Optional: Prepare in-memory state that depends on the database.
+        Unlike init_database, this hook is called on every start, so it
+        should be cheap.
+        """
@@ -0,0 +1,98 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Schema and seed version ledger. Records, per module, the schema and seed
+#     versions its database was last initialized with, so startup only runs
+#     the table creation and seeding of modules that changed since.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import hashlib
+from datetime import datetime
+
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.schema import CreateTable
+
+from system.db.database import db
+from system.db.decorators import ModelRegistry
+
+# Seed version of modules whose manifest doesn't declare one
+DEFAULT_SEED_VERSION = "1"
+
+
+@ModelRegistry.register
+class ModuleVersion(db.Model):
+    """Versions a module's database was last initialized with"""
+
+    __tablename__ = "module_version"
+
+    module = db.Column(db.String(64), primary_key=True)
+    schema_version = db.Column(db.String(64), nullable=False)
+    seed_version = db.Column(db.String(64), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @classmethod
+    def get_all(cls):
+        """Get the recorded versions of all modules
+
+        Returns:
+            dict: Module directory name -> (schema_version, seed_version)
+        """
+        # The ledger itself must exist before anything else is created
+        cls.__table__.create(db.engine, checkfirst=True)
+        return {row.module: (row.schema_version, row.seed_version) for row in cls.query}
+
+    @classmethod
+    def record(cls, module, versions):
+        """Record that a module's database is initialized at these versions"""
+        row = db.session.get(cls, module)
+        if row is None:
+            row = cls(module=module)
+            db.session.add(row)
+        row.schema_version, row.seed_version = versions
+        db.session.commit()
+
+
+def schema_version(module):
+    """Fingerprint of the DDL of every table registered by a module
+
+    Any change to a module's tables, columns or indexes changes the
+    fingerprint, so schema changes are picked up without bumping a number.
+    """
+    dialect = db.engine.dialect
+    digest = hashlib.sha1()
+    tables = sorted({entry["table"] for entry in ModelRegistry.models if entry["module"] == module})
+    for name in tables:
+        table = db.metadata.tables.get(name)
+        if table is None:
+            continue
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda index: index.name or ""):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    return digest.hexdigest()[:16]
+
+
+def module_versions(manifests):
+    """Current schema and seed versions of the given modules
+
+    The seed version comes from the optional "seed_version" manifest key;
+    bump it whenever a module's init_database seeds or migrates new data.
+
+    Args:
+        manifests (iterable): Manifests of the enabled modules
+
+    Returns:
+        dict: Module directory name -> (schema_version, seed_version)
+    """
+    return {
+        manifest["module_dir"]: (
+            schema_version(manifest["module_dir"]),
+            str(manifest.get("seed_version", DEFAULT_SEED_VERSION)),
+        )
+        for manifest in manifests
+    }
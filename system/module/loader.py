@@ -3,7 +3,8 @@
 #
 # Description:
 #     Core module loading system that handles dynamic module discovery,
-#     initialization, and registration. Manages plugin system and module hooks.
+#     initialization, and registration. Manages plugin system and module hooks,
+#     and enables or disables loaded modules at runtime without a restart.
 #
 # Copyright (c) 2025 remarQable LLC
 #
@@ -13,53 +14,79 @@
 
 import importlib
 import os
+import threading
+import time
 
 import pluggy
+from flask import current_app
+
+from system.db.database import db
+from system.profiling import startup_profiler
 
 from .hooks import ModuleSpecs
+from .ledger import ModuleVersion
+from .ledger import module_versions
+from .registry import DISABLED_FILE
+from .registry import manifest_registry
+
+# Seconds between checks for modules enabled or disabled by other processes
+SYNC_INTERVAL = 1.0
 
 
 class ModuleLoader:
     """
     Manages module discovery, loading, and registration.
+
+    Modules disabled at startup are listed from their manifest without
+    importing any of their code, and enabling one takes effect on the next
+    restart. Modules loaded at startup can be disabled and enabled again at
+    runtime: requests to the blueprints of disabled modules are turned away
+    by a per-request gate, and only enabled modules are registered with the
+    plugin manager.
     """
 
     def __init__(self, app=None):
         self.app = app
-        self.modules = []
+        self.modules = []  # Instances of enabled modules
         self.pm = pluggy.PluginManager("sparqone")
         self.pm.add_hookspecs(ModuleSpecs)
         self.manifests = {}
+        self.instances = {}  # Module directory name -> instance of loaded modules
+        self.blueprint_modules = {}  # Blueprint name -> module directory name
+        self.disabled = set()  # Directory names of disabled modules
         self.errors = []
+        self._signature = None
+        self._synced_at = 0.0
+        self._lock = threading.RLock()
 
-    def load_module(self, module_name):
-        """Load a single module"""
+    def load_module(self, module_name, manifest=None):
+        """Load a single module
+
+        The manifest comes from the registry, so disabled modules are listed
+        without importing any of their code.
+        """
         try:
-            # Load manifest
-            manifest = importlib.import_module(f"modules.{module_name}.__manifest__").manifest
-            manifest_copy = manifest.copy()  # Create a copy to avoid modifying the original
-
-            # Check if module is disabled
-            module_path = os.path.join("modules", module_name)
-            disabled_file = os.path.join(module_path, "__DISABLED__")
-            is_enabled = not os.path.exists(disabled_file)
-            manifest_copy["enabled"] = is_enabled
-
-            if is_enabled:
-                # Load the module only if enabled
+            manifest_copy = manifest or manifest_registry.get_manifest(module_name)
+            if manifest_copy is None:
+                self.errors.append(f"Failed to load module '{module_name}': no manifest")
+                return False
+
+            self.manifests[manifest_copy["name"]] = manifest_copy  # Use module name as key
+            if not manifest_copy["enabled"]:
+                self.disabled.add(module_name)
+                return True
+
+            with startup_profiler.measure("import", module_name):
                 module = importlib.import_module(f"modules.{module_name}")
-                if hasattr(module, "module_instance"):
-                    self.manifests[manifest_copy["name"]] = manifest_copy  # Use module name as key
-                    instance = module.module_instance
-                    self.pm.register(instance)
-                    self.modules.append(instance)
-                    return True
-                else:
-                    self.errors.append(f"Module '{module_name}' has no module_instance")
-            else:
-                self.manifests[manifest_copy["name"]] = (
-                    manifest_copy  # Still track disabled modules
-                )
+            if not hasattr(module, "module_instance"):
+                self.errors.append(f"Module '{module_name}' has no module_instance")
+                return False
+
+            instance = module.module_instance
+            self.instances[module_name] = instance
+            self.pm.register(instance)
+            self.modules.append(instance)
+            return True
 
         except Exception as e:
             self.errors.append(f"Failed to load module '{module_name}': {str(e)}")
@@ -67,18 +94,16 @@ class ModuleLoader:
 
     def discover_modules(self):
         """Discover and load all modules in correct order"""
-        modules_dir = "modules"
+        self._signature = manifest_registry.signature()
+        manifests = manifest_registry.get_manifests()
+        self.errors.extend(manifest_registry.errors)
 
         # Get list of all potential modules
-        module_names = [
-            d
-            for d in os.listdir(modules_dir)
-            if os.path.isdir(os.path.join(modules_dir, d)) and not d.startswith("_")
-        ]
+        module_names = list(manifests)
 
         # First load Core module
         if "core" in module_names:
-            self.load_module("core")
+            self.load_module("core", manifests["core"])
             module_names.remove("core")
         else:
             self.errors.append("Core module not found - required for system operation")
@@ -86,7 +111,7 @@ class ModuleLoader:
 
         # Then load People module
         if "people" in module_names:
-            self.load_module("people")
+            self.load_module("people", manifests["people"])
             module_names.remove("people")
         else:
             self.errors.append("People module not found - required for system operation")
@@ -94,12 +119,148 @@ class ModuleLoader:
 
         # Load remaining modules in any order
         for module_name in module_names:
-            self.load_module(module_name)
+            self.load_module(module_name, manifests[module_name])
+
+    def get_enabled_manifests(self):
+        """Get the manifests of the loaded, enabled modules in load order"""
+        return [
+            manifest
+            for manifest in self.manifests.values()
+            if manifest.get("module_dir") in self.instances
+            and manifest["module_dir"] not in self.disabled
+        ]
+
+    def get_pending_databases(self, manifests=None):
+        """Get the modules whose database needs initializing
+
+        A module is pending when its schema or seed version differs from the
+        one recorded in the ledger, or always when FORCE_INIT_DATABASE is set.
+
+        Args:
+            manifests (list, optional): Modules to check. Defaults to all
+                enabled modules
+
+        Returns:
+            dict: Module directory name -> versions to record, in load order
+        """
+        if manifests is None:
+            manifests = self.get_enabled_manifests()
+        recorded = ModuleVersion.get_all()
+        force = os.environ.get("FORCE_INIT_DATABASE")
+        return {
+            module_dir: versions
+            for module_dir, versions in module_versions(manifests).items()
+            if force or recorded.get(module_dir) != versions
+        }
+
+    def init_database(self, module_dir, versions):
+        """Call the init_database hook of a single module and record its versions"""
+        hook = self._subset_hook("init_database", module_dir)
+        with startup_profiler.hook(hook):
+            hook()
+        ModuleVersion.record(module_dir, versions)
+
+    def _subset_hook(self, name, module_dir):
+        instance = self.instances.get(module_dir)
+        others = [plugin for plugin in self.pm.get_plugins() if plugin is not instance]
+        return self.pm.subset_hook_caller(name, remove_plugins=others)
+
+    def is_blueprint_enabled(self, blueprint_name):
+        """Check whether requests to a blueprint may be dispatched"""
+        return self.blueprint_modules.get(blueprint_name) not in self.disabled
+
+    def set_enabled(self, module_dir, enabled):
+        """Enable or disable a module, persisting the state for other processes
+
+        Modules that weren't loaded at startup, because they were disabled
+        or added later, are only imported by a restart: enabling one saves
+        the state but doesn't take effect until then.
+
+        Returns:
+            bool: True if the change is live, False if it waits for a restart
+        """
+        disabled_file = os.path.join(manifest_registry.modules_dir, module_dir, DISABLED_FILE)
+        if enabled and os.path.exists(disabled_file):
+            os.remove(disabled_file)
+        elif not enabled and not os.path.exists(disabled_file):
+            open(disabled_file, "a").close()
+
+        if module_dir not in self.instances:
+            return not enabled
+        self._apply(module_dir, enabled)
+        return True
+
+    def sync(self):
+        """Apply modules enabled or disabled by other processes
+
+        Called on every request; the modules directory is checked at most
+        once per SYNC_INTERVAL.
+        """
+        now = time.monotonic()
+        if now - self._synced_at < SYNC_INTERVAL:
+            return
+        self._synced_at = now
+
+        signature = manifest_registry.signature()
+        if signature == self._signature:
+            return
+        self._signature = signature
+        for module_dir, manifest in manifest_registry.get_manifests().items():
+            if module_dir in self.instances:
+                self._apply(module_dir, manifest["enabled"])
+
+    def _apply(self, module_dir, enabled):
+        """Switch a loaded module's plugin registration and request gate"""
+        with self._lock:
+            if enabled != (module_dir in self.disabled):
+                return
+
+            instance = self.instances[module_dir]
+            manifest = next(m for m in self.manifests.values() if m["module_dir"] == module_dir)
+            if enabled:
+                self.pm.register(instance)
+                try:
+                    # Seed the module if it changed while it was disabled
+                    pending = self.get_pending_databases([manifest])
+                    if pending:
+                        db.create_all()
+                        self.init_database(module_dir, pending[module_dir])
+                    self._subset_hook("on_startup", module_dir)()
+                except Exception:
+                    db.session.rollback()
+                    self.pm.unregister(instance)
+                    raise
+                self.modules.append(instance)
+                self.disabled.discard(module_dir)
+            else:
+                self.disabled.add(module_dir)
+                self.pm.unregister(instance)
+                self.modules.remove(instance)
+
+            # Menus read the shared manifests
+            manifest["enabled"] = enabled
+            current_app.logger.info(
+                f"Module {manifest['name']} {'enabled' if enabled else 'disabled'}"
+            )
+
+    def build_route_index(self):
+        """Map main routes to manifests so requests can find their module directly
+
+        Returns:
+            dict: Lowercase main route without slashes -> manifest
+        """
+        index = {}
+        for manifest in self.manifests.values():
+            route = manifest.get("main_route", "").strip("/").lower()
+            index.setdefault(route, manifest)
+        return index
 
     def register_routes(self, app):
-        """Register routes from all modules"""
-        for module in self.modules:
+        """Register routes from all loaded modules, including those disabled since"""
+        for module_dir, module in self.instances.items():
             if hasattr(module, "get_routes"):
-                routes = module.get_routes()
-                for blueprint, url_prefix in routes:
-                    app.register_blueprint(blueprint, url_prefix=url_prefix)
+                with startup_profiler.measure("routes", type(module).__name__):
+                    routes = module.get_routes()
+                    for blueprint, url_prefix in routes:
+                        app.register_blueprint(blueprint, url_prefix=url_prefix)
+                        self.blueprint_modules[blueprint.name] = module_dir
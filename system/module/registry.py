@@ -0,0 +1,126 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Manifest registry that reads module manifests straight from their
+#     source files, without importing module packages, and caches them until
+#     the modules directory changes.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import ast
+import copy
+import os
+import threading
+
+MANIFEST_FILE = "__manifest__.py"
+DISABLED_FILE = "__DISABLED__"
+
+
+def read_manifest(path):
+    """Read the manifest dict from a __manifest__.py file without executing it
+
+    Raises:
+        ValueError: If the file has no literal manifest assignment
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(target, ast.Name) and target.id == "manifest" for target in node.targets
+        ):
+            return ast.literal_eval(node.value)
+    raise ValueError(f"No manifest found in {path}")
+
+
+class ManifestRegistry:
+    """
+    Cached view of all module manifests.
+
+    Manifests are keyed by module directory name and carry two extra keys:
+    "module_dir" and "enabled". The cache is refreshed when a module
+    directory is added or removed, a module is enabled or disabled, or a
+    manifest file is edited.
+    """
+
+    def __init__(self, modules_dir="modules"):
+        self.modules_dir = modules_dir
+        self.errors = []
+        self._signature = None
+        self._manifests = {}
+        self._lock = threading.Lock()
+
+    def _module_dirs(self):
+        return sorted(
+            d
+            for d in os.listdir(self.modules_dir)
+            if os.path.isdir(os.path.join(self.modules_dir, d)) and not d.startswith("_")
+        )
+
+    def _stamp(self, path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def signature(self):
+        """Modification stamps that change whenever any manifest could have"""
+        parts = [self._stamp(self.modules_dir)]
+        for module_dir in self._module_dirs():
+            module_path = os.path.join(self.modules_dir, module_dir)
+            parts.append(
+                (
+                    module_dir,
+                    self._stamp(module_path),
+                    self._stamp(os.path.join(module_path, MANIFEST_FILE)),
+                )
+            )
+        return tuple(parts)
+
+    def get_manifests(self):
+        """Get copies of all manifests, re-reading them only after changes
+
+        Returns:
+            dict: Module directory name -> manifest
+        """
+        signature = self.signature()
+        with self._lock:
+            if signature != self._signature:
+                self._manifests = self._load()
+                self._signature = signature
+            return copy.deepcopy(self._manifests)
+
+    def get_manifest(self, module_dir):
+        """Get the manifest of one module, or None if it doesn't exist"""
+        return self.get_manifests().get(module_dir)
+
+    def find(self, name):
+        """Get a manifest by module directory or manifest name, case-insensitive"""
+        for module_dir, manifest in self.get_manifests().items():
+            if name.lower() in (module_dir.lower(), manifest.get("name", "").lower()):
+                return manifest
+        return None
+
+    def _load(self):
+        manifests = {}
+        self.errors = []
+        for module_dir in self._module_dirs():
+            module_path = os.path.join(self.modules_dir, module_dir)
+            try:
+                manifest = read_manifest(os.path.join(module_path, MANIFEST_FILE))
+            except (OSError, SyntaxError, ValueError) as e:
+                self.errors.append(f"Failed to read manifest of '{module_dir}': {e}")
+                continue
+            manifest["module_dir"] = module_dir
+            manifest["enabled"] = not os.path.exists(os.path.join(module_path, DISABLED_FILE))
+            manifests[module_dir] = manifest
+        return manifests
+
+
+# Shared registry for the application's modules directory
+manifest_registry = ManifestRegistry()
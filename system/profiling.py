@@ -0,0 +1,138 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Opt-in startup profiler. Times the phases of create_app, each module's
+#     import and route registration, and each module's hook implementations,
+#     then prints a table and optionally writes a JSON report.
+#
+#     Enable with STARTUP_PROFILE=1; set STARTUP_PROFILE_JSON to a file path
+#     to also export the measurements.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import json
+import os
+import platform
+import time
+from contextlib import contextmanager
+from datetime import UTC
+from datetime import datetime
+from functools import wraps
+
+
+class StartupProfiler:
+    """Collects named timings grouped by category during startup"""
+
+    CATEGORIES = ("phase", "import", "routes", "hook")
+
+    def __init__(self, enabled=False, json_path=None):
+        self.enabled = enabled
+        self.json_path = json_path
+        self.entries = []
+        self._started_at = None
+        self.total = None
+
+    def start(self):
+        """Mark the beginning of startup"""
+        self.entries = []
+        self.total = None
+        self._started_at = time.perf_counter()
+
+    def finish(self):
+        """Mark the end of startup, then print and export the report"""
+        if not self.enabled or self._started_at is None:
+            return
+        self.total = time.perf_counter() - self._started_at
+        self.print_report()
+        if self.json_path:
+            self.export_json(self.json_path)
+
+    @contextmanager
+    def measure(self, category, name):
+        """Time the enclosed block"""
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.entries.append((category, name, time.perf_counter() - started))
+
+    @contextmanager
+    def hook(self, hook_caller):
+        """Time each implementation of a pluggy hook called in the block"""
+        if not self.enabled:
+            yield
+            return
+
+        originals = []
+        for impl in hook_caller.get_hookimpls():
+            originals.append((impl, impl.function))
+            name = type(impl.plugin).__name__
+            impl.function = self._timed(hook_caller.name, name, impl.function)
+        try:
+            yield
+        finally:
+            for impl, function in originals:
+                impl.function = function
+
+    def _timed(self, hook_name, plugin_name, function):
+        @wraps(function)
+        def timed(*args, **kwargs):
+            with self.measure("hook", f"{hook_name}: {plugin_name}"):
+                return function(*args, **kwargs)
+
+        return timed
+
+    def to_dict(self):
+        """Measurements as a JSON-serializable dict"""
+        return {
+            "timestamp": datetime.now(UTC).isoformat(),
+            "python": platform.python_version(),
+            "total_seconds": self.total,
+            "entries": [
+                {"category": category, "name": name, "seconds": round(seconds, 6)}
+                for category, name, seconds in self.entries
+            ],
+        }
+
+    def export_json(self, path):
+        """Write the measurements to a JSON file"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        print(f"Startup profile written to {path}")
+
+    def print_report(self):
+        """Print a table of all timings, slowest first within each category"""
+        # Only print in main process (not reloader)
+        if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+            return
+
+        name_width = max([len(name) for _, name, _ in self.entries] + [10]) + 2
+        width = name_width + 22
+
+        print("\nStartup profile:")
+        print("-" * width)
+        print(f"{'Category':<10}{'Step':<{name_width}}{'Time (ms)':>12}")
+        print("-" * width)
+        for category in self.CATEGORIES:
+            entries = [entry for entry in self.entries if entry[0] == category]
+            for _, name, seconds in sorted(entries, key=lambda entry: -entry[2]):
+                print(f"{category:<10}{name:<{name_width}}{seconds * 1000:>12.1f}")
+        print("-" * width)
+        if self.total is not None:
+            print(f"{'total':<10}{'create_app':<{name_width}}{self.total * 1000:>12.1f}")
+        print()
+
+
+# Shared profiler for application startup
+startup_profiler = StartupProfiler(
+    enabled=bool(os.environ.get("STARTUP_PROFILE") or os.environ.get("STARTUP_PROFILE_JSON")),
+    json_path=os.environ.get("STARTUP_PROFILE_JSON"),
+)
@@ -0,0 +1,109 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Socket.IO server setup. Without a message queue all events stay inside
+#     the current process; with one, emits are relayed through the queue so
+#     several workers and nodes share rooms and broadcasts.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import os
+
+from flask_socketio import SocketIO
+from socketio import RedisManager
+
+from system.cache import FAKEREDIS_SCHEME
+from system.cache import redis_from_url
+
+# Channel on the message queue shared by every sparQ process
+DEFAULT_CHANNEL = "sparq-socketio"
+
+SOCKETIO_SETTINGS = (
+    "SOCKETIO_MESSAGE_QUEUE",
+    "SOCKETIO_CHANNEL",
+    "SOCKETIO_ASYNC_MODE",
+    "SOCKETIO_CORS_ALLOWED_ORIGINS",
+)
+
+
+class FakeRedisManager(RedisManager):
+    """
+    Redis client manager backed by fakeredis.
+
+    All managers in a process share one fake server, so several app instances
+    can exercise the message queue code paths without a Redis service.
+    """
+
+    name = "fakeredis"
+
+    def _redis_connect(self):
+        self.redis = redis_from_url(self.redis_url)
+        self.pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+
+
+def user_room(user_id):
+    """Name of the Socket.IO room that reaches all of a user's connections"""
+    return f"user:{user_id}"
+
+
+def load_socketio_config(app):
+    """Copy Socket.IO settings from the environment unless already configured"""
+    for key in SOCKETIO_SETTINGS:
+        if key not in app.config and os.environ.get(key):
+            app.config[key] = os.environ[key]
+
+
+def _queue_options(url, channel, write_only=False):
+    """Build SocketIO keyword arguments for a message queue URL"""
+    if url.startswith(FAKEREDIS_SCHEME):
+        manager = FakeRedisManager(url, channel=channel, write_only=write_only)
+        return {"message_queue": url, "client_manager": manager}
+    return {"message_queue": url, "channel": channel}
+
+
+def create_socketio(app):
+    """Create the Socket.IO server for an app from its configuration
+
+    Settings:
+        SOCKETIO_MESSAGE_QUEUE: Queue URL, e.g. redis://localhost:6379/0,
+            or fakeredis:// for an in-process stand-in. Unset keeps events
+            local to the process.
+        SOCKETIO_CHANNEL: Queue channel name, shared by all processes of one
+            deployment.
+        SOCKETIO_ASYNC_MODE: threading, eventlet or gevent. Unset picks the
+            best installed option.
+        SOCKETIO_CORS_ALLOWED_ORIGINS: Comma separated origins allowed to
+            connect, for deployments behind a load balancer on another host.
+    """
+    load_socketio_config(app)
+
+    options = {}
+    url = app.config.get("SOCKETIO_MESSAGE_QUEUE")
+    if url:
+        channel = app.config.get("SOCKETIO_CHANNEL", DEFAULT_CHANNEL)
+        options.update(_queue_options(url, channel))
+        app.logger.info(f"Socket.IO using message queue on channel '{channel}'")
+
+    async_mode = app.config.get("SOCKETIO_ASYNC_MODE")
+    if async_mode:
+        options["async_mode"] = async_mode
+
+    origins = app.config.get("SOCKETIO_CORS_ALLOWED_ORIGINS")
+    if origins:
+        options["cors_allowed_origins"] = [origin.strip() for origin in origins.split(",")]
+
+    return SocketIO(app, **options)
+
+
+def create_emitter(url, channel=DEFAULT_CHANNEL):
+    """Create a write-only Socket.IO client for processes that don't serve sockets
+
+    Scripts and background jobs use it to emit events that reach clients
+    connected to any web worker through the message queue.
+    """
+    return SocketIO(**_queue_options(url, channel, write_only=True))
@@ -0,0 +1,209 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Shared fixtures for the unit tests. The app is created once on a
+#     temporary SQLite database, which also serves as its read replica, so
+#     replica routing runs against a real second engine.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+
+import pytest
+from flask import has_app_context
+from flask.testing import FlaskClient
+from flask_socketio.test_client import SocketIOTestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Password of the sample users created with the people module
+SAMPLE_PASSWORD = "password123"
+ADMIN_EMAIL = "sarah@allaboutpies.shop"
+USER_EMAIL = "michael@allaboutpies.shop"
+
+
+def pytest_configure(config):
+    """Create the app before the test modules are imported
+
+    Module controllers register their Socket.IO handlers on the current app
+    when they are imported, so the app has to exist first.
+    """
+    root = tempfile.mkdtemp(prefix="sparq-tests-")
+    url = f"sqlite:///{os.path.join(root, 'test.db')}"
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DATABASE_URL", url)
+        mp.setenv("DATABASE_REPLICA_URL", url)
+        mp.setenv("CHAT_ARCHIVE_DIR", os.path.join(root, "chat_archive"))
+        mp.setenv("CHAT_PURGE_BATCH_PAUSE", "0")
+
+        from app import create_app
+
+        app = create_app()
+    app.config["TESTING"] = True
+    app.test_client_class = Client
+    config.sparq_app = app
+    config.sparq_root = root
+
+
+def pytest_unconfigure(config):
+    if hasattr(config, "sparq_root"):
+        shutil.rmtree(config.sparq_root, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def app(pytestconfig):
+    return pytestconfig.sparq_app
+
+
+@pytest.fixture
+def ctx(app):
+    """App context whose session is discarded after the test"""
+    from system.db.database import db
+
+    with app.app_context():
+        yield
+        db.session.rollback()
+        db.session.remove()
+
+
+class Client(FlaskClient):
+    """Test client whose requests get their own app context, as in production
+
+    Requests would otherwise reuse the context pushed by the ctx fixture and
+    share its g, which caches the logged in user across clients. The test's
+    own session is expired afterwards, so it sees what the request committed.
+    """
+
+    def open(self, *args, **kwargs):
+        from system.db.database import db
+
+        with self.application.app_context():
+            response = super().open(*args, **kwargs)
+        if has_app_context():
+            db.session.expire_all()
+        return response
+
+
+class SocketClient(SocketIOTestClient):
+    """Socket.IO test client whose events get their own app context"""
+
+    def connect(self, *args, **kwargs):
+        with self.app.app_context():
+            return super().connect(*args, **kwargs)
+
+    def emit(self, *args, **kwargs):
+        with self.app.app_context():
+            return super().emit(*args, **kwargs)
+
+
+def login(app, email):
+    client = app.test_client()
+    response = client.post("/login", data={"email": email, "password": SAMPLE_PASSWORD})
+    assert response.status_code == 302
+    return client
+
+
+@pytest.fixture
+def admin_client(app):
+    return login(app, ADMIN_EMAIL)
+
+
+@pytest.fixture
+def user_client(app):
+    """Client of a user who isn't an admin"""
+    return login(app, USER_EMAIL)
+
+
+@pytest.fixture
+def socket_client(app):
+    """Connect a Socket.IO client with the session of a test client"""
+    clients = []
+
+    def connect(client):
+        clients.append(SocketClient(app, app.socketio, flask_test_client=client))
+        return clients[-1]
+
+    yield connect
+    for client in clients:
+        if client.is_connected():
+            client.disconnect()
+
+
+@pytest.fixture
+def user(ctx):
+    from modules.core.models.user import User
+
+    return User.query.filter_by(email=USER_EMAIL).one()
+
+
+@pytest.fixture
+def channel(ctx):
+    """A new public channel of the admin, so tests don't see each other's messages"""
+    from modules.core.models.user import User
+    from modules.people.models.chat import Channel
+    from system.db.database import db
+
+    admin = User.query.filter_by(email=ADMIN_EMAIL).one()
+    channel = Channel(name=f"test-{uuid.uuid4().hex[:12]}", created_by_id=admin.id)
+    db.session.add(channel)
+    db.session.commit()
+    return channel
+
+
+@pytest.fixture
+def add_messages(ctx):
+    """Post messages to a channel, optionally backdated by a number of days"""
+    from modules.core.models.user import User
+    from modules.people.models.chat import Chat
+    from modules.people.models.chat import utc_now
+    from system.db.database import db
+
+    author_id = User.query.filter_by(email=ADMIN_EMAIL).one().id
+
+    def add(channel, count, days_ago=0, pinned=False):
+        created_at = utc_now() - timedelta(days=days_ago)
+        chats = [
+            Chat(
+                content=f"message {index} in {channel.name}",
+                author_id=author_id,
+                channel_id=channel.id,
+                pinned=pinned,
+                created_at=created_at,
+            )
+            for index in range(count)
+        ]
+        db.session.add_all(chats)
+        db.session.commit()
+        return [chat.id for chat in chats]
+
+    return add
+
+
+@pytest.fixture
+def count_queries():
+    """Collect the SQL statements run inside a with block"""
+
+    @contextmanager
+    def count():
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(Engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(Engine, "before_cursor_execute", record)
+
+    return count
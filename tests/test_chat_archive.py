@@ -0,0 +1,259 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for the chat message archive: paging across hot and archived
+#     messages, looking up archived messages and purging segments.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import os
+import re
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import Column
+from sqlalchemy import Integer
+from sqlalchemy import MetaData
+from sqlalchemy import Table
+
+from modules.core.models.user import User
+from modules.people.models.associations import chat_like
+from modules.people.models.chat import Chat
+from modules.people.models.chat import utc_now
+from modules.people.models.chat_archive import ArchivedChat
+from modules.people.models.chat_archive import ChatArchiveSegment
+from modules.people.models.chat_archive import get_message_page
+from modules.people.models.chat_purge import ChatPurgeJob
+from modules.people.models.chat_purge import ChatPurgeWorker
+from system.db.database import db
+from system.db.schema import ensure_autoincrement
+
+
+def archive_channel(app, channel, days, segment_size=4):
+    """Archive a channel's messages older than a number of days"""
+    app.config["CHAT_ARCHIVE_SEGMENT_SIZE"] = segment_size
+    channel.retention_days = days
+    db.session.commit()
+    assert ChatPurgeJob.for_retention()
+    db.session.commit()
+    while (job := ChatPurgeJob.claim_next()) is not None:
+        while job.run_batch(job.batch_size(app)):
+            pass
+        job.finish()
+    channel.retention_days = None
+    db.session.commit()
+
+
+def walk_pages(channel_id, limit):
+    """Collect a channel's message ids page by page, oldest first"""
+    ids = []
+    before_id = None
+    while True:
+        messages, has_more = get_message_page(channel_id, before_id=before_id, limit=limit)
+        ids = [message.id for message in messages] + ids
+        if not has_more:
+            return ids
+        before_id = messages[0].id
+
+
+def test_pages_continue_into_the_archive(app, channel, add_messages):
+    old = add_messages(channel, 10, days_ago=60)
+    pinned = add_messages(channel, 1, days_ago=60, pinned=True)
+    recent = add_messages(channel, 5)
+
+    archive_channel(app, channel, days=30)
+
+    assert Chat.query.filter_by(channel_id=channel.id).count() == 6
+    segments = ChatArchiveSegment.query.filter_by(channel_id=channel.id).all()
+    assert sum(segment.message_count for segment in segments) == 10
+
+    for limit in (3, 4, 7, 20):
+        assert walk_pages(channel.id, limit) == old + pinned + recent
+
+    messages, has_more = get_message_page(channel.id, before_id=recent[0], limit=3)
+    assert [message.id for message in messages] == [old[-2], old[-1], pinned[0]]
+    assert [type(message) for message in messages] == [ArchivedChat, ArchivedChat, Chat]
+    assert has_more
+
+
+def test_pinned_page_skips_the_archive(app, channel, add_messages):
+    add_messages(channel, 4, days_ago=60)
+    pinned = add_messages(channel, 2, days_ago=60, pinned=True)
+
+    archive_channel(app, channel, days=30)
+
+    messages, has_more = get_message_page(channel.id, limit=10, pinned_only=True)
+    assert [message.id for message in messages] == pinned
+    assert not has_more
+
+
+def test_find_message_renders_archived_content(app, channel, add_messages, admin_client):
+    message_id = add_messages(channel, 3, days_ago=60)[1]
+    archive_channel(app, channel, days=30)
+    assert db.session.get(Chat, message_id) is None
+
+    archived = ChatArchiveSegment.find_message(message_id)
+    assert archived.archived
+    assert archived.channel_id == channel.id
+    assert archived.formatted_content == f"message 1 in {channel.name}"
+
+    html = admin_client.get(f"/people/chat/messages/{message_id}").get_data(as_text=True)
+    body = re.search(r'<div class="ps-5 pt-1">(.*?)</div>', html).group(1)
+    assert body == f"message 1 in {channel.name}"
+    assert "hx-delete" not in html
+
+
+def test_archived_likes_render_read_only(app, channel, add_messages, admin_client, monkeypatch):
+    message_id = add_messages(channel, 2, days_ago=60)[0]
+    user_ids = [id for (id,) in db.session.query(User.id).limit(2)]
+    db.session.execute(
+        chat_like.insert(), [{"user_id": id, "chat_id": message_id} for id in user_ids]
+    )
+    db.session.commit()
+    archive_channel(app, channel, days=30)
+
+    prepared = []
+    prepare_likes = Chat.prepare_likes.__func__
+    monkeypatch.setattr(
+        Chat,
+        "prepare_likes",
+        classmethod(
+            lambda cls, chats, *args: prepared.extend(chats) or prepare_likes(cls, chats, *args)
+        ),
+    )
+
+    for response in (
+        admin_client.get(f"/people/chat/channels/{channel.name}/messages"),
+        admin_client.get(f"/people/chat/messages/{message_id}"),
+        admin_client.post(f"/people/chat/channels/{channel.name}/search", data={"search": ""}),
+    ):
+        html = response.get_data(as_text=True)
+        likes = re.search(
+            r'class="[^"]*archived-likes">\s*<i class="far fa-heart"></i> (\d+)', html
+        )
+        assert likes.group(1) == "2"
+    assert not any(chat.archived for chat in prepared)
+
+
+def test_archived_ids_are_not_reused(app, channel, add_messages):
+    archived = add_messages(channel, 3, days_ago=60)
+    archive_channel(app, channel, days=30)
+
+    (new,) = add_messages(channel, 1)
+
+    assert new > archived[-1]
+    assert ChatArchiveSegment.find_message(archived[-1]).content == f"message 2 in {channel.name}"
+
+
+def test_tables_are_rebuilt_with_autoincrement(ctx):
+    db.session.execute(db.text("CREATE TABLE rebuild_test (id INTEGER PRIMARY KEY)"))
+    db.session.execute(db.text("INSERT INTO rebuild_test (id) VALUES (1), (2), (3)"))
+    db.session.commit()
+    table = Table(
+        "rebuild_test",
+        MetaData(),
+        Column("id", Integer, primary_key=True),
+        sqlite_autoincrement=True,
+    )
+    model = type("RebuildTest", (), {"__table__": table})
+    try:
+        ensure_autoincrement(model)
+        db.session.execute(db.text("DELETE FROM rebuild_test WHERE id = 3"))
+        db.session.execute(db.text("INSERT INTO rebuild_test DEFAULT VALUES"))
+        ids = db.session.execute(db.text("SELECT id FROM rebuild_test")).scalars().all()
+        assert sorted(ids) == [1, 2, 4]
+    finally:
+        db.session.rollback()
+        db.session.execute(db.text("DROP TABLE rebuild_test"))
+        db.session.commit()
+
+
+def test_find_message_returns_none_for_unknown_ids(ctx):
+    assert ChatArchiveSegment.find_message(10**9) is None
+
+
+def test_purge_rewrites_partly_expired_segments(app, channel, add_messages):
+    older = add_messages(channel, 3, days_ago=90)
+    newer = add_messages(channel, 3, days_ago=60)
+    archive_channel(app, channel, days=30, segment_size=6)
+
+    segment = ChatArchiveSegment.query.filter_by(channel_id=channel.id).one()
+    old_path = segment.full_path
+
+    now = utc_now()
+    assert ChatArchiveSegment.purge(channel_id=channel.id, before=now - timedelta(days=120)) == 0
+    deleted = ChatArchiveSegment.purge(channel_id=channel.id, before=now - timedelta(days=75))
+    db.session.commit()
+
+    assert deleted == len(older)
+    segment = ChatArchiveSegment.query.filter_by(channel_id=channel.id).one()
+    assert (segment.first_message_id, segment.last_message_id) == (newer[0], newer[-1])
+    assert [record["id"] for record in segment.read()] == newer
+    assert not os.path.exists(old_path)
+
+
+def test_rolled_back_segments_leave_no_files(app, channel, add_messages):
+    ids = add_messages(channel, 2)
+    segment = ChatArchiveSegment.write(channel.id, [db.session.get(Chat, id) for id in ids])
+    path = segment.full_path
+    assert os.path.exists(path)
+
+    db.session.rollback()
+
+    assert not os.path.exists(path)
+
+
+@pytest.mark.parametrize("days", [None, 0])
+def test_channels_without_retention_are_not_archived(app, channel, add_messages, days):
+    add_messages(channel, 2, days_ago=400)
+    channel.retention_days = days
+    db.session.commit()
+
+    assert channel.id not in {job.channel_id for job in ChatPurgeJob.for_retention()}
+    db.session.rollback()
+
+
+@pytest.mark.parametrize("days", ["²", "-1", "36501", "99999999", "x"])
+def test_retention_route_rejects_invalid_days(channel, admin_client, days):
+    url = f"/people/chat/channels/{channel.name}/retention"
+    assert admin_client.put(url, data={"days": days}).status_code == 400
+
+
+@pytest.mark.parametrize("days, saved", [("", None), ("0", 0), ("30", 30), ("36500", 36500)])
+def test_retention_route_saves_days(channel, admin_client, days, saved):
+    url = f"/people/chat/channels/{channel.name}/retention"
+    response = admin_client.put(url, data={"days": days})
+    assert response.status_code == 200
+    assert response.json["retention_days"] == saved
+
+
+def test_oversized_retention_doesnt_stop_archival(channel, add_messages):
+    add_messages(channel, 1)
+    channel.retention_days = 99999999
+    db.session.commit()
+
+    assert channel.id not in {job.channel_id for job in ChatPurgeJob.for_retention()}
+    db.session.rollback()
+    channel.retention_days = None
+    db.session.commit()
+
+
+def test_resume_retries_after_an_error(app, ctx, monkeypatch):
+    worker = ChatPurgeWorker()
+
+    def fail():
+        raise OverflowError("date value out of range")
+
+    monkeypatch.setattr(ChatPurgeJob, "for_retention", fail)
+    worker.resume(app)
+    assert not worker._resumed
+
+    monkeypatch.setattr(ChatPurgeJob, "for_retention", list)
+    monkeypatch.setattr(ChatPurgeJob, "has_unfinished", lambda: False)
+    worker.resume(app)
+    assert worker._resumed
@@ -0,0 +1,75 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for unread badge counts and their delivery to per-user rooms.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+from modules.people.models.chat import ChannelReadCursor
+from system.db.database import db
+
+
+def test_counts_messages_past_each_cursor(channel, user, add_messages):
+    message_ids = add_messages(channel, 4)
+    ChannelReadCursor.advance(user.id, channel.id, message_ids[1])
+    db.session.commit()
+
+    counts = ChannelReadCursor.get_badge_counts(channel)
+
+    assert counts[user.id] == 2
+    assert counts[channel.created_by_id] == 4
+
+
+def test_readers_who_are_caught_up_are_left_out(channel, user, add_messages):
+    message_ids = add_messages(channel, 2)
+    ChannelReadCursor.advance(user.id, channel.id, message_ids[-1])
+    db.session.commit()
+
+    assert user.id not in ChannelReadCursor.get_badge_counts(channel)
+    assert ChannelReadCursor.get_badge_counts(type(channel)("empty-test")) == {}
+
+
+def test_counts_are_capped(channel, user, add_messages):
+    add_messages(channel, 5)
+
+    assert ChannelReadCursor.get_badge_counts(channel, limit=3)[user.id] == 3
+
+
+def test_private_channels_count_only_for_their_members(channel, user, add_messages):
+    channel.is_private = True
+    db.session.commit()
+    add_messages(channel, 1)
+
+    counts = ChannelReadCursor.get_badge_counts(channel)
+
+    assert user.id not in counts
+    assert channel.created_by_id in counts
+
+
+def test_inactive_users_are_left_out(channel, user, add_messages):
+    add_messages(channel, 1)
+    user.is_active = False
+    db.session.commit()
+    try:
+        assert user.id not in ChannelReadCursor.get_badge_counts(channel)
+    finally:
+        user.is_active = True
+        db.session.commit()
+
+
+def test_badges_are_sent_only_to_each_users_room(channel, admin_client, user_client, socket_client):
+    viewer = socket_client(user_client)
+    poster = socket_client(admin_client)
+
+    admin_client.post("/people/chat/messages", data={"content": "ping", "channel": channel.name})
+
+    badges = [
+        event["args"][0] for event in viewer.get_received() if event["name"] == "badge_update"
+    ]
+    assert badges == [{"channel": channel.name, "unread_count": 1}]
+    assert not [event for event in poster.get_received() if event["name"] == "badge_update"]
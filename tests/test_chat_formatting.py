@@ -0,0 +1,91 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for rendering chat message content and caching the rendered HTML.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+from unittest import mock
+
+from modules.people.models.chat import Chat
+from system.cache import MISSING
+from system.cache import LRUCache
+from system.db.database import db
+
+
+def test_links_and_line_breaks_are_rendered(ctx):
+    html = Chat.render_content(None, "see www.example.com\nand https://sparq.dev/x")
+
+    assert html == (
+        'see <a href="https://www.example.com" target="_blank" rel="noopener noreferrer"'
+        ' class="chat-link">www.example.com</a><br>and <a href="https://sparq.dev/x"'
+        ' target="_blank" rel="noopener noreferrer" class="chat-link">https://sparq.dev/x</a>'
+    )
+
+
+def test_long_links_are_shortened(ctx):
+    url = "https://example.com/" + "a" * 60
+
+    html = Chat.render_content(None, url)
+
+    assert f'href="{url}"' in html
+    assert f">{url[:50]}...</a>" in html
+
+
+def test_rendered_html_is_reused_until_content_changes(add_messages, channel):
+    chat = db.session.get(Chat, add_messages(channel, 1)[0])
+    first = Chat.render_content(chat.id, chat.content)
+
+    assert Chat.render_content(chat.id, chat.content) is first
+    assert Chat.render_content(chat.id, "changed") == "changed"
+
+
+def test_edits_drop_the_rendered_html(add_messages, channel):
+    chat = db.session.get(Chat, add_messages(channel, 1)[0])
+    assert chat.formatted_content == f"message 0 in {channel.name}"
+
+    chat.content = "edited"
+    db.session.commit()
+
+    with mock.patch.object(Chat, "render_content", wraps=Chat.render_content) as render:
+        assert chat.formatted_content == "edited"
+        assert chat.formatted_content == "edited"
+    render.assert_called_once()
+
+
+def test_prepare_renders_a_page_in_one_pass(add_messages, channel):
+    chats = Chat.query.filter(Chat.id.in_(add_messages(channel, 3))).all()
+
+    assert Chat.prepare_formatted_content(chats) is chats
+    with mock.patch.object(Chat, "render_content") as render:
+        assert [str(chat.formatted_content) for chat in chats] == [
+            f"message {index} in {channel.name}" for index in range(3)
+        ]
+    render.assert_not_called()
+
+
+def test_lru_cache_evicts_the_least_recently_used_entry():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", None)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is MISSING
+    assert cache.get("c") == 3
+
+
+def test_lru_cache_expires_entries():
+    cache = LRUCache(ttl=10)
+    with mock.patch("system.cache.time.monotonic", return_value=100):
+        cache.set("key", None)
+    with mock.patch("system.cache.time.monotonic", return_value=105):
+        assert cache.get("key") is None
+    with mock.patch("system.cache.time.monotonic", return_value=111):
+        assert cache.get("key", "gone") == "gone"
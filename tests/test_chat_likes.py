@@ -0,0 +1,76 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for loading like counts and liked state for pages of messages.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import pytest
+
+from modules.people.models.associations import chat_like
+from modules.people.models.chat import Chat
+from system.db.database import db
+
+
+@pytest.fixture
+def liked_page(channel, user, add_messages):
+    """Three messages: liked by the admin and the user, by the admin only, and not liked"""
+    message_ids = add_messages(channel, 3)
+    admin_id = channel.created_by_id
+    db.session.execute(
+        chat_like.insert(),
+        [
+            {"chat_id": message_ids[0], "user_id": admin_id},
+            {"chat_id": message_ids[0], "user_id": user.id},
+            {"chat_id": message_ids[1], "user_id": admin_id},
+        ],
+    )
+    db.session.commit()
+    return Chat.query.filter(Chat.id.in_(message_ids)).order_by(Chat.id).all()
+
+
+def test_a_page_is_loaded_in_one_query(liked_page, user, count_queries):
+    user_id = user.id
+
+    with count_queries() as statements:
+        assert Chat.prepare_likes(liked_page, user_id) is liked_page
+        assert [chat.like_count for chat in liked_page] == [2, 1, 0]
+        assert [chat.is_liked for chat in liked_page] == [True, False, False]
+    assert len(statements) == 1
+
+
+def test_shared_renders_mark_nothing_liked(liked_page):
+    Chat.prepare_likes(liked_page)
+
+    assert [chat.like_count for chat in liked_page] == [2, 1, 0]
+    assert not any(chat.is_liked for chat in liked_page)
+
+
+def test_unprepared_messages_count_their_own_likes(app, liked_page):
+    with app.test_request_context():
+        assert [chat.like_count for chat in liked_page] == [2, 1, 0]
+        assert not liked_page[0].is_liked
+
+
+def test_empty_pages_run_no_queries(ctx, count_queries):
+    with count_queries() as statements:
+        assert Chat.prepare_likes([], 1) == []
+    assert statements == []
+
+
+def test_page_queries_dont_grow_with_the_page(channel, add_messages, user_client, count_queries):
+    def like_queries(count):
+        add_messages(channel, count)
+        with count_queries() as statements:
+            html = user_client.get(
+                f"/people/chat/channels/{channel.name}/messages?limit={count}"
+            ).get_data(as_text=True)
+        assert html.count('id="message-') == count
+        return [statement for statement in statements if "chat_like" in statement]
+
+    assert len(like_queries(2)) == len(like_queries(8)) == 1
@@ -0,0 +1,68 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for keyset pagination of channel message history.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import re
+
+import pytest
+
+from modules.people.models.chat import Chat
+
+
+def page_ids(client, channel, **params):
+    html = client.get(
+        f"/people/chat/channels/{channel.name}/messages", query_string=params
+    ).get_data(as_text=True)
+    return [int(id) for id in re.findall(r'id="message-(\d+)"', html)], "load-more-btn" in html
+
+
+def test_pages_walk_back_by_id(channel, add_messages):
+    ids = add_messages(channel, 7)
+
+    messages, has_more = Chat.get_page(channel.id, limit=3)
+    assert [message.id for message in messages] == ids[4:]
+    assert has_more
+
+    messages, has_more = Chat.get_page(channel.id, before_id=ids[4], limit=3)
+    assert [message.id for message in messages] == ids[1:4]
+    assert has_more
+
+    messages, has_more = Chat.get_page(channel.id, before_id=ids[1], limit=3)
+    assert [message.id for message in messages] == ids[:1]
+    assert not has_more
+
+
+def test_pinned_pages_skip_unpinned_messages(channel, add_messages):
+    add_messages(channel, 2)
+    pinned = add_messages(channel, 1, pinned=True)
+    add_messages(channel, 2)
+
+    messages, has_more = Chat.get_page(channel.id, limit=10, pinned_only=True)
+    assert [message.id for message in messages] == pinned
+    assert not has_more
+
+
+def test_route_follows_before_id(channel, add_messages, admin_client):
+    ids = add_messages(channel, 5)
+
+    assert page_ids(admin_client, channel, limit=2) == (ids[3:], True)
+    assert page_ids(admin_client, channel, limit=2, before_id=ids[3]) == (ids[1:3], True)
+    assert page_ids(admin_client, channel, limit=2, before_id=ids[1]) == (ids[:1], False)
+
+
+@pytest.mark.parametrize("limit, size", [(-5, 1), (0, 1), (1000, 100)])
+def test_route_clamps_the_page_size(channel, add_messages, admin_client, limit, size):
+    ids = add_messages(channel, 101)
+
+    got, has_more = page_ids(admin_client, channel, limit=limit)
+
+    assert got == ids[-size:]
+    assert has_more
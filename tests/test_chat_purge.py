@@ -0,0 +1,117 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for chat purge jobs: claiming by concurrent workers, taking over
+#     abandoned jobs, and retrying after failures.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import threading
+from datetime import timedelta
+
+import pytest
+
+from modules.people.models.chat import utc_now
+from modules.people.models.chat_purge import MAX_ATTEMPTS
+from modules.people.models.chat_purge import STALE_AFTER
+from modules.people.models.chat_purge import ChatPurgeJob
+from system.db.database import db
+
+
+def schedule(channel, count=1):
+    """Schedule purges that have nothing to delete"""
+    before = utc_now() - timedelta(days=3650)
+    jobs = [ChatPurgeJob.for_messages(before, channel=channel) for _ in range(count)]
+    db.session.commit()
+    return [job.id for job in jobs]
+
+
+def test_each_job_is_claimed_by_one_worker(app, channel):
+    job_ids = schedule(channel, count=20)
+    claims = []
+    start = threading.Barrier(4)
+
+    def work():
+        with app.app_context():
+            start.wait()
+            while (job := ChatPurgeJob.claim_next()) is not None:
+                claims.append(job.id)
+                job.finish()
+            db.session.remove()
+
+    workers = [threading.Thread(target=work) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert sorted(claim for claim in claims if claim in job_ids) == job_ids
+    db.session.expire_all()
+    assert {db.session.get(ChatPurgeJob, id).status for id in job_ids} == {ChatPurgeJob.DONE}
+
+
+def test_abandoned_jobs_are_taken_over(channel):
+    stale_id, fresh_id = schedule(channel, count=2)
+    stale = db.session.get(ChatPurgeJob, stale_id)
+    fresh = db.session.get(ChatPurgeJob, fresh_id)
+    stale.status = fresh.status = ChatPurgeJob.RUNNING
+    stale.updated_at = utc_now() - timedelta(seconds=STALE_AFTER + 60)
+    db.session.commit()
+
+    assert ChatPurgeJob.claim_next().id == stale_id
+    assert ChatPurgeJob.claim_next() is None
+
+    for job in (stale, fresh):
+        job.finish()
+
+
+def test_failed_jobs_are_requeued_then_retried(channel):
+    (job_id,) = schedule(channel)
+    job = db.session.get(ChatPurgeJob, job_id)
+    assert not job.retry()
+
+    for attempt in range(1, MAX_ATTEMPTS):
+        job.fail(RuntimeError("disk full"))
+        assert (job.status, job.attempts) == (ChatPurgeJob.PENDING, attempt)
+    job.fail(RuntimeError("disk full"))
+    assert job.status == ChatPurgeJob.FAILED
+    assert job.error == "disk full"
+    assert job.finished_at is not None
+    assert ChatPurgeJob.claim_next() is None
+
+    assert job.retry()
+    db.session.commit()
+    assert (job.status, job.attempts, job.error, job.finished_at) == (
+        ChatPurgeJob.PENDING,
+        0,
+        None,
+        None,
+    )
+    assert ChatPurgeJob.claim_next().id == job_id
+    job.finish()
+
+
+def test_retry_route_only_accepts_failed_jobs(channel, admin_client):
+    (job_id,) = schedule(channel)
+
+    assert admin_client.post(f"/people/chat/purges/{job_id}/retry").status_code == 400
+    assert admin_client.post("/people/chat/purges/999999/retry").status_code == 404
+
+    db.session.get(ChatPurgeJob, job_id).finish()
+
+
+@pytest.mark.parametrize("days", ["0", "36501", "999999999", "soon"])
+def test_purge_route_rejects_out_of_range_days(admin_client, days):
+    response = admin_client.post("/people/chat/purges", data={"days": days})
+    assert response.status_code == 400
+
+
+def test_purge_command_rejects_out_of_range_days(app):
+    result = app.test_cli_runner().invoke(args=["people_bp", "purge-messages", "999999999"])
+    assert result.exit_code == 2
+    assert "999999999" in result.output
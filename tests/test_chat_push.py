@@ -0,0 +1,83 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for pushing rendered chat messages to everyone viewing a channel
+#     over Socket.IO.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import pytest
+
+from modules.people.models.associations import chat_like
+from system.db.database import db
+
+
+@pytest.fixture
+def viewer(user_client, socket_client):
+    """Socket.IO client of the non-admin user"""
+    return socket_client(user_client)
+
+
+def pushed(client, name="chat_changed"):
+    return [event["args"][0] for event in client.get_received() if event["name"] == name]
+
+
+def test_new_messages_are_pushed_to_channel_viewers(channel, admin_client, viewer):
+    viewer.emit("join", {"channel": channel.name})
+    viewer.get_received()
+
+    admin_client.post(
+        "/people/chat/messages", data={"content": "hello room", "channel": channel.name}
+    )
+
+    (event,) = pushed(viewer)
+    assert event["channel"] == channel.name
+    assert event["type"] == "message"
+    assert f'id="message-{event["message_id"]}"' in event["html"]
+    assert "hello room" in event["html"]
+
+
+def test_pushed_html_hides_controls_for_each_client_to_reveal(channel, admin_client, viewer):
+    viewer.emit("join", {"channel": channel.name})
+    viewer.get_received()
+
+    admin_client.post(
+        "/people/chat/messages", data={"content": "controls", "channel": channel.name}
+    )
+
+    (event,) = pushed(viewer)
+    html = event["html"]
+    assert "data-requires-admin" in html
+    assert 'data-requires-author="' in html
+    assert 'data-i18n="title"' in html
+    assert 'title="Reply"' in html
+
+
+def test_pushed_html_is_not_shaped_by_the_poster(channel, admin_client, viewer):
+    viewer.emit("join", {"channel": channel.name})
+    viewer.get_received()
+
+    admin_client.post("/people/chat/messages", data={"content": "first", "channel": channel.name})
+    (event,) = pushed(viewer)
+    message_id = event["message_id"]
+    db.session.execute(chat_like.insert().values(user_id=channel.created_by_id, chat_id=message_id))
+    db.session.commit()
+
+    admin_client.post(f"/people/chat/messages/{message_id}/pin")
+
+    (event,) = pushed(viewer)
+    assert event["type"] == "pin"
+    assert event["total_pin_count"] == 1
+    assert '<span class="small">1</span>' in event["html"]
+    assert "text-danger" not in event["html"]
+
+
+def test_messages_are_not_pushed_outside_the_channel(channel, admin_client, viewer):
+    admin_client.post("/people/chat/messages", data={"content": "quiet", "channel": channel.name})
+
+    assert pushed(viewer) == []
@@ -0,0 +1,74 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for emoji reactions and their per-message counters.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import pytest
+from sqlalchemy.dialects import mysql
+from sqlalchemy.dialects import postgresql
+
+from modules.core.models.user import User
+from modules.people.models.chat import Chat
+from modules.people.models.chat_reaction import ChatReaction
+from system.db.database import db
+
+
+@pytest.fixture
+def message(channel, add_messages):
+    (message_id,) = add_messages(channel, 1)
+    return db.session.get(Chat, message_id)
+
+
+def user_ids(count):
+    return [id for (id,) in db.session.query(User.id).order_by(User.id).limit(count)]
+
+
+def bar(message):
+    (prepared,) = ChatReaction.prepare([message], user_ids(1)[0])
+    return prepared.reactions
+
+
+def test_reactions_are_counted_per_emoji(message):
+    first, second = user_ids(2)
+
+    assert ChatReaction.toggle(first, message, "👍") == (1, True)
+    assert ChatReaction.toggle(second, message, "👍") == (2, True)
+    assert ChatReaction.toggle(second, message, "🎉") == (1, True)
+    db.session.commit()
+    assert bar(message) == [("👍", 2, True), ("🎉", 1, False)]
+
+    assert ChatReaction.toggle(first, message, "👍") == (1, False)
+    assert ChatReaction.toggle(second, message, "🎉") == (0, False)
+    db.session.commit()
+    assert bar(message) == [("👍", 1, False)]
+    assert ChatReaction.query.filter_by(message_id=message.id).count() == 1
+
+
+def test_route_toggles_the_reaction(message, admin_client):
+    url = f"/people/chat/messages/{message.id}/reactions"
+
+    html = admin_client.post(url, data={"emoji": "😂"}).get_data(as_text=True)
+    assert "😂" in html
+    assert 'class="small reaction-count">1<' in html
+
+    html = admin_client.post(url, data={"emoji": "😂"}).get_data(as_text=True)
+    assert "😂" not in html.split('data-bs-toggle="dropdown"')[0]
+
+
+@pytest.mark.parametrize(
+    "dialect, upsert",
+    [
+        (postgresql.dialect(), "ON CONFLICT (message_id, emoji) DO UPDATE SET count ="),
+        (mysql.dialect(), "ON DUPLICATE KEY UPDATE count ="),
+    ],
+)
+def test_counters_are_upserted_on_server_databases(message, dialect, upsert):
+    statement = ChatReaction._upsert(dialect.name, message, "👍", 1)
+    assert upsert in str(statement.compile(dialect=dialect))
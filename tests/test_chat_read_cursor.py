@@ -0,0 +1,94 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for per-user channel read cursors, which replaced the READ rows
+#     written for every user on each new message.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+from modules.people.models.chat import ChannelReadCursor
+from modules.people.models.chat import Chat
+from modules.people.models.chat import ChatMessageState
+from modules.people.models.chat import InteractionType
+from system.db.database import db
+
+
+def read_states():
+    return ChatMessageState.query.filter_by(interaction_type=InteractionType.READ)
+
+
+def test_posting_moves_only_the_authors_cursor(channel, user, admin_client):
+    states = read_states().count()
+
+    response = admin_client.post(
+        "/people/chat/messages", data={"content": "hello", "channel": channel.name}
+    )
+    assert response.status_code == 200
+
+    message = Chat.query.filter_by(channel_id=channel.id).one()
+    assert ChannelReadCursor.get_last_read_id(channel.created_by_id, channel.id) == message.id
+    assert ChannelReadCursor.get_last_read_id(user.id, channel.id) == 0
+    assert read_states().count() == states
+    assert ChatMessageState.get_unread_count(user.id, channel.id) == 1
+    assert ChatMessageState.has_unread(user.id, channel.id)
+
+
+def test_cursors_never_move_back(channel, user, add_messages):
+    first, second = add_messages(channel, 2)
+
+    ChannelReadCursor.advance(user.id, channel.id, second)
+    ChannelReadCursor.advance(user.id, channel.id, first)
+    db.session.commit()
+
+    assert ChannelReadCursor.get_last_read_id(user.id, channel.id) == second
+    assert not ChatMessageState.has_unread(user.id, channel.id)
+
+
+def test_marking_read_jumps_to_the_last_message(channel, user, add_messages):
+    ids = add_messages(channel, 3)
+    ChannelReadCursor.advance(user.id, channel.id, ids[0])
+    db.session.commit()
+    assert ChatMessageState.get_unread_count(user.id, channel.id) == 2
+
+    assert ChatMessageState.mark_channel_read(user.id, channel.id)
+
+    assert ChannelReadCursor.get_last_read_id(user.id, channel.id) == ids[-1]
+    assert ChatMessageState.get_unread_count(user.id, channel.id) == 0
+
+
+def test_first_page_marks_the_channel_read(channel, user, user_client, add_messages):
+    ids = add_messages(channel, 3)
+
+    user_client.get(f"/people/chat/channels/{channel.name}/messages", query_string={"limit": 2})
+    db.session.expire_all()
+    assert ChannelReadCursor.get_last_read_id(user.id, channel.id) == ids[-1]
+
+
+def test_read_states_migrate_into_cursors(channel, user, add_messages):
+    ids = add_messages(channel, 3)
+    db.session.add_all(
+        ChatMessageState(
+            user_id=user.id,
+            message_id=message_id,
+            channel_id=channel.id,
+            interaction_type=InteractionType.READ,
+            data=data,
+        )
+        for message_id, data in [
+            (ids[0], {"last_read_message_id": ids[1]}),
+            (ids[1], {"last_read_message_id": ids[0]}),
+            (ids[2], None),
+        ]
+    )
+    db.session.commit()
+
+    assert ChannelReadCursor.migrate_read_states() == 3
+
+    assert ChannelReadCursor.get_last_read_id(user.id, channel.id) == ids[1]
+    assert read_states().count() == 0
+    assert ChannelReadCursor.migrate_read_states() == 0
@@ -0,0 +1,148 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for chat search: the FTS5 index, its upkeep through mapper
+#     events, and the LIKE search used without FTS5.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import pytest
+
+from modules.people.models.chat import Chat
+from modules.people.models.chat_search import ChatSearchIndex
+from system.db.database import db
+
+
+@pytest.fixture
+def post(channel):
+    """Post a message with given content to the test channel"""
+    author_id = channel.created_by_id
+
+    def add(content, author_id=author_id, target=channel):
+        chat = Chat(content=content, author_id=author_id, channel_id=target.id)
+        db.session.add(chat)
+        db.session.commit()
+        return chat.id
+
+    return add
+
+
+def found(channel, term):
+    messages, _has_more = ChatSearchIndex.find_messages(channel.id, term)
+    return [message.id for message in messages]
+
+
+def test_index_is_enabled_on_sqlite(ctx):
+    assert ChatSearchIndex.enabled
+
+
+def test_words_match_as_prefixes_in_any_order(channel, post):
+    pie = post("Fresh apple pie in the kitchen")
+    post("Kitchen is closed today")
+
+    assert found(channel, "app kitch") == [pie]
+    assert found(channel, "kitchen") != []
+    assert found(channel, "pear") == []
+
+
+def test_diacritics_and_quotes_dont_break_matching(channel, post):
+    cafe = post("Meet at the café")
+
+    assert found(channel, "cafe") == [cafe]
+    assert found(channel, 'caf"') == [cafe]
+    assert ChatSearchIndex.build_query('say "hi"') == '"say"* """hi"""*'
+
+
+def test_results_stay_in_their_channel(channel, post):
+    other = type(channel)(name=f"{channel.name}-other", created_by_id=channel.created_by_id)
+    db.session.add(other)
+    db.session.commit()
+    mine = post("quarterly numbers")
+    post("quarterly numbers", target=other)
+
+    assert found(channel, "quarterly") == [mine]
+
+
+def test_authors_are_searchable_by_name(channel, post, user):
+    message = post("see you there", author_id=user.id)
+
+    assert found(channel, user.first_name) == [message]
+
+    user.first_name = "Zebulon"
+    db.session.commit()
+    try:
+        assert found(channel, "Zebulon") == [message]
+    finally:
+        user.first_name = "Michael"
+        db.session.commit()
+
+
+def test_snippets_are_escaped_and_highlighted(channel, post):
+    post("<b>bold</b> banana bread")
+
+    (message,) = ChatSearchIndex.find_messages(channel.id, "banana")[0]
+
+    assert "<mark>banana</mark>" in message.search_snippet
+    assert "&lt;b&gt;" in message.search_snippet
+
+
+def test_index_follows_edits_and_deletes(channel, post):
+    message_id = post("original wording")
+    chat = db.session.get(Chat, message_id)
+    chat.content = "revised wording"
+    db.session.commit()
+
+    assert found(channel, "original") == []
+    assert found(channel, "revised") == [message_id]
+
+    db.session.delete(chat)
+    db.session.commit()
+    assert found(channel, "revised") == []
+
+
+def test_bulk_deletes_drop_index_entries(channel, post):
+    message_id = post("purged soon")
+
+    ChatSearchIndex.delete_messages([message_id])
+    Chat.query.filter_by(id=message_id).delete()
+    db.session.commit()
+
+    assert found(channel, "purged") == []
+
+
+def test_rebuild_indexes_every_message(ctx):
+    assert ChatSearchIndex.rebuild() == Chat.query.count()
+
+
+def test_like_search_without_fts5(channel, post, user, monkeypatch):
+    monkeypatch.setattr(ChatSearchIndex, "enabled", False)
+    older = post("Team lunch on Friday")
+    newer = post("lunch moved", author_id=user.id)
+    post("unrelated")
+
+    assert found(channel, "LUNCH") == [newer, older]
+    assert found(channel, user.last_name) == [newer]
+
+    messages, has_more = ChatSearchIndex.find_messages(channel.id, "lunch", limit=1)
+    assert [message.id for message in messages] == [newer]
+    assert has_more
+
+
+def test_route_pages_through_results(channel, post, admin_client, monkeypatch):
+    monkeypatch.setattr("modules.people.controllers.chat.SEARCH_PAGE_SIZE", 2)
+    for index in range(3):
+        post(f"standup note {index}")
+    url = f"/people/chat/channels/{channel.name}/search"
+
+    first = admin_client.post(url, data={"search": "standup"}).get_data(as_text=True)
+    last = admin_client.post(url, data={"search": "standup", "page": 2}).get_data(as_text=True)
+
+    assert first.count("<mark>standup</mark>") == 2
+    assert "&#34;page&#34;: 2" in first or '"page": 2' in first
+    assert last.count("<mark>standup</mark>") == 1
+    assert '"page"' not in last and "&#34;page&#34;" not in last
@@ -0,0 +1,65 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for the message statistics kept on each channel by the chat
+#     mapper events.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import pytest
+from sqlalchemy.dialects import mysql
+from sqlalchemy.dialects import postgresql
+
+from modules.people.models.chat import Channel
+from modules.people.models.chat import Chat
+from system.db.database import db
+
+
+def stats(channel):
+    db.session.refresh(channel)
+    return channel.message_count, channel.last_message_id, channel.pinned_count
+
+
+def test_counters_follow_inserts_pins_and_deletes(channel, add_messages):
+    ids = add_messages(channel, 3)
+    pinned = add_messages(channel, 1, pinned=True)
+    assert stats(channel) == (4, pinned[0], 1)
+
+    db.session.get(Chat, ids[0]).toggle_pin()
+    db.session.commit()
+    assert stats(channel) == (4, pinned[0], 2)
+
+    db.session.delete(db.session.get(Chat, pinned[0]))
+    db.session.commit()
+    assert stats(channel) == (3, ids[-1], 1)
+
+    assert Channel.recount_stats(channel.id) == 0
+
+
+def test_older_ids_dont_move_the_last_message_back(channel, add_messages):
+    first, last = add_messages(channel, 2)
+    message = db.session.get(Chat, first)
+    content, author_id = message.content, message.author_id
+    db.session.delete(message)
+    db.session.commit()
+
+    db.session.add(Chat(id=first, content=content, author_id=author_id, channel_id=channel.id))
+    db.session.commit()
+
+    assert stats(channel) == (2, last, 0)
+    assert Channel.recount_stats(channel.id) == 0
+
+
+@pytest.mark.parametrize(
+    "dialect, comparison",
+    [(postgresql.dialect(), "IS DISTINCT FROM ("), (mysql.dialect(), "<=> (")],
+)
+def test_repair_compiles_for_server_databases(ctx, dialect, comparison):
+    sql = str(Channel.stats_update().compile(dialect=dialect))
+    assert sql.count(comparison) == len(Channel.stats_expressions())
+    assert "IS NOT (" not in sql
@@ -0,0 +1,59 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for the unread summary of all channels shown in the sidebar.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+from modules.people.models.chat import Channel
+from modules.people.models.chat import ChannelReadCursor
+from modules.people.models.chat import ChatMessageState
+from system.db.database import db
+
+
+def test_summary_counts_past_each_cursor(channel, user, add_messages):
+    ids = add_messages(channel, 4)
+    read = Channel(name=f"{channel.name}-read", created_by_id=channel.created_by_id)
+    db.session.add(read)
+    db.session.commit()
+    read_ids = add_messages(read, 2)
+
+    summary = ChatMessageState.get_unread_summary(user.id)
+    assert (summary[channel.name], summary[read.name]) == (4, 2)
+
+    ChannelReadCursor.advance(user.id, channel.id, ids[1])
+    ChannelReadCursor.advance(user.id, read.id, read_ids[-1])
+    db.session.commit()
+
+    summary = ChatMessageState.get_unread_summary(user.id)
+    assert (summary[channel.name], summary[read.name]) == (2, 0)
+
+
+def test_summary_only_lists_visible_channels(channel, user, add_messages):
+    private = Channel(
+        name=f"{channel.name}-private", created_by_id=channel.created_by_id, is_private=True
+    )
+    db.session.add(private)
+    db.session.commit()
+    add_messages(private, 1)
+
+    assert private.name not in ChatMessageState.get_unread_summary(user.id)
+    admin_summary = ChatMessageState.get_unread_summary(channel.created_by_id, is_admin=True)
+    assert admin_summary[private.name] == 1
+
+
+def test_route_reports_unread_status(channel, add_messages, user_client):
+    add_messages(channel, 3)
+
+    unread = user_client.get("/people/chat/channels/unread").json
+
+    assert unread[channel.name] == {"has_unread": True, "unread_count": 3}
+
+    user_client.post(f"/people/chat/channels/{channel.name}/mark_read")
+    unread = user_client.get("/people/chat/channels/unread").json
+    assert unread[channel.name] == {"has_unread": False, "unread_count": 0}
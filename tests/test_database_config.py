@@ -0,0 +1,87 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for the database profile: settings, engine options and the
+#     pragmas applied to SQLite connections.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+from flask import Flask
+
+from system.db.database import DATABASE_SETTINGS
+from system.db.database import db
+from system.db.database import engine_options
+from system.db.database import is_sqlite_file
+from system.db.database import load_database_config
+from system.db.database import sqlite_pragmas
+from system.db.replica import REPLICA_BIND
+
+
+def settings(**overrides):
+    return {**DATABASE_SETTINGS, **overrides}
+
+
+def test_environment_values_take_the_type_of_the_default(monkeypatch):
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT", "250")
+    monkeypatch.setenv("REPLICA_READ_YOUR_WRITES", "1.5")
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    app = Flask(__name__)
+    app.config["DB_POOL_SIZE"] = 7
+
+    load_database_config(app)
+
+    assert app.config["SQLITE_BUSY_TIMEOUT"] == 250
+    assert app.config["REPLICA_READ_YOUR_WRITES"] == 1.5
+    assert app.config["DB_POOL_SIZE"] == 7
+    assert app.config["SQLITE_JOURNAL_MODE"] == "WAL"
+
+
+def test_sqlite_files_are_told_apart_from_memory_databases():
+    assert is_sqlite_file("sqlite:////tmp/app.db")
+    assert not is_sqlite_file("sqlite://")
+    assert not is_sqlite_file("sqlite:///:memory:")
+    assert not is_sqlite_file("postgresql://user@host/sparq")
+
+
+def test_sqlite_files_get_a_shared_pool_and_a_busy_timeout():
+    options = engine_options(settings(SQLITE_BUSY_TIMEOUT=2500), "sqlite:////tmp/app.db")
+
+    assert options["pool_size"] == DATABASE_SETTINGS["DB_POOL_SIZE"]
+    assert options["connect_args"] == {"timeout": 2.5, "check_same_thread": False}
+    assert "pool_pre_ping" not in options
+    assert engine_options(settings(), "sqlite://") == {}
+
+
+def test_server_databases_get_pings_and_recycling():
+    options = engine_options(settings(DB_POOL_RECYCLE=60), "postgresql://user@host/sparq")
+
+    assert options["pool_pre_ping"] is True
+    assert options["pool_recycle"] == 60
+    assert "connect_args" not in options
+
+
+def test_replicas_leave_the_journal_alone():
+    primary = sqlite_pragmas(settings())
+    replica = sqlite_pragmas(settings(), read_only=True)
+
+    assert "PRAGMA journal_mode = WAL" in primary
+    assert "PRAGMA synchronous = NORMAL" in primary
+    assert [pragma for pragma in primary if pragma not in replica] == primary[:2]
+
+
+def test_connections_use_the_configured_pragmas(ctx):
+    for bind_key in (None, REPLICA_BIND):
+        with db.engines[bind_key].connect() as connection:
+            journal_mode = connection.exec_driver_sql("PRAGMA journal_mode").scalar()
+            busy_timeout = connection.exec_driver_sql("PRAGMA busy_timeout").scalar()
+            assert journal_mode == "wal"
+            assert busy_timeout == DATABASE_SETTINGS["SQLITE_BUSY_TIMEOUT"]
+
+    with db.engine.connect() as connection:
+        # NORMAL
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1
@@ -0,0 +1,121 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for group names cached on the user and member counts kept on
+#     each group.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from modules.core.models.group import Group
+from modules.core.models.user import User
+from modules.core.models.user_group import user_group
+from system.db.database import db
+from system.db.schema import ensure_columns
+
+
+@pytest.fixture
+def new_user(ctx):
+    """A user created for the test and deleted afterwards"""
+    user = User.create(f"{uuid.uuid4().hex[:12]}@example.com", "secret", "New", "User")
+    yield user
+    db.session.rollback()
+    if db.session.get(User, user.id) is not None:
+        db.session.delete(user)
+        db.session.commit()
+
+
+def member_count(name):
+    db.session.expire_all()
+    return Group.query.filter_by(name=name).one().member_count
+
+
+def test_admin_checks_read_cached_group_names(new_user, count_queries):
+    assert not new_user.is_admin
+
+    with count_queries() as statements:
+        assert not new_user.is_admin
+        assert new_user.group_names == {"ALL"}
+    assert statements == []
+
+    new_user.groups.append(Group.get_admin_group())
+    assert new_user.is_admin
+
+
+def test_reloading_the_user_forgets_group_names(new_user):
+    assert not new_user.is_admin
+
+    # Written around the ORM, so only the commit's expiry can reveal it
+    db.session.execute(
+        user_group.insert().values(user_id=new_user.id, group_id=Group.get_admin_group().id)
+    )
+    db.session.commit()
+
+    assert new_user.is_admin
+
+
+def test_member_counts_follow_membership(new_user):
+    admins = member_count("ADMIN")
+    everyone = member_count("ALL")
+
+    new_user.groups.append(Group.get_admin_group())
+    db.session.commit()
+    assert member_count("ADMIN") == admins + 1
+    assert Group.get_admin_count() == admins + 1
+
+    new_user.remove_from_group(Group.get_admin_group())
+    assert member_count("ADMIN") == admins
+
+    db.session.delete(new_user)
+    db.session.commit()
+    assert member_count("ALL") == everyone - 1
+
+
+def test_recount_matches_the_membership_table(ctx):
+    counts = {group.name: group.member_count for group in Group.query}
+    Group.query.update({"member_count": 0})
+    db.session.commit()
+
+    Group.recount_members()
+
+    assert {group.name: member_count(group.name) for group in Group.query} == counts
+
+
+def test_the_last_admin_cant_leave(new_user, monkeypatch):
+    new_user.groups.append(Group.get_admin_group())
+    db.session.commit()
+    monkeypatch.setattr(Group, "get_admin_count", classmethod(lambda cls: 1))
+
+    assert new_user.is_sole_admin
+    with pytest.raises(ValueError):
+        new_user.remove_from_group(Group.get_admin_group())
+
+
+def test_missing_columns_are_added(ctx):
+    name = f"columns_test_{uuid.uuid4().hex[:8]}"
+    with db.engine.begin() as connection:
+        connection.execute(db.text(f'CREATE TABLE "{name}" (id INTEGER PRIMARY KEY)'))
+        connection.execute(db.text(f'INSERT INTO "{name}" (id) VALUES (1)'))
+    table = db.Table(
+        name,
+        db.MetaData(),
+        db.Column("id", db.Integer, primary_key=True),
+        db.Column("count", db.Integer, nullable=False, server_default="0"),
+        db.Column("note", db.String(20)),
+    )
+
+    ensure_columns(SimpleNamespace(__table__=table))
+    ensure_columns(SimpleNamespace(__table__=table))
+
+    with db.engine.connect() as connection:
+        row = connection.execute(db.text(f'SELECT id, count, note FROM "{name}"')).one()
+    assert tuple(row) == (1, 0, None)
@@ -0,0 +1,132 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for reading module manifests without importing module code.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import os
+from unittest import mock
+
+import pytest
+
+from system.module import registry as registry_module
+from system.module.registry import ManifestRegistry
+from system.module.registry import manifest_registry
+from system.module.registry import read_manifest
+
+
+def touch(path):
+    """Move a path's modification time forward, whatever the timestamp resolution"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def add_module(modules_dir, module_dir, source):
+    path = modules_dir / module_dir
+    path.mkdir()
+    (path / "__manifest__.py").write_text(source, encoding="utf-8")
+    touch(modules_dir)
+    return path
+
+
+@pytest.fixture
+def modules_dir(tmp_path):
+    add_module(tmp_path, "notes", 'manifest = {"name": "Notes", "version": "1.0"}\n')
+    add_module(tmp_path, "books", 'manifest = {"name": "Library", "version": "2.0"}\n')
+    (tmp_path / "_shared").mkdir()
+    (tmp_path / "README.md").write_text("not a module", encoding="utf-8")
+    return tmp_path
+
+
+def test_manifests_are_read_without_running_the_file(tmp_path):
+    path = tmp_path / "__manifest__.py"
+    path.write_text(
+        'import not_installed\nraise SystemExit\nmanifest = {"name": "X", "depends": ["core"]}\n',
+        encoding="utf-8",
+    )
+
+    assert read_manifest(path) == {"name": "X", "depends": ["core"]}
+
+
+@pytest.mark.parametrize("source", ["name = 'X'\n", "manifest = dict(name='X')\n"])
+def test_files_without_a_literal_manifest_are_rejected(tmp_path, source):
+    path = tmp_path / "__manifest__.py"
+    path.write_text(source, encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        read_manifest(path)
+
+
+def test_manifests_are_keyed_by_module_directory(modules_dir):
+    manifests = ManifestRegistry(str(modules_dir)).get_manifests()
+
+    assert sorted(manifests) == ["books", "notes"]
+    assert manifests["books"]["name"] == "Library"
+    assert manifests["books"]["module_dir"] == "books"
+    assert manifests["books"]["enabled"]
+
+
+def test_broken_manifests_are_reported_and_skipped(modules_dir):
+    add_module(modules_dir, "broken", "manifest = {\n")
+    registry = ManifestRegistry(str(modules_dir))
+
+    assert "broken" not in registry.get_manifests()
+    assert len(registry.errors) == 1
+    assert "'broken'" in registry.errors[0]
+
+
+def test_manifests_are_reread_only_after_changes(modules_dir):
+    registry = ManifestRegistry(str(modules_dir))
+    registry.get_manifests()
+
+    with mock.patch.object(registry_module, "read_manifest", wraps=read_manifest) as read:
+        registry.get_manifests()
+        assert read.call_count == 0
+
+        (modules_dir / "notes" / "__manifest__.py").write_text(
+            'manifest = {"name": "Notes", "version": "1.1"}\n', encoding="utf-8"
+        )
+        touch(modules_dir / "notes" / "__manifest__.py")
+        assert registry.get_manifest("notes")["version"] == "1.1"
+        assert read.call_count == 2
+
+
+def test_disabled_markers_are_picked_up(modules_dir):
+    registry = ManifestRegistry(str(modules_dir))
+    assert registry.get_manifest("notes")["enabled"]
+
+    (modules_dir / "notes" / "__DISABLED__").touch()
+    touch(modules_dir / "notes")
+
+    assert not registry.get_manifest("notes")["enabled"]
+
+
+def test_callers_get_copies(modules_dir):
+    registry = ManifestRegistry(str(modules_dir))
+
+    registry.get_manifest("notes")["name"] = "Changed"
+
+    assert registry.get_manifest("notes")["name"] == "Notes"
+    assert registry.get_manifest("missing") is None
+
+
+def test_modules_are_found_by_directory_or_name(modules_dir):
+    registry = ManifestRegistry(str(modules_dir))
+
+    assert registry.find("LIBRARY")["module_dir"] == "books"
+    assert registry.find("Books")["module_dir"] == "books"
+    assert registry.find("nothing") is None
+
+
+def test_every_installed_module_has_a_manifest(app):
+    with app.app_context():
+        manifests = manifest_registry.get_manifests()
+
+    assert manifest_registry.errors == []
+    assert {"core", "people", "books"} <= set(manifests)
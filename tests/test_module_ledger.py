@@ -0,0 +1,87 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for the module version ledger that lets startup skip schema and
+#     seed initialization of unchanged modules.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import uuid
+
+import pytest
+
+from system.db.database import db
+from system.db.decorators import ModelRegistry
+from system.module.ledger import DEFAULT_SEED_VERSION
+from system.module.ledger import ModuleVersion
+from system.module.ledger import module_versions
+from system.module.ledger import schema_version
+
+
+@pytest.fixture
+def loader(app, ctx):
+    """The app's module loader, with the ledger restored afterwards"""
+    recorded = ModuleVersion.get_all()
+    yield app.module_loader
+    for module, versions in recorded.items():
+        ModuleVersion.record(module, versions)
+
+
+@pytest.fixture
+def test_table(monkeypatch):
+    """A table registered by a module of its own, dropped from the metadata afterwards"""
+    module = f"ledger_{uuid.uuid4().hex[:8]}"
+    table = db.Table(module, db.metadata, db.Column("id", db.Integer, primary_key=True))
+    monkeypatch.setattr(
+        ModelRegistry, "models", ModelRegistry.models + [{"module": module, "table": module}]
+    )
+    yield module, table
+    db.metadata.remove(table)
+
+
+def test_warm_starts_have_nothing_pending(loader):
+    assert loader.get_pending_databases() == {}
+
+
+def test_schema_changes_change_the_fingerprint(ctx, test_table):
+    module, table = test_table
+    before = schema_version(module)
+    assert schema_version(module) == before
+
+    table.append_column(db.Column("name", db.String(20)))
+    with_column = schema_version(module)
+    db.Index(f"ix_{module}_name", table.c.name)
+
+    assert len({before, with_column, schema_version(module)}) == 3
+
+
+def test_seed_versions_come_from_the_manifest(ctx):
+    versions = module_versions(
+        [{"module_dir": "books"}, {"module_dir": "people", "seed_version": 3}]
+    )
+
+    assert versions["books"] == (schema_version("books"), DEFAULT_SEED_VERSION)
+    assert versions["people"] == (schema_version("people"), "3")
+
+
+def test_changed_modules_are_pending_until_initialized(loader):
+    current = module_versions(loader.get_enabled_manifests())
+    ModuleVersion.record("books", (current["books"][0], "old seed"))
+
+    assert loader.get_pending_databases() == {"books": current["books"]}
+
+    loader.init_database("books", current["books"])
+    assert loader.get_pending_databases() == {}
+
+
+def test_forced_initialization_includes_every_module(loader, monkeypatch):
+    monkeypatch.setenv("FORCE_INIT_DATABASE", "1")
+
+    pending = loader.get_pending_databases()
+
+    assert list(pending) == [manifest["module_dir"] for manifest in loader.get_enabled_manifests()]
@@ -0,0 +1,62 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for enabling and disabling modules at runtime.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import os
+
+import pytest
+
+from system.module.registry import DISABLED_FILE
+from system.module.registry import manifest_registry
+
+MARKER = os.path.join(manifest_registry.modules_dir, "books", DISABLED_FILE)
+
+
+@pytest.fixture
+def loader(app):
+    """The app's module loader, with Books enabled again afterwards"""
+    yield app.module_loader
+    with app.app_context():
+        app.module_loader.set_enabled("books", True)
+    assert not os.path.exists(MARKER)
+
+
+def toggle(client, enabled):
+    return client.post("/api/modules/toggle", json={"module": "Books", "enabled": enabled})
+
+
+def test_loaded_modules_toggle_live(loader, admin_client):
+    response = toggle(admin_client, False)
+    assert response.json["success"]
+    assert os.path.exists(MARKER)
+    assert "books" in loader.disabled
+    assert not loader.is_blueprint_enabled("books_bp")
+    assert admin_client.get("/books/").status_code == 404
+
+    response = toggle(admin_client, True)
+    assert response.json["success"]
+    assert not os.path.exists(MARKER)
+    assert loader.is_blueprint_enabled("books_bp")
+    assert admin_client.get("/books/").status_code == 200
+
+
+def test_modules_not_loaded_at_startup_wait_for_a_restart(loader, admin_client, monkeypatch):
+    toggle(admin_client, False)
+    monkeypatch.delitem(loader.instances, "books")
+
+    response = toggle(admin_client, True)
+
+    assert response.status_code == 202
+    assert response.json["restart_required"]
+    assert not response.json["success"]
+    assert not os.path.exists(MARKER)
+    assert "books" in loader.disabled
+    assert admin_client.get("/books/").status_code == 404
@@ -0,0 +1,112 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for the opt-in startup profiler.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import json
+
+import pluggy
+import pytest
+
+from system.profiling import StartupProfiler
+
+hookspec = pluggy.HookspecMarker("profiling_test")
+hookimpl = pluggy.HookimplMarker("profiling_test")
+
+
+class Spec:
+    @hookspec
+    def on_startup(self, app):
+        pass
+
+
+class Books:
+    @hookimpl
+    def on_startup(self, app):
+        return f"books {app}"
+
+
+class Weather:
+    @hookimpl
+    def on_startup(self, app):
+        return f"weather {app}"
+
+
+@pytest.fixture
+def plugins():
+    manager = pluggy.PluginManager("profiling_test")
+    manager.add_hookspecs(Spec)
+    manager.register(Books())
+    manager.register(Weather())
+    return manager
+
+
+def test_disabled_profiler_records_nothing(plugins, capsys):
+    profiler = StartupProfiler()
+    profiler.start()
+
+    with profiler.measure("phase", "create tables"):
+        pass
+    with profiler.hook(plugins.hook.on_startup):
+        plugins.hook.on_startup(app="x")
+    profiler.finish()
+
+    assert profiler.entries == []
+    assert capsys.readouterr().out == ""
+
+
+def test_blocks_are_timed_even_when_they_fail():
+    profiler = StartupProfiler(enabled=True)
+    profiler.start()
+
+    with profiler.measure("phase", "register routes"):
+        pass
+    with pytest.raises(RuntimeError), profiler.measure("import", "books"):
+        raise RuntimeError
+
+    assert [entry[:2] for entry in profiler.entries] == [
+        ("phase", "register routes"),
+        ("import", "books"),
+    ]
+    assert all(seconds >= 0 for _, _, seconds in profiler.entries)
+
+
+def test_each_hook_implementation_is_timed(plugins):
+    profiler = StartupProfiler(enabled=True)
+    profiler.start()
+    functions = [impl.function for impl in plugins.hook.on_startup.get_hookimpls()]
+
+    with profiler.hook(plugins.hook.on_startup):
+        results = plugins.hook.on_startup(app="x")
+
+    assert sorted(results) == ["books x", "weather x"]
+    assert sorted(name for _, name, _ in profiler.entries) == [
+        "on_startup: Books",
+        "on_startup: Weather",
+    ]
+    assert [impl.function for impl in plugins.hook.on_startup.get_hookimpls()] == functions
+
+
+def test_finish_prints_and_exports_the_report(tmp_path, capsys, monkeypatch):
+    monkeypatch.delenv("WERKZEUG_RUN_MAIN", raising=False)
+    path = tmp_path / "profile.json"
+    profiler = StartupProfiler(enabled=True, json_path=str(path))
+    profiler.start()
+    profiler.entries = [("phase", "fast", 0.001), ("phase", "slow", 0.5), ("hook", "h", 0.01)]
+
+    profiler.finish()
+
+    rows = [line.split() for line in capsys.readouterr().out.splitlines()]
+    steps = [row[:2] for row in rows if row and row[0] in StartupProfiler.CATEGORIES]
+    assert steps == [["phase", "slow"], ["phase", "fast"], ["hook", "h"]]
+    assert ["total", "create_app"] in [row[:2] for row in rows]
+    report = json.loads(path.read_text(encoding="utf-8"))
+    assert report["total_seconds"] == profiler.total
+    assert report["entries"][1] == {"category": "phase", "name": "slow", "seconds": 0.5}
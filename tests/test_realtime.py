@@ -0,0 +1,88 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for the Socket.IO server setup and its optional message queue.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import pickle
+import time
+import uuid
+
+from flask import Flask
+
+from system.cache import redis_from_url
+from system.realtime import DEFAULT_CHANNEL
+from system.realtime import FakeRedisManager
+from system.realtime import create_emitter
+from system.realtime import create_socketio
+from system.realtime import load_socketio_config
+from system.realtime import user_room
+
+
+def make_app(**config):
+    app = Flask(__name__)
+    app.config.update(config)
+    return app
+
+
+def test_settings_come_from_the_environment_unless_configured(monkeypatch):
+    monkeypatch.setenv("SOCKETIO_CHANNEL", "from-env")
+    monkeypatch.setenv("SOCKETIO_ASYNC_MODE", "threading")
+    app = make_app(SOCKETIO_ASYNC_MODE="eventlet")
+
+    load_socketio_config(app)
+
+    assert app.config["SOCKETIO_CHANNEL"] == "from-env"
+    assert app.config["SOCKETIO_ASYNC_MODE"] == "eventlet"
+    assert "SOCKETIO_MESSAGE_QUEUE" not in app.config
+
+
+def test_events_stay_in_process_without_a_queue():
+    socketio = create_socketio(make_app(SOCKETIO_ASYNC_MODE="threading"))
+
+    assert not isinstance(socketio.server.manager, FakeRedisManager)
+    assert socketio.server.async_mode == "threading"
+
+
+def test_queue_and_origins_are_configured():
+    socketio = create_socketio(
+        make_app(
+            SOCKETIO_MESSAGE_QUEUE="fakeredis://",
+            SOCKETIO_ASYNC_MODE="threading",
+            SOCKETIO_CORS_ALLOWED_ORIGINS="https://a.example, https://b.example",
+        )
+    )
+
+    manager = socketio.server.manager
+    assert isinstance(manager, FakeRedisManager)
+    assert manager.channel == DEFAULT_CHANNEL
+    assert socketio.server.eio.cors_allowed_origins == ["https://a.example", "https://b.example"]
+
+
+def test_emitter_publishes_to_the_queue_channel():
+    channel = f"test-{uuid.uuid4().hex}"
+    pubsub = redis_from_url("fakeredis://").pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(channel)
+    emitter = create_emitter("fakeredis://", channel)
+
+    emitter.emit("ping", {"n": 1}, to="user:7")
+
+    message = None
+    deadline = time.monotonic() + 5
+    while message is None and time.monotonic() < deadline:
+        message = pubsub.get_message(timeout=0.1)
+    assert message is not None
+    payload = pickle.loads(message["data"])
+    assert payload["event"] == "ping"
+    assert payload["data"] == {"n": 1}
+    assert payload["room"] == "user:7"
+
+
+def test_user_rooms_are_named_by_id():
+    assert user_room(7) == "user:7"
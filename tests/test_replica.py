@@ -0,0 +1,66 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for routing the reads of replica_reads views to the replica.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import time
+
+import pytest
+from flask import g
+from flask import session
+
+from modules.core.models.user import User
+from system.db.database import db
+from system.db.replica import LAST_WRITE_KEY
+from system.db.replica import REPLICA_BIND
+from system.db.replica import primary_reads
+
+READ = db.select(User.id)
+WRITE = db.update(User).where(User.id == 0).values(first_name="nobody")
+
+
+@pytest.fixture
+def request_ctx(app):
+    with app.test_request_context():
+        yield
+        db.session.remove()
+
+
+def bind(clause):
+    return db.session.get_bind(clause=clause)
+
+
+def test_reads_go_to_the_replica_only_when_asked(request_ctx):
+    replica = db.engines[REPLICA_BIND]
+    assert bind(READ) is not replica
+
+    g.use_replica = True
+    assert bind(READ) is replica
+    with primary_reads():
+        assert bind(READ) is not replica
+    assert bind(READ) is replica
+
+
+def test_writes_switch_the_session_to_the_primary(request_ctx):
+    g.use_replica = True
+    assert bind(WRITE) is not db.engines[REPLICA_BIND]
+    assert bind(READ) is not db.engines[REPLICA_BIND]
+
+
+def test_users_read_their_own_writes(request_ctx):
+    g.use_replica = True
+    session[LAST_WRITE_KEY] = time.time()
+    assert bind(READ) is not db.engines[REPLICA_BIND]
+
+
+def test_commits_start_the_read_your_writes_window(request_ctx):
+    db.session.execute(WRITE)
+    db.session.commit()
+    assert session[LAST_WRITE_KEY] == pytest.approx(time.time(), abs=5)
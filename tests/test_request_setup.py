@@ -0,0 +1,88 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for the per-request setup: finding the current module, resolving
+#     the language and keeping database work out of it.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+from flask import g
+
+from modules.core.models.group import Group
+from modules.core.models.user import User
+from modules.core.models.user_group import user_group
+from modules.core.models.user_setting import UserSetting
+from system.db.database import db
+
+
+def test_static_assets_run_no_queries(admin_client, count_queries):
+    with count_queries() as statements:
+        response = admin_client.get("/assets/css/base.css")
+
+    assert response.status_code == 200
+    assert statements == []
+
+
+def test_current_module_is_found_by_main_route(app):
+    for path, route in (("/people/chat", "/people"), ("/nowhere", "/core"), ("/", "/core")):
+        with app.test_request_context(path):
+            app.preprocess_request()
+            assert g.current_module["main_route"] == route
+
+
+def test_route_index_uses_lowercase_routes(app):
+    index = app.module_loader.build_route_index()
+
+    assert index["books"]["main_route"] == "/books"
+    assert all(route == route.lower() for route in index)
+
+
+def test_login_resolves_the_users_language(app, user, count_queries):
+    UserSetting.set(user.id, "language", "es")
+    try:
+        client = app.test_client()
+        client.post("/login", data={"email": user.email, "password": "password123"})
+        with client.session_transaction() as session:
+            assert session["lang"] == "es"
+
+        with count_queries() as statements:
+            client.get("/assets/css/base.css")
+            client.get("/people/chat?lang=en")
+        with client.session_transaction() as session:
+            assert session["lang"] == "en"
+        assert not any("user_setting" in statement for statement in statements)
+    finally:
+        UserSetting.set(user.id, "language", "en")
+
+
+def test_language_endpoint_updates_the_session(user_client):
+    assert user_client.post("/language/es").get_json() == {"success": True}
+    with user_client.session_transaction() as session:
+        assert session["lang"] == "es"
+
+    assert user_client.post("/language/xx").status_code == 400
+    assert user_client.post("/settings/language", data={"language": "en"}).get_json() == {
+        "success": True
+    }
+    with user_client.session_transaction() as session:
+        assert session["lang"] == "en"
+
+
+def test_users_missing_from_all_are_backfilled(ctx, user):
+    all_group_id = Group.get_all_group_id()
+    db.session.execute(
+        user_group.delete().where(
+            user_group.c.user_id == user.id, user_group.c.group_id == all_group_id
+        )
+    )
+    db.session.commit()
+
+    assert User.backfill_all_group() == 1
+    assert User.backfill_all_group() == 0
+    db.session.expire_all()
+    assert all_group_id in [group.id for group in user.groups]
@@ -0,0 +1,110 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for the in-process caches of company and user settings and the
+#     bus that relays their invalidations between processes.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import time
+import uuid
+
+from modules.core.models.company_setting import CompanySetting
+from modules.core.models.user_setting import UserSetting
+from system.cache import MISSING
+from system.cache import InvalidationBus
+from system.cache import LRUCache
+from system.db.database import db
+
+
+def unique_key():
+    return f"test_{uuid.uuid4().hex[:12]}"
+
+
+def test_company_settings_are_read_once(ctx, count_queries):
+    key = unique_key()
+    CompanySetting.set(key, "blue")
+
+    with count_queries() as statements:
+        assert CompanySetting.get(key) == "blue"
+        assert CompanySetting.get(key) == "blue"
+        assert CompanySetting.get(unique_key(), "default") == "default"
+    assert len(statements) == 2
+
+
+def test_missing_settings_are_cached_until_created(ctx, count_queries):
+    key = unique_key()
+    assert CompanySetting.get(key) is None
+
+    with count_queries() as statements:
+        assert CompanySetting.get(key, "fallback") == "fallback"
+    assert statements == []
+
+    CompanySetting.set(key, "now set")
+    assert CompanySetting.get(key) == "now set"
+
+
+def test_changes_show_only_once_committed(ctx):
+    key = unique_key()
+    CompanySetting.set(key, "old")
+    assert CompanySetting.get(key) == "old"
+
+    CompanySetting.set(key, "new", commit=False)
+    db.session.flush()
+    db.session.rollback()
+    assert CompanySetting.get(key) == "old"
+
+    CompanySetting.set(key, "new")
+    assert CompanySetting.get(key) == "new"
+
+
+def test_email_settings_are_read_in_one_query(ctx, count_queries):
+    CompanySetting.update_email_settings("key", "from@example.com", "Sender")
+
+    with count_queries() as statements:
+        settings = CompanySetting.get_email_settings()
+    assert len(statements) == 1
+    assert settings == {
+        "sendgrid_api_key": "key",
+        "sendgrid_from_email": "from@example.com",
+        "sendgrid_from_name": "Sender",
+    }
+
+
+def test_user_settings_are_cached_per_user(ctx, user, count_queries):
+    key, missing = unique_key(), unique_key()
+    user_id = user.id
+    UserSetting.set(user_id, key, "on")
+
+    with count_queries() as statements:
+        assert UserSetting.get_many(user_id, [key, missing]) == {key: "on", missing: None}
+        assert UserSetting.get_many(user_id, [key, missing]) == {key: "on", missing: None}
+        assert UserSetting.get(user_id + 1, key, "default") == "default"
+    assert len(statements) == 2
+
+    UserSetting.set(user_id, key, "off")
+    assert UserSetting.get(user_id, key) == "off"
+
+
+def test_invalidations_reach_other_processes():
+    url = "fakeredis://"
+    channel = f"test-{uuid.uuid4().hex}"
+    buses = [InvalidationBus(channel) for _ in range(2)]
+    caches = [bus.register("settings", LRUCache()) for bus in buses]
+    for bus in buses:
+        bus.connect(url)
+    for cache in caches:
+        cache.set((1, "language"), "es")
+
+    buses[0].invalidate("settings", (1, "language"))
+
+    deadline = time.monotonic() + 5
+    while caches[1].get((1, "language")) is not MISSING and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert caches[0].get((1, "language")) is MISSING
+    assert caches[1].get((1, "language")) is MISSING
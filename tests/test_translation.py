@@ -0,0 +1,71 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for the merged translation catalogs and the translators bound
+#     to them.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import pytest
+
+from system.i18n import translation
+
+
+@pytest.fixture
+def catalogs(ctx, monkeypatch):
+    """Build catalogs from sample strings, restoring the real ones afterwards"""
+    for name in ("TRANSLATIONS", "CATALOGS", "FORMATS", "TRANSLATORS"):
+        monkeypatch.setattr(translation, name, getattr(translation, name))
+    monkeypatch.setattr(
+        translation,
+        "TRANSLATIONS",
+        {
+            "es": {
+                "core": {
+                    "_meta": {"date_formats": {"medium": "DD [de] MMMM YYYY"}},
+                    "Save": "Guardar",
+                    "Delete": "Eliminar",
+                    "Cancel": "",
+                },
+                "people": {"Delete": "Borrar", "Save": ""},
+            }
+        },
+    )
+    translation.build_catalogs()
+
+
+def test_module_catalogs_fall_back_to_core(catalogs):
+    translate = translation.get_translator("es", "people")
+
+    assert translate("Delete") == "Borrar"
+    assert translate("Save") == "Guardar"
+    assert translate("Cancel") == "Cancel"
+    assert translate("Unknown") == "Unknown"
+    assert translation.get_translator("es", "tasks")("Delete") == "Eliminar"
+
+
+def test_date_patterns_are_compiled(catalogs):
+    formats = translation.FORMATS[("es", "people")]
+    assert formats.date_formats["medium"] == "%d de %B %Y"
+
+
+def test_translators_are_cached_per_language_and_module(catalogs):
+    translate = translation.get_translator("es", "people")
+
+    assert translation.get_translator("es", "people") is translate
+    assert translation.get_translator("es", "core") is not translate
+
+
+def test_unknown_languages_use_the_default(app, catalogs, monkeypatch):
+    for lang in ("xx", "../../etc", "en"):
+        assert translation.get_translator(lang, "people") is translation.untranslated
+    assert translation.TRANSLATORS == {}
+
+    monkeypatch.setitem(app.config, "DEFAULT_LANGUAGE", "es")
+    assert translation.get_translator("xx", "people")("Delete") == "Borrar"
+    assert set(translation.TRANSLATORS) == {("es", "people")}
@@ -0,0 +1,105 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for the pickled translation cache and reloading changed
+#     language files.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import json
+import os
+from unittest import mock
+
+import pytest
+
+from system.i18n import translation
+
+
+@pytest.fixture
+def root(app, ctx, tmp_path, monkeypatch):
+    """Language files in a temporary tree, restoring the real catalogs afterwards"""
+    for name in ("SOURCES", "TRANSLATIONS", "CATALOGS", "FORMATS", "TRANSLATORS"):
+        monkeypatch.setattr(translation, name, getattr(translation, name))
+    monkeypatch.setattr(app, "root_path", str(tmp_path))
+    monkeypatch.setitem(app.config, "TRANSLATION_CACHE_FILE", str(tmp_path / "cache" / "t.cache"))
+    write(tmp_path, "core", "es", {"Save": "Guardar"})
+    write(tmp_path, "people", "es", {"Chat": "Charla"})
+    return tmp_path
+
+
+def write(root, module, lang, strings):
+    path = root / "modules" / module / "lang" / f"{lang}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(strings), encoding="utf-8")
+    # Bump the stamp even on filesystems with coarse timestamps
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    return path
+
+
+def test_unchanged_files_load_from_the_cache(root):
+    translation.preload_translations()
+    assert (root / "cache" / "t.cache").exists()
+
+    with mock.patch.object(translation.json, "load", side_effect=AssertionError):
+        translation.preload_translations()
+
+    assert translation.get_translator("es", "people")("Save") == "Guardar"
+    assert translation.get_translator("es", "people")("Chat") == "Charla"
+
+
+def test_changed_files_rebuild_the_cache(root):
+    translation.preload_translations()
+    write(root, "core", "es", {"Save": "Salvar"})
+
+    translation.preload_translations()
+
+    assert translation.get_translator("es", "core")("Save") == "Salvar"
+    with mock.patch.object(translation.json, "load", side_effect=AssertionError):
+        translation.preload_translations()
+
+
+def test_unreadable_caches_are_rebuilt(root):
+    (root / "cache").mkdir()
+    (root / "cache" / "t.cache").write_bytes(b"not a pickle")
+
+    translation.preload_translations()
+
+    assert translation.get_translator("es", "core")("Save") == "Guardar"
+
+
+def test_reload_parses_only_changed_files(root):
+    translation.preload_translations()
+    assert translation.reload_translations() == []
+
+    write(root, "people", "es", {"Chat": "Conversación"})
+    with mock.patch.object(translation.json, "load", wraps=json.load) as load:
+        assert translation.reload_translations() == [("people", "es")]
+    assert load.call_count == 1
+    assert translation.get_translator("es", "people")("Chat") == "Conversación"
+
+
+def test_removed_files_drop_their_strings(root):
+    translation.preload_translations()
+    (root / "modules" / "people" / "lang" / "es.json").unlink()
+
+    assert translation.reload_translations() == [("people", "es")]
+    assert ("es", "people") not in translation.CATALOGS
+
+
+def test_half_written_files_keep_their_previous_strings(root):
+    translation.preload_translations()
+    path = write(root, "core", "es", {})
+    path.write_text('{"Save": "Guar', encoding="utf-8")
+
+    assert translation.reload_translations() == []
+    assert translation.get_translator("es", "core")("Save") == "Guardar"
+
+    write(root, "core", "es", {"Save": "Grabar"})
+    assert translation.reload_translations() == [("core", "es")]
+    assert translation.get_translator("es", "core")("Save") == "Grabar"
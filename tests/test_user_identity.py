@@ -0,0 +1,92 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     Tests for the cached identity snapshot served as current_user.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+from modules.core.models.group import Group
+from modules.core.models.user_identity import UserIdentity
+from modules.core.models.user_setting import UserSetting
+from system.db.database import db
+
+
+def test_identities_are_loaded_once(user, count_queries):
+    user_id = user.id
+    first = UserIdentity.load(user_id)
+
+    with count_queries() as statements:
+        identity = UserIdentity.load(user_id)
+        assert (identity.email, identity.is_admin) == (first.email, False)
+        assert identity.avatar_initials == first.avatar_initials
+    assert statements == []
+    assert identity == user
+    assert identity is not first
+
+
+def test_unknown_users_have_no_identity(ctx):
+    assert UserIdentity.load(10**9) is None
+
+
+def test_other_attributes_load_the_full_user(user, count_queries):
+    identity = UserIdentity.load(user.id)
+    db.session.expunge_all()
+
+    with count_queries() as statements:
+        assert identity.created_at is not None
+        assert identity.check_password("password123")
+    assert len(statements) == 2  # the user and its groups
+
+
+def test_profile_changes_refresh_the_identity(user):
+    name = user.first_name
+    UserIdentity.load(user.id)
+
+    user.first_name = "Renamed"
+    db.session.commit()
+    try:
+        assert UserIdentity.load(user.id).first_name == "Renamed"
+    finally:
+        user.first_name = name
+        db.session.commit()
+
+
+def test_membership_changes_refresh_the_identity(user):
+    admin_group = Group.get_admin_group()
+    assert not UserIdentity.load(user.id).is_admin
+
+    user.groups.append(admin_group)
+    db.session.commit()
+    try:
+        assert UserIdentity.load(user.id).is_admin
+    finally:
+        user.groups.remove(admin_group)
+        db.session.commit()
+    assert not UserIdentity.load(user.id).is_admin
+
+
+def test_language_changes_refresh_the_identity(user):
+    UserSetting.set(user.id, "language", "en")
+    assert UserIdentity.load(user.id).language == "en"
+
+    UserSetting.set(user.id, "language", "es")
+    try:
+        assert UserIdentity.load(user.id).language == "es"
+    finally:
+        UserSetting.set(user.id, "language", "en")
+
+
+def test_uncommitted_changes_dont_reach_the_cache(user):
+    name = user.first_name
+    UserIdentity.load(user.id)
+
+    user.first_name = "Uncommitted"
+    db.session.flush()
+    db.session.rollback()
+
+    assert UserIdentity.load(user.id).first_name == name
@@ -0,0 +1,30 @@
+# -----------------------------------------------------------------------------
+# sparQ
+#
+# Description:
+#     WSGI entry point for production servers such as gunicorn. When an
+#     async worker is configured the standard library is monkey patched
+#     before the app and its database drivers are imported.
+#
+# Copyright (c) 2025 remarQable LLC
+#
+# This software is released under an open-source license.
+# See the LICENSE file for details.
+# -----------------------------------------------------------------------------
+
+import os
+
+ASYNC_MODE = os.environ.get("SOCKETIO_ASYNC_MODE")
+
+if ASYNC_MODE == "eventlet":
+    import eventlet
+
+    eventlet.monkey_patch()
+elif ASYNC_MODE == "gevent":
+    from gevent import monkey
+
+    monkey.patch_all()
+
+from app import create_app
+
+app = create_app()